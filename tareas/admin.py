@@ -1,5 +1,138 @@
-from django.contrib import admin
-from .models import Tarea
+from django.contrib import admin, messages
+from django.contrib.admin.utils import NestedObjects
+from django.contrib.auth import get_permission_codename
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.db import router
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.text import capfirst
+from django.views.decorators.csrf import csrf_protect
+
+from . import cache as cache_tareas
+from .eliminacion import eliminar_usuario
+from .models import Tarea, TareaArchivada
+from .pagination import PaginadorEstimado
 
 # Register your models here.
-admin.site.register(Tarea)
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    """
+    Administración de tareas, pensada para tablas con millones de filas.
+
+    - Tarea.__str__ muestra el nombre del usuario, por lo que el listado
+      lo carga en la misma consulta para evitar una consulta por fila.
+    - Un único COUNT acotado (PaginadorEstimado y sin el recuento total
+      de show_full_result_count).
+    - Filtro por completado y date_hierarchy por fecha_creacion sobre
+      los índices tareas_compl_fecha_idx y tareas_fecha_idx.
+    - Selector de usuario con autocompletado en lugar de un <select> con
+      todos los usuarios.
+    - Acciones masivas con un único UPDATE.
+    """
+    list_display = ('titulo', 'usuario', 'completado', 'fecha_creacion')
+    list_select_related = ('usuario',)
+    list_filter = ('completado',)
+    date_hierarchy = 'fecha_creacion'
+    autocomplete_fields = ('usuario',)
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    actions = ('marcar_completadas', 'marcar_pendientes')
+
+    def _marcar(self, request, queryset, completado):
+        # queryset.update() no emite post_save: la caché se invalida aquí
+        # y los contadores los ajustan los triggers.
+        queryset = queryset.filter(completado=not completado)
+        usuarios = set(queryset.values_list('usuario_id', flat=True).distinct())
+        actualizadas = queryset.update(completado=completado, fecha_actualizacion=timezone.now())
+        for usuario_id in usuarios:
+            cache_tareas.invalidar_usuario(usuario_id)
+        estado = Tarea.texto_estado(completado).lower()
+        self.message_user(request, f'{actualizadas} tareas marcadas como {estado}s.', messages.SUCCESS)
+
+    @admin.action(description='Marcar como completadas', permissions=['change'])
+    def marcar_completadas(self, request, queryset):
+        self._marcar(request, queryset, True)
+
+    @admin.action(description='Marcar como pendientes', permissions=['change'])
+    def marcar_pendientes(self, request, queryset):
+        self._marcar(request, queryset, False)
+
+
+csrf_protect_m = method_decorator(csrf_protect)
+
+
+class ColectorSinTareas(NestedObjects):
+    """
+    NestedObjects que no recorre las tareas ni las tareas archivadas.
+
+    Se cuentan aparte y se borran por lotes; el resto de relaciones (y las
+    protegidas con PROTECT/RESTRICT) se recogen como en el admin de Django.
+    """
+    MODELOS_POR_LOTES = (Tarea, TareaArchivada)
+
+    def related_objects(self, related_model, related_fields, objs):
+        if related_model in self.MODELOS_POR_LOTES:
+            return related_model._base_manager.none()
+        return super().related_objects(related_model, related_fields, objs)
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UsuarioAdmin(UserAdmin):
+    """
+    UserAdmin que elimina las tareas por lotes (ver tareas/eliminacion.py).
+
+    La confirmación muestra el número de tareas en lugar de recorrerlas con
+    el colector, que las cargaría todas para listarlas. El borrado se hace
+    fuera del transaction.atomic con el que ModelAdmin.delete_view envuelve
+    el POST: dentro de él todos los lotes compartirían una única transacción
+    de escritura.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        usuarios = list(objs)
+        if not usuarios:
+            return [], {}, set(), []
+        colector = ColectorSinTareas(using=router.db_for_write(User), origin=objs)
+        colector.collect(usuarios)
+        perms_needed = set()
+
+        def formatear(obj):
+            opts = obj._meta
+            if self.admin_site.is_registered(obj.__class__):
+                if not self.admin_site.get_model_admin(obj.__class__).has_delete_permission(request, obj):
+                    perms_needed.add(opts.verbose_name)
+            return f'{capfirst(opts.verbose_name)}: {obj}'
+
+        to_delete = colector.nested(formatear)
+        protected = [formatear(obj) for obj in colector.protected]
+        model_count = {
+            modelo._meta.verbose_name_plural: len(objetos)
+            for modelo, objetos in colector.model_objs.items()
+        }
+        for modelo in ColectorSinTareas.MODELOS_POR_LOTES:
+            cantidad = modelo.objects.filter(usuario__in=usuarios).count()
+            if not cantidad:
+                continue
+            opts = modelo._meta
+            model_count[opts.verbose_name_plural] = cantidad
+            if not request.user.has_perm(f'{opts.app_label}.{get_permission_codename("delete", opts)}'):
+                perms_needed.add(opts.verbose_name)
+        return to_delete, model_count, perms_needed, protected
+
+    @csrf_protect_m
+    def delete_view(self, request, object_id, extra_context=None):
+        # Sin el transaction.atomic de ModelAdmin.delete_view: cada lote de
+        # eliminar_usuario confirma su propia transacción corta. Si se
+        # interrumpe, el usuario queda desactivado y basta con repetirlo.
+        return self._delete_view(request, object_id, extra_context)
+
+    def delete_model(self, request, obj):
+        eliminar_usuario(obj)
+
+    def delete_queryset(self, request, queryset):
+        for usuario in queryset:
+            eliminar_usuario(usuario)
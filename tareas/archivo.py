@@ -0,0 +1,67 @@
+"""
+Archivo de tareas completadas (tabla fría `tareas_archivadas`).
+
+archivar_lote mueve un lote acotado de tareas completadas hace más de un
+tiempo dado con INSERT ... SELECT y DELETE en una transacción corta, para
+que el bloqueo de escritura de SQLite nunca se retenga mucho tiempo. El
+comando `archivar_tareas` lo repite hasta agotar las candidatas.
+
+Al borrarse de `tareas`, los triggers existentes sacan las tareas del
+índice FTS (la búsqueda sobre archivadas usa icontains) y registran su
+lápida, de modo que la sincronización incremental las trata como
+eliminadas. ResumenTareas las sigue contando (migración 0008).
+"""
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from . import cache as cache_tareas
+from .models import Tarea, TareaArchivada
+
+COLUMNAS = (
+    'id', 'usuario_id', 'titulo', 'descripcion', 'completado',
+    'fecha_creacion', 'fecha_actualizacion',
+)
+
+
+def candidatas(antes_de):
+    """Tareas completadas cuya última actualización es anterior a `antes_de`."""
+    return Tarea.objects.filter(completado=True, fecha_actualizacion__lt=antes_de)
+
+
+def archivar_lote(antes_de, tamano, desde_id=0):
+    """
+    Archiva hasta `tamano` candidatas con id mayor que `desde_id`.
+
+    Retorna (archivadas, ultimo_id); ultimo_id es None si no quedaban
+    candidatas. Las filas se bloquean (SELECT ... FOR UPDATE donde el motor
+    lo admite) para que no cambien entre la copia y el borrado.
+    """
+    db = router.db_for_write(Tarea)
+    connection = connections[db]
+    quote_name = connection.ops.quote_name
+    with transaction.atomic(using=db):
+        filas = list(
+            candidatas(antes_de).using(db).filter(id__gt=desde_id)
+            .order_by('id').select_for_update().values_list('id', 'usuario_id')[:tamano]
+        )
+        if not filas:
+            return 0, None
+        ids = [tarea_id for tarea_id, _ in filas]
+        marcadores = ', '.join(['%s'] * len(ids))
+        columnas = ', '.join(quote_name(columna) for columna in COLUMNAS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote_name(TareaArchivada._meta.db_table)} '
+                f'({columnas}, {quote_name("fecha_archivado")}) '
+                f'SELECT {columnas}, %s FROM {quote_name(Tarea._meta.db_table)} '
+                f'WHERE {quote_name("id")} IN ({marcadores})',
+                [connection.ops.adapt_datetimefield_value(timezone.now()), *ids],
+            )
+            cursor.execute(
+                f'DELETE FROM {quote_name(Tarea._meta.db_table)} WHERE {quote_name("id")} IN ({marcadores})',
+                ids,
+            )
+        # El DELETE directo no emite post_delete.
+        for usuario_id in {usuario_id for _, usuario_id in filas}:
+            cache_tareas.invalidar_usuario(usuario_id)
+    return len(ids), ids[-1]
@@ -0,0 +1,218 @@
+"""
+Autenticación JWT con caché de usuarios.
+
+JWTAuthentication de SimpleJWT consulta la tabla de usuarios en cada
+petición aunque el token ya esté verificado. Esta variante resuelve el
+usuario desde una caché LRU con caducidad (TTL) en el propio proceso y,
+opcionalmente, desde una caché compartida de Django entre procesos.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import EstadisticasCache
+from .perfil import medir
+
+CONFIGURACION_POR_DEFECTO = {
+    # Número máximo de usuarios en la caché del proceso.
+    'MAX_USUARIOS': 10000,
+    # Segundos que un usuario permanece en caché sin volver a leerse.
+    'TTL': 60,
+    # Alias de CACHES para compartir usuarios entre procesos (None = desactivado).
+    'CACHE_COMPARTIDA': None,
+}
+
+
+def _configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'TAREAS_AUTH_CACHE', {})}
+
+
+class CacheUsuarios:
+    """
+    Caché LRU con TTL de usuarios autenticados, con un nivel compartido opcional.
+
+    Devuelve siempre una copia del usuario para que una petición no pueda
+    modificar el objeto que verán las siguientes. Las claves se normalizan
+    a texto porque SimpleJWT guarda el id del usuario como cadena en el token.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.estadisticas_local = EstadisticasCache()
+        self.estadisticas_compartida = EstadisticasCache()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Vacía la caché y vuelve a leer la configuración."""
+        configuracion = _configuracion()
+        with self._lock:
+            self._entradas = OrderedDict()
+            self.max_usuarios = configuracion['MAX_USUARIOS']
+            self.ttl = configuracion['TTL']
+            self.alias_compartida = configuracion['CACHE_COMPARTIDA']
+        self.estadisticas_local.reiniciar()
+        self.estadisticas_compartida.reiniciar()
+
+    @staticmethod
+    def _clave(usuario_id):
+        return f'tareas:auth:usuario:{usuario_id}'
+
+    def _obtener_local(self, usuario_id):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(usuario_id)
+            if entrada is not None and entrada[0] > ahora:
+                self._entradas.move_to_end(usuario_id)
+                usuario = entrada[1]
+            else:
+                if entrada is not None:
+                    del self._entradas[usuario_id]
+                usuario = None
+        self.estadisticas_local.registrar(usuario is not None)
+        return usuario
+
+    def _recibir_compartido(self, usuario_id, usuario):
+        self.estadisticas_compartida.registrar(usuario is not None)
+        if usuario is not None:
+            self._guardar_local(usuario_id, usuario)
+            return copy.copy(usuario)
+        return None
+
+    def obtener(self, usuario_id):
+        usuario_id = str(usuario_id)
+        usuario = self._obtener_local(usuario_id)
+        if usuario is not None:
+            return copy.copy(usuario)
+        if self.alias_compartida is None:
+            return None
+        usuario = caches[self.alias_compartida].get(self._clave(usuario_id))
+        return self._recibir_compartido(usuario_id, usuario)
+
+    async def aobtener(self, usuario_id):
+        """Versión asíncrona de obtener(); usa la API asíncrona de la caché compartida."""
+        usuario_id = str(usuario_id)
+        usuario = self._obtener_local(usuario_id)
+        if usuario is not None:
+            return copy.copy(usuario)
+        if self.alias_compartida is None:
+            return None
+        usuario = await caches[self.alias_compartida].aget(self._clave(usuario_id))
+        return self._recibir_compartido(usuario_id, usuario)
+
+    def guardar(self, usuario_id, usuario):
+        usuario_id = str(usuario_id)
+        self._guardar_local(usuario_id, copy.copy(usuario))
+        if self.alias_compartida is not None:
+            caches[self.alias_compartida].set(self._clave(usuario_id), usuario, self.ttl)
+
+    async def aguardar(self, usuario_id, usuario):
+        usuario_id = str(usuario_id)
+        self._guardar_local(usuario_id, copy.copy(usuario))
+        if self.alias_compartida is not None:
+            await caches[self.alias_compartida].aset(self._clave(usuario_id), usuario, self.ttl)
+
+    def _guardar_local(self, usuario_id, usuario):
+        with self._lock:
+            self._entradas[usuario_id] = (time.monotonic() + self.ttl, usuario)
+            self._entradas.move_to_end(usuario_id)
+            while len(self._entradas) > self.max_usuarios:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, usuario_id):
+        usuario_id = str(usuario_id)
+        with self._lock:
+            self._entradas.pop(usuario_id, None)
+        if self.alias_compartida is not None:
+            caches[self.alias_compartida].delete(self._clave(usuario_id))
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+usuarios = CacheUsuarios()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que evita la consulta del usuario en cada petición.
+
+    La caché se invalida al guardar o eliminar el usuario (incluida su
+    desactivación). Los cambios hechos sin señales, como
+    User.objects.update(), u otros procesos sin caché compartida tardan
+    como máximo TTL segundos en verse.
+    """
+
+    def authenticate(self, request):
+        with medir('auth'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        usuario_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if usuario_id is None:
+            return super().get_user(validated_token)
+
+        usuario = usuarios.obtener(usuario_id)
+        if usuario is None:
+            usuario = super().get_user(validated_token)
+            usuarios.guardar(usuario_id, usuario)
+            return usuario
+        self.comprobar_usuario(validated_token, usuario)
+        return usuario
+
+    @staticmethod
+    def comprobar_usuario(validated_token, usuario):
+        """Mismas comprobaciones que JWTAuthentication.get_user tras leer el usuario."""
+        if api_settings.CHECK_USER_IS_ACTIVE and not usuario.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(usuario.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+    async def aauthenticate(self, request):
+        """
+        Versión asíncrona de authenticate() para vistas async.
+
+        Validar el token no toca la base de datos; el usuario se lee de la
+        caché o, si no está, con el ORM asíncrono.
+        """
+        with medir('auth'):
+            return await self._aautenticar(request)
+
+    async def _aautenticar(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            usuario_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        usuario = await usuarios.aobtener(usuario_id)
+        if usuario is None:
+            try:
+                usuario = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: usuario_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            self.comprobar_usuario(validated_token, usuario)
+            await usuarios.aguardar(usuario_id, usuario)
+            return usuario
+        self.comprobar_usuario(validated_token, usuario)
+        return usuario
@@ -0,0 +1,132 @@
+"""
+Caché versionada por usuario para el listado de tareas.
+
+Cada usuario tiene un contador de versión que forma parte de la clave de
+todas sus páginas en caché. Al modificar cualquiera de sus tareas basta con
+incrementar ese contador: las páginas anteriores dejan de ser alcanzables
+(y el backend las expulsa por LRU) sin necesidad de recorrer claves.
+
+Las páginas pueden vivir en la memoria de cada proceso, pero los contadores
+van en el alias VERSIONES_ALIAS, compartido entre procesos: así una
+escritura atendida por un proceso (o por procesar_trabajos) invalida las
+páginas de todos. Sin ese alias en CACHES se usa el de las páginas.
+"""
+import hashlib
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = 'tareas'
+VERSIONES_ALIAS = 'tareas_versiones'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _cache_versiones():
+    return caches[VERSIONES_ALIAS if VERSIONES_ALIAS in settings.CACHES else CACHE_ALIAS]
+
+
+def _clave_version(usuario_id):
+    return f'tareas:version:{usuario_id}'
+
+
+class EstadisticasCache:
+    """Contadores de aciertos y fallos de la caché en este proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.aciertos = 0
+            self.fallos = 0
+
+    def registrar(self, acierto):
+        with self._lock:
+            if acierto:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+
+    @property
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+
+estadisticas = EstadisticasCache()
+
+
+def _nueva_version():
+    """Hora actual en nanosegundos con 16 bits aleatorios para desempatar entre procesos."""
+    return time.time_ns() << 16 | random.getrandbits(16)
+
+
+def version_usuario(usuario_id):
+    """
+    Retorna la versión actual de las tareas del usuario.
+
+    Si el contador no existe (o fue expulsado) se inicializa con una versión
+    nueva, creciente con la hora, de modo que nunca vuelve a un valor ya usado.
+    """
+    cache = _cache_versiones()
+    clave = _clave_version(usuario_id)
+    version = cache.get(clave)
+    if version is None:
+        version = _nueva_version()
+        if not cache.add(clave, version, timeout=None):
+            version = cache.get(clave, version)
+    return version
+
+
+def _renovar_version(usuario_id):
+    _cache_versiones().set(_clave_version(usuario_id), _nueva_version(), timeout=None)
+
+
+def invalidar_usuario(usuario_id):
+    """
+    Invalida todas las páginas en caché del usuario.
+
+    La versión se renueva de inmediato y de nuevo al confirmar la
+    transacción, para que una lectura concurrente que haya guardado datos
+    previos al commit tampoco sobreviva.
+
+    No se usa incr(): en FileBasedCache (y en LocMemCache o DatabaseCache)
+    es un get seguido de un set, y dos procesos que incrementan a la vez
+    pueden perder un incremento; una página guardada entre ambos seguiría
+    siendo válida tras la segunda escritura. Cada invalidación escribe en
+    su lugar un valor nuevo con un único set, que no depende del anterior:
+    si dos escrituras coinciden gana una de ellas, pero las dos versiones
+    difieren de cualquiera que se leyera antes.
+    """
+    _renovar_version(usuario_id)
+    transaction.on_commit(lambda: _renovar_version(usuario_id))
+
+
+def clave_listado(request):
+    """Clave de caché para una petición de listado (usuario, versión, URL y filtros)."""
+    usuario_id = request.user.pk
+    parametros = sorted(
+        (nombre, sorted(valores)) for nombre, valores in request.query_params.lists()
+    )
+    firma = hashlib.sha256(
+        f'{request.get_host()}{request.path}{parametros}'.encode('utf-8')
+    ).hexdigest()
+    return f'tareas:listado:{usuario_id}:{version_usuario(usuario_id)}:{firma}'
+
+
+def obtener(clave):
+    datos = _cache().get(clave)
+    estadisticas.registrar(datos is not None)
+    return datos
+
+
+def guardar(clave, datos):
+    _cache().set(clave, datos)
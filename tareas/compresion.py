@@ -0,0 +1,205 @@
+"""
+Compresión de respuestas negociada por petición.
+
+CompresionMiddleware comprime con brotli (si está instalado) o gzip las
+respuestas de las rutas configuradas que superan un tamaño mínimo, según
+la cabecera Accept-Encoding del cliente y sus valores q. Por defecto cubre
+las vistas síncronas y las asíncronas, que comparten ETag y precondiciones.
+
+Dos codificaciones del mismo recurso no pueden compartir un ETag fuerte
+(RFC 9110, 8.8.1). GZipMiddleware de Django lo debilita, pero en esta API
+el ETag identifica el estado de la tarea y se usa en If-Match, donde un
+ETag débil nunca coincide. Por eso a los ETag fuertes de las respuestas
+comprimidas se les añade la codificación ("5-1700000000000000-gzip"), y
+el sufijo se quita de If-Match/If-None-Match antes de que la vista los
+compare. Los ETag débiles (listados) no cambian. La cabecera
+Vary: Accept-Encoding impide que las cachés mezclen representaciones.
+Tampoco se añade la mitigación de BREACH: estas rutas no devuelven
+secretos en el cuerpo (el JWT viaja en la cabecera Authorization).
+"""
+import gzip
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+CONFIGURACION_POR_DEFECTO = {
+    # Prefijos de ruta cuyas respuestas se comprimen.
+    'RUTAS': ('/api/tareas/', '/api/async/tareas/'),
+    # Bytes por debajo de los cuales no compensa comprimir.
+    'MINIMO': 1024,
+    'NIVEL_GZIP': 6,
+    'NIVEL_BROTLI': 4,
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'TAREAS_COMPRESION', {})}
+
+
+def codificaciones_disponibles():
+    """Codificaciones soportadas, en orden de preferencia del servidor."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def elegir_codificacion(accept_encoding, disponibles=None):
+    """
+    Retorna la codificación a usar según Accept-Encoding, o None.
+
+    Gana el valor q más alto; a igualdad, el orden de `disponibles`. `*`
+    se aplica a las codificaciones no mencionadas y q=0 las excluye.
+    """
+    disponibles = disponibles or codificaciones_disponibles()
+    calidades = {}
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.partition(';')
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        calidad = 1.0
+        for parametro in parametros.split(';'):
+            clave, _, valor = parametro.partition('=')
+            if clave.strip().lower() == 'q':
+                try:
+                    calidad = float(valor)
+                except ValueError:
+                    calidad = 0.0
+        calidades[nombre] = calidad
+
+    comodin = calidades.get('*', 0.0)
+    mejor, mejor_calidad = None, 0.0
+    for codificacion in disponibles:
+        calidad = calidades.get(codificacion, comodin)
+        if calidad > mejor_calidad:
+            mejor, mejor_calidad = codificacion, calidad
+    return mejor
+
+
+# Sufijo de codificación de un ETag fuerte (no precedido de W/).
+_SUFIJO_ETAG = re.compile(r'(?<!W/)("[^"]*)-(?:br|gzip)"')
+
+
+def etag_codificado(etag, codificacion):
+    """ETag de la representación con `codificacion`; los débiles no cambian."""
+    if etag.startswith('W/') or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{codificacion}"'
+
+
+def quitar_codificacion(cabecera):
+    """Quita el sufijo de codificación de los ETag fuertes de If-Match/If-None-Match."""
+    return _SUFIJO_ETAG.sub(r'\1"', cabecera)
+
+
+def comprimir(contenido, codificacion, nivel):
+    if codificacion == 'br':
+        return brotli.compress(contenido, quality=nivel)
+    return gzip.compress(contenido, compresslevel=nivel, mtime=0)
+
+
+def _comprimir_secuencia_gzip(secuencia, nivel):
+    # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib.
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    for fragmento in secuencia:
+        datos = compresor.compress(fragmento)
+        if datos:
+            yield datos
+    yield compresor.flush()
+
+
+def _comprimir_secuencia_brotli(secuencia, nivel):
+    compresor = brotli.Compressor(quality=nivel)
+    for fragmento in secuencia:
+        datos = compresor.process(fragmento)
+        if datos:
+            yield datos
+    yield compresor.finish()
+
+
+class CompresionMiddleware:
+    """
+    Comprime las respuestas de TAREAS_COMPRESION['RUTAS'] (ver módulo).
+
+    Admite las dos cadenas de Django: bajo ASGI espera a get_response sin
+    adaptarlo a un hilo, así que no añade saltos entre hilos a las vistas
+    asíncronas de /api/async/tareas/.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        ajustes = configuracion()
+        self.rutas = tuple(ajustes['RUTAS'])
+        self.minimo = ajustes['MINIMO']
+        self.niveles = {'gzip': ajustes['NIVEL_GZIP'], 'br': ajustes['NIVEL_BROTLI']}
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not request.path.startswith(self.rutas):
+            return self.get_response(request)
+        if_none_match = self.preparar(request)
+        return self.procesar(request, self.get_response(request), if_none_match)
+
+    async def __acall__(self, request):
+        if not request.path.startswith(self.rutas):
+            return await self.get_response(request)
+        if_none_match = self.preparar(request)
+        return self.procesar(request, await self.get_response(request), if_none_match)
+
+    @staticmethod
+    def preparar(request):
+        """Quita la codificación de las precondiciones; retorna el If-None-Match original."""
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        for cabecera in ('HTTP_IF_MATCH', 'HTTP_IF_NONE_MATCH'):
+            if cabecera in request.META:
+                request.META[cabecera] = quitar_codificacion(request.META[cabecera])
+        return if_none_match
+
+    def procesar(self, request, response, if_none_match):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.status_code == 304 and if_none_match and response.has_header('ETag'):
+            # El 304 lleva el ETag de la representación que tiene el cliente.
+            for codificacion in codificaciones_disponibles():
+                if etag_codificado(response['ETag'], codificacion) in if_none_match:
+                    response['ETag'] = etag_codificado(response['ETag'], codificacion)
+                    break
+            return response
+        if response.has_header('Content-Encoding') or getattr(response, 'is_async', False):
+            return response
+        if not response.streaming and len(response.content) < self.minimo:
+            return response
+        codificacion = elegir_codificacion(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacion is None:
+            return response
+        nivel = self.niveles[codificacion]
+
+        if response.streaming:
+            if codificacion == 'br':
+                contenido = _comprimir_secuencia_brotli(response.streaming_content, nivel)
+            else:
+                contenido = _comprimir_secuencia_gzip(response.streaming_content, nivel)
+            response.streaming_content = contenido
+            if response.has_header('Content-Length'):
+                del response['Content-Length']
+        else:
+            comprimido = comprimir(response.content, codificacion, nivel)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response['Content-Length'] = str(len(comprimido))
+        response['Content-Encoding'] = codificacion
+        if response.has_header('ETag'):
+            response['ETag'] = etag_codificado(response['ETag'], codificacion)
+        return response
@@ -0,0 +1,70 @@
+"""
+Validadores HTTP (ETag / Last-Modified) para las tareas.
+
+Permiten responder 304 Not Modified a las peticiones condicionales antes
+de serializar nada, y 412 Precondition Failed a las escrituras con un
+If-Match desactualizado (concurrencia optimista).
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .sincronizacion import microsegundos
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'La tarea fue modificada por otra petición.'
+    default_code = 'precondition_failed'
+
+
+def _marca(fecha):
+    """Marca de tiempo en microsegundos, o 0 si no hay fecha."""
+    return microsegundos(fecha) if fecha else 0
+
+
+def etag_tarea(tarea_id, fecha_actualizacion):
+    """ETag fuerte de una tarea, derivado de su id y su fecha de actualización."""
+    return f'"{tarea_id}-{_marca(fecha_actualizacion)}"'
+
+
+def etag_listado(request, *marcas):
+    """
+    ETag de una página del listado.
+
+    Combina los parámetros de la petición (página, cursor, filtros) con las
+    `marcas` del conjunto: fechas (última actualización, última
+    eliminación) o recuentos de filas. Crear, modificar o eliminar tareas
+    del conjunto lo cambia.
+    """
+    valores = '|'.join(str(marca) if isinstance(marca, int) else str(_marca(marca)) for marca in marcas)
+    firma = hashlib.sha256(
+        f'{request.get_full_path()}|{valores}'.encode('utf-8')
+    ).hexdigest()[:32]
+    return f'W/"{firma}"'
+
+
+def cabeceras(etag, fecha_actualizacion=None):
+    """Cabeceras de validación para una respuesta."""
+    cabeceras = {'ETag': etag}
+    if fecha_actualizacion is not None:
+        cabeceras['Last-Modified'] = http_date(fecha_actualizacion.timestamp())
+    return cabeceras
+
+
+def respuesta_condicional(request, etag, fecha_actualizacion=None):
+    """
+    Evalúa las precondiciones de la petición.
+
+    Retorna la respuesta 304/412 que corresponda, o None si la petición
+    debe procesarse normalmente.
+    """
+    last_modified = int(fecha_actualizacion.timestamp()) if fecha_actualizacion else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        for nombre, valor in cabeceras(etag, fecha_actualizacion).items():
+            response[nombre] = valor
+    return response
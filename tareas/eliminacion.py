@@ -0,0 +1,97 @@
+"""
+Eliminación de usuarios con muchas tareas.
+
+`usuario.delete()` deja el CASCADE al colector de Django, que carga en
+memoria todas las tareas del usuario (para emitir post_delete) y las
+borra en una única transacción: con decenas de miles de tareas eso son
+segundos de SQLite bloqueado y un pico de memoria proporcional.
+
+eliminar_usuario desactiva primero al usuario (ya no puede crear tareas)
+y borra sus tareas y tareas archivadas en lotes de tamaño fijo, cada uno
+con un DELETE ... WHERE id IN (...) en su propia transacción corta y sin
+instanciar modelos. Los triggers de las migraciones 0005 a 0008 mantienen
+el índice FTS, los contadores de ResumenTareas y las lápidas igual que en
+cualquier otro borrado; en los motores sin trigger de lápidas se insertan
+aquí, como haría la señal post_delete. Al final `usuario.delete()` ya solo
+encuentra las filas restantes (resumen, sesiones, permisos...).
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+
+from . import authentication
+from . import cache as cache_tareas
+from .models import MOTORES_CON_LAPIDAS, Tarea, TareaArchivada, TareaEliminada
+
+CONFIGURACION_POR_DEFECTO = {
+    # Filas por DELETE; cada lote es una transacción.
+    'LOTE': 1000,
+    # Segundos entre lotes para dejar paso a otras escrituras.
+    'PAUSA': 0.0,
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'TAREAS_ELIMINACION', {})}
+
+
+def _borrar_lote(modelo, usuario_id, tamano):
+    """Borra hasta `tamano` filas de `modelo` del usuario; retorna cuántas."""
+    db = router.db_for_write(modelo)
+    connection = connections[db]
+    quote_name = connection.ops.quote_name
+    with transaction.atomic(using=db):
+        ids = list(
+            modelo.objects.using(db).filter(usuario_id=usuario_id)
+            .order_by('id').values_list('id', flat=True)[:tamano]
+        )
+        if not ids:
+            return 0
+        marcadores = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {quote_name(modelo._meta.db_table)} WHERE {quote_name("id")} IN ({marcadores})',
+                ids,
+            )
+        if modelo is Tarea and connection.vendor not in MOTORES_CON_LAPIDAS:
+            TareaEliminada.objects.using(db).bulk_create(
+                TareaEliminada(usuario_id=usuario_id, tarea_id=tarea_id) for tarea_id in ids
+            )
+    return len(ids)
+
+
+def eliminar_usuario(usuario, lote=None, pausa=None):
+    """
+    Elimina `usuario` borrando antes sus tareas por lotes (ver módulo).
+
+    Retorna un diccionario con las tareas y archivadas borradas, el número
+    de lotes y la duración del lote más largo en segundos (`bloqueo_maximo`,
+    el tiempo máximo que se retiene el bloqueo de escritura).
+    """
+    ajustes = configuracion()
+    lote = lote or ajustes['LOTE']
+    pausa = ajustes['PAUSA'] if pausa is None else pausa
+    usuario_id = usuario.pk
+
+    User.objects.filter(pk=usuario_id).update(is_active=False)
+    authentication.usuarios.invalidar(usuario_id)
+
+    resultado = {'tareas': 0, 'archivadas': 0, 'lotes': 0, 'bloqueo_maximo': 0.0}
+    for modelo, clave in ((Tarea, 'tareas'), (TareaArchivada, 'archivadas')):
+        while True:
+            inicio = time.perf_counter()
+            borradas = _borrar_lote(modelo, usuario_id, lote)
+            if not borradas:
+                break
+            resultado['bloqueo_maximo'] = max(resultado['bloqueo_maximo'], time.perf_counter() - inicio)
+            resultado[clave] += borradas
+            resultado['lotes'] += 1
+            if pausa:
+                time.sleep(pausa)
+
+    # El DELETE directo no emite post_delete.
+    cache_tareas.invalidar_usuario(usuario_id)
+    usuario.delete()
+    return resultado
@@ -0,0 +1,106 @@
+"""
+Esquema OpenAPI pregenerado.
+
+drf_yasg reconstruye el esquema completo (introspección de TareaViewSet y de
+todos sus swagger_auto_schema) en cada petición a /swagger.json. Aquí el
+documento se genera una sola vez, con el comando generar_esquema durante el
+despliegue, y se sirve desde disco con un ETag fuerte y caché de larga
+duración. Si el artefacto no existe, el esquema se genera en el primer acceso
+y se memoriza para el resto de la vida del proceso.
+"""
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.renderers import SwaggerJSONRenderer, SwaggerYAMLRenderer
+
+from .condicional import respuesta_condicional
+
+# Extensión de la URL -> (nombre del artefacto, renderer de drf_yasg)
+FORMATOS = {
+    '.json': ('swagger.json', SwaggerJSONRenderer),
+    '.yaml': ('swagger.yaml', SwaggerYAMLRenderer),
+}
+
+_documentos = {}
+_lock = threading.Lock()
+
+
+def directorio_artefactos():
+    return Path(getattr(settings, 'TAREAS_ESQUEMA_DIR', Path(settings.BASE_DIR) / 'esquema'))
+
+
+def generar_esquema():
+    """Genera el esquema sin petición, igual para todos los clientes."""
+    generador = swagger_settings.DEFAULT_GENERATOR_CLASS(swagger_settings.DEFAULT_INFO)
+    return generador.get_schema(request=None, public=True)
+
+
+def renderizar(esquema, formato):
+    _, renderer = FORMATOS[formato]
+    return renderer().render(esquema)
+
+
+def escribir_artefactos(directorio=None):
+    """Escribe swagger.json y swagger.yaml y retorna sus rutas."""
+    directorio = Path(directorio or directorio_artefactos())
+    directorio.mkdir(parents=True, exist_ok=True)
+    esquema = generar_esquema()
+    rutas = []
+    for formato, (nombre, _) in FORMATOS.items():
+        ruta = directorio / nombre
+        ruta.write_bytes(renderizar(esquema, formato))
+        rutas.append(ruta)
+    reiniciar()
+    return rutas
+
+
+def obtener_documento(formato):
+    """
+    Retorna (contenido, etag, origen) del esquema en el formato pedido.
+
+    El origen es 'artefacto' si se leyó del disco o 'memoria' si hubo que
+    generarlo en el proceso.
+    """
+    documento = _documentos.get(formato)
+    if documento is not None:
+        return documento
+    with _lock:
+        documento = _documentos.get(formato)
+        if documento is None:
+            nombre, _ = FORMATOS[formato]
+            ruta = directorio_artefactos() / nombre
+            if ruta.is_file():
+                contenido, origen = ruta.read_bytes(), 'artefacto'
+            else:
+                contenido, origen = renderizar(generar_esquema(), formato), 'memoria'
+            etag = '"%s"' % hashlib.sha256(contenido).hexdigest()[:32]
+            documento = _documentos[formato] = (contenido, etag, origen)
+    return documento
+
+
+def reiniciar():
+    """Olvida los documentos memorizados (p. ej. tras regenerar los artefactos)."""
+    with _lock:
+        _documentos.clear()
+
+
+@require_safe
+def esquema_view(request, format):
+    """Sirve el esquema pregenerado con ETag fuerte y Cache-Control."""
+    if format not in FORMATOS:
+        raise Http404
+    contenido, etag, origen = obtener_documento(format)
+
+    respuesta = respuesta_condicional(request, etag)
+    if respuesta is None:
+        respuesta = HttpResponse(contenido, content_type=FORMATOS[format][1].media_type)
+        respuesta['ETag'] = etag
+    max_age = getattr(settings, 'TAREAS_ESQUEMA_MAX_AGE', 86400)
+    respuesta['Cache-Control'] = f'public, max-age={max_age}'
+    respuesta['X-Esquema-Origen'] = origen
+    return respuesta
@@ -0,0 +1,54 @@
+import shlex
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Tarea
+
+
+class BusquedaTextoFilter(BaseFilterBackend):
+    """
+    Búsqueda de texto completo sobre título y descripción (?search=).
+
+    En SQLite usa el índice FTS5 `tareas_fts` y ordena por relevancia
+    (bm25); en otros motores, y para las tareas archivadas (fuera del
+    índice), recurre a icontains. Cada término se busca como prefijo y
+    todos deben aparecer.
+
+    La paginación por cursor necesita su propio orden (fecha_creacion, id),
+    así que TareaViewSet.list rechaza ?search= junto con ?cursor=.
+    """
+    search_param = 'search'
+
+    def get_search_terms(self, request):
+        # Las vistas async reciben un HttpRequest de Django, sin query_params.
+        params = getattr(request, 'query_params', request.GET)
+        texto = params.get(self.search_param, '')
+        try:
+            terminos = shlex.split(texto)
+        except ValueError:
+            terminos = texto.split()
+        return [termino for termino in terminos if termino.strip()]
+
+    @staticmethod
+    def consulta_fts(terminos):
+        """Convierte los términos en una consulta FTS5 segura (sin operadores)."""
+        return ' '.join('"{}"*'.format(termino.replace('"', '""')) for termino in terminos)
+
+    def filter_queryset(self, request, queryset, view):
+        terminos = self.get_search_terms(request)
+        if not terminos:
+            return queryset
+
+        # El motor de la conexión que ejecutará la consulta (el router puede
+        # enviarla a 'lectura'), no el de 'default'.
+        if connections[queryset.db].vendor == 'sqlite' and queryset.model is Tarea:
+            return queryset.filter(
+                busqueda__indice__match=self.consulta_fts(terminos)
+            ).order_by('busqueda__rank', '-fecha_creacion', '-id')
+
+        condiciones = Q()
+        for termino in terminos:
+            condiciones &= Q(titulo__icontains=termino) | Q(descripcion__icontains=termino)
+        return queryset.filter(condiciones)
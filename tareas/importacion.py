@@ -0,0 +1,142 @@
+"""
+Importación masiva de tareas desde NDJSON o CSV (acción `importar`).
+
+El cuerpo de la petición se lee línea a línea desde el stream, sin
+cargarlo entero en memoria. Las filas se agrupan en bloques de LOTE: cada
+fila se valida con las reglas de TareaSerializer (validate_titulo,
+validate_descripcion...) y las válidas del bloque se insertan con un
+bulk_create en una transacción propia, de modo que el bloqueo de escritura
+no se retiene mientras se espera al cliente. Las filas no válidas se
+omiten y se informan con su número (las primeras MAX_ERRORES).
+
+Los triggers mantienen el índice de búsqueda y los contadores como en
+cualquier otra inserción.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from . import cache as cache_tareas
+from .models import Tarea
+from .serializers import TareaSerializer
+
+CONFIGURACION_POR_DEFECTO = {
+    # Filas por bloque; cada bloque se inserta en una transacción.
+    'LOTE': 1000,
+    # Errores por fila que se detallan en la respuesta.
+    'MAX_ERRORES': 100,
+    # Bytes máximos por línea del cuerpo.
+    'MAX_LINEA': 65536,
+}
+
+FORMATOS = {
+    'application/x-ndjson': 'ndjson',
+    'application/jsonlines': 'ndjson',
+    'text/csv': 'csv',
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'TAREAS_IMPORTACION', {})}
+
+
+class LineaDemasiadoLarga(ValidationError):
+    default_detail = 'Una línea supera el tamaño máximo permitido.'
+
+
+def lineas_de(stream, maximo):
+    """Líneas decodificadas del stream, leídas de una en una (sin BOM inicial)."""
+    primera = True
+    while True:
+        linea = stream.readline(maximo + 1)
+        if not linea:
+            return
+        if len(linea) > maximo:
+            raise LineaDemasiadoLarga()
+        texto = linea.decode('utf-8-sig' if primera else 'utf-8', errors='replace')
+        primera = False
+        yield texto
+
+
+def filas_ndjson(lineas):
+    """(número, datos) por cada línea no vacía; datos es None si no es un objeto JSON."""
+    numero = 0
+    for linea in lineas:
+        if not linea.strip():
+            continue
+        numero += 1
+        try:
+            datos = json.loads(linea)
+        except ValueError:
+            datos = None
+        yield numero, datos if isinstance(datos, dict) else None
+
+
+def filas_csv(lineas):
+    """(número, datos) por registro; la primera línea es la cabecera."""
+    lector = csv.DictReader(lineas)
+    if lector.fieldnames is None or not {'titulo', 'descripcion'} <= set(lector.fieldnames):
+        raise ValidationError({'detail': 'La cabecera CSV debe incluir las columnas titulo y descripcion.'})
+    for numero, fila in enumerate(lector, start=1):
+        # Una celda vacía de completado equivale a omitirla (valor por defecto).
+        yield numero, {campo: valor for campo, valor in fila.items() if campo and valor != ''}
+
+
+def _bloques(filas, tamano):
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def importar(usuario, stream, formato):
+    """
+    Importa las tareas del stream para `usuario`.
+
+    Retorna {'creadas', 'rechazadas', 'errores'}; cada error es
+    {'fila': número, 'errores': {...}} con la numeración de filas del
+    archivo (sin contar la cabecera CSV). Si el cuerpo no se puede seguir
+    leyendo (línea demasiado larga, CSV mal formado) se detiene y añade
+    'interrumpida' con el motivo; los bloques anteriores ya están guardados.
+    """
+    ajustes = configuracion()
+    lineas = lineas_de(stream, ajustes['MAX_LINEA'])
+    filas = filas_csv(lineas) if formato == 'csv' else filas_ndjson(lineas)
+    # Un solo serializer para todas las filas: mismas reglas, sin crear
+    # un objeto por fila.
+    serializer = TareaSerializer()
+    resultado = {'creadas': 0, 'rechazadas': 0, 'errores': []}
+
+    try:
+        for bloque in _bloques(filas, ajustes['LOTE']):
+            tareas = []
+            for numero, datos in bloque:
+                if datos is None:
+                    detalle = {'non_field_errors': ['Se esperaba un objeto JSON.']}
+                else:
+                    try:
+                        tareas.append(Tarea(usuario=usuario, **serializer.run_validation(datos)))
+                        continue
+                    except ValidationError as exc:
+                        detalle = exc.detail
+                resultado['rechazadas'] += 1
+                if len(resultado['errores']) < ajustes['MAX_ERRORES']:
+                    resultado['errores'].append({'fila': numero, 'errores': detalle})
+            if tareas:
+                with transaction.atomic():
+                    Tarea.objects.bulk_create(tareas)
+                    # bulk_create no emite post_save.
+                    cache_tareas.invalidar_usuario(usuario.pk)
+                resultado['creadas'] += len(tareas)
+    except LineaDemasiadoLarga as exc:
+        resultado['interrumpida'] = str(exc.detail)
+    except csv.Error as exc:
+        resultado['interrumpida'] = f'CSV mal formado: {exc}'
+    return resultado
@@ -0,0 +1,35 @@
+"""Utilidades compartidas por los comandos bench_*."""
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connections
+
+
+@contextmanager
+def base_de_datos_temporal(opciones=None):
+    """
+    Apunta las conexiones a un archivo SQLite temporal ya migrado.
+
+    Las medidas no tocan la base de datos real y parten siempre del mismo
+    estado. `opciones` sustituye a OPTIONS de 'default' si se indica. Al
+    salir se restaura la configuración y se elimina el archivo.
+    """
+    originales = {alias: dict(connections[alias].settings_dict) for alias in connections}
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / 'bench.sqlite3'
+        connections.close_all()
+        connections['default'].settings_dict['NAME'] = str(ruta)
+        if opciones is not None:
+            connections['default'].settings_dict['OPTIONS'] = dict(opciones)
+        if 'lectura' in connections:
+            connections['lectura'].settings_dict.update(NAME=f'file:{ruta}?mode=ro', OPTIONS={'uri': True})
+        try:
+            call_command('migrate', verbosity=0)
+            yield ruta
+        finally:
+            connections.close_all()
+            for alias, original in originales.items():
+                connections[alias].settings_dict.clear()
+                connections[alias].settings_dict.update(original)
@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tareas.archivo import archivar_lote, candidatas
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve a `tareas_archivadas` las tareas completadas cuya última "
+        "actualización supera una antigüedad, en lotes acotados con una "
+        "transacción corta por lote."
+    )
+
+    def add_arguments(self, parser):
+        ajustes = getattr(settings, 'TAREAS_ARCHIVO', {})
+        parser.add_argument(
+            '--dias', type=int, default=ajustes.get('DIAS', 365),
+            help="Antigüedad mínima en días desde la última actualización",
+        )
+        parser.add_argument(
+            '--lote', type=int, default=ajustes.get('LOTE', 500),
+            help="Tareas por lote (cada lote es una transacción)",
+        )
+        parser.add_argument(
+            '--pausa', type=float, default=ajustes.get('PAUSA', 0.05),
+            help="Segundos de espera entre lotes para dejar paso a otras escrituras",
+        )
+        parser.add_argument('--max-lotes', type=int, default=None, help="Detenerse tras N lotes")
+        parser.add_argument(
+            '--simular', action='store_true',
+            help="Solo cuenta las tareas que se archivarían",
+        )
+
+    def handle(self, *args, **options):
+        if options['dias'] < 0 or options['lote'] < 1:
+            raise CommandError('--dias no puede ser negativo y --lote debe ser al menos 1.')
+        antes_de = timezone.now() - timedelta(days=options['dias'])
+        if options['simular']:
+            total = candidatas(antes_de).count()
+            self.stdout.write(f'{total} tareas completadas antes de {antes_de:%Y-%m-%d} se archivarían.')
+            return
+
+        total, lotes, ultimo_id = 0, 0, 0
+        inicio = time.perf_counter()
+        while options['max_lotes'] is None or lotes < options['max_lotes']:
+            archivadas, ultimo_id = archivar_lote(antes_de, options['lote'], ultimo_id)
+            if ultimo_id is None:
+                break
+            total += archivadas
+            lotes += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Lote {lotes}: {archivadas} tareas (hasta id {ultimo_id})')
+            if options['pausa']:
+                time.sleep(options['pausa'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} tareas archivadas en {lotes} lotes ({time.perf_counter() - inicio:.1f} s).'
+        ))
@@ -0,0 +1,107 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tareas.archivo import archivar_lote
+from tareas.management.bench import base_de_datos_temporal
+from tareas.models import Tarea
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia del listado de tareas antes y después de archivar "
+        "las completadas antiguas, sobre una base de datos temporal y con la "
+        "caché del listado desactivada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tareas', type=int, default=100_000, help="Tareas del usuario medido")
+        parser.add_argument(
+            '--archivables', type=float, default=0.8,
+            help="Fracción de tareas completadas y antiguas (se archivarán)",
+        )
+        parser.add_argument('--lote', type=int, default=500, help="Tareas por lote de archivo")
+        parser.add_argument('--repeticiones', type=int, default=20, help="Peticiones por consulta")
+
+    def handle(self, *args, **options):
+        caches = {
+            **settings.CACHES,
+            'tareas': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        }
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(CACHES=caches, ALLOWED_HOSTS=hosts), base_de_datos_temporal():
+            usuario = self._sembrar(options['tareas'], options['archivables'])
+            cliente = APIClient()
+            cliente.force_authenticate(user=usuario)
+            rutas = {
+                'página 1': '/api/tareas/?page=1',
+                'completado=false': '/api/tareas/?completado=false&page=1',
+                'página 50': '/api/tareas/?page=50',
+            }
+
+            antes = self._medir(cliente, rutas, options['repeticiones'])
+            inicio = time.perf_counter()
+            total, lotes, ultimo_id = 0, 0, 0
+            antes_de = timezone.now() - timedelta(days=365)
+            while True:
+                archivadas, ultimo_id = archivar_lote(antes_de, options['lote'], ultimo_id)
+                if ultimo_id is None:
+                    break
+                total += archivadas
+                lotes += 1
+            self.stdout.write(
+                f'{total} tareas archivadas en {lotes} lotes ({time.perf_counter() - inicio:.1f} s)'
+            )
+            despues = self._medir(cliente, rutas, options['repeticiones'])
+            rutas_archivadas = {nombre: f'{ruta}&incluir_archivadas=true' for nombre, ruta in rutas.items()}
+            combinadas = self._medir(cliente, rutas_archivadas, options['repeticiones'])
+
+        self.stdout.write(f'\n  {"consulta":<18} {"antes ms":>9} {"después ms":>11} {"+archivadas ms":>14}')
+        for nombre in rutas:
+            self.stdout.write(
+                f'  {nombre:<18} {antes[nombre]:>9.2f} {despues[nombre]:>11.2f} {combinadas[nombre]:>14.2f}'
+            )
+
+    def _sembrar(self, n_tareas, archivables):
+        """Un usuario con `n_tareas`; la fracción `archivables` se marca antigua y completada."""
+        usuario = User.objects.create_user(username='bench_archivo')
+        n_archivables = int(n_tareas * archivables)
+        Tarea.objects.bulk_create(
+            (
+                Tarea(
+                    usuario=usuario,
+                    titulo=f'Tarea {j}',
+                    descripcion=f'Descripción de la tarea {j}',
+                    completado=j < n_archivables or j % 3 == 0,
+                )
+                for j in range(n_tareas)
+            ),
+            batch_size=1000,
+        )
+        ids = Tarea.objects.filter(usuario=usuario).order_by('id').values_list('id', flat=True)
+        if n_archivables:
+            Tarea.objects.filter(usuario=usuario, id__lte=ids[n_archivables - 1]).update(
+                fecha_actualizacion=timezone.now() - timedelta(days=400)
+            )
+        self.stdout.write(f'Conjunto de datos: {n_tareas} tareas, {n_archivables} archivables')
+        return usuario
+
+    def _medir(self, cliente, rutas, repeticiones):
+        resultados = {}
+        for nombre, ruta in rutas.items():
+            cliente.get(ruta)  # calentamiento
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                response = cliente.get(ruta)
+                tiempos.append(time.perf_counter() - inicio)
+            if response.status_code != 200:
+                raise CommandError(f'{ruta} respondió {response.status_code}')
+            resultados[nombre] = sorted(tiempos)[len(tiempos) // 2] * 1000
+        return resultados
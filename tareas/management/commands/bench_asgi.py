@@ -0,0 +1,148 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tareas.management.bench import base_de_datos_temporal
+from tareas.models import Tarea
+
+PREFIJO = '__bench_asgi_'
+
+RUTAS = {
+    'sync': '/api/tareas/{id}/',
+    'async': '/api/async/tareas/{id}/',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el rendimiento de las vistas síncronas y asíncronas con "
+        "cientos de clientes concurrentes. Por defecto llama a la aplicación "
+        "ASGI en el propio proceso, sobre una base de datos temporal; con "
+        "--url mide un servidor local (p. ej. uvicorn tareas_api.asgi:application), "
+        "cuyos usuarios de prueba se eliminan al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, nargs='+', default=[100, 500, 1000],
+                            help="Niveles de concurrencia a medir")
+        parser.add_argument('--peticiones', type=int, default=5, help="Peticiones por cliente")
+        parser.add_argument('--usuarios', type=int, default=50, help="Usuarios distintos")
+        parser.add_argument('--url', default=None, help="URL base de un servidor ya en marcha")
+
+    def handle(self, *args, **options):
+        if options['url']:
+            # El servidor externo lee su propia base de datos: los datos se
+            # confirman en ella y se eliminan al terminar, junto con los que
+            # haya dejado una ejecución interrumpida.
+            self._limpiar()
+            try:
+                objetivos = self._sembrar(options['usuarios'])
+                self._medir_niveles(self._peticion_http(options['url']), objetivos, options)
+            finally:
+                self._limpiar()
+        else:
+            # AsyncClient envía Host: testserver.
+            hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+            with override_settings(ALLOWED_HOSTS=hosts), base_de_datos_temporal():
+                objetivos = self._sembrar(options['usuarios'])
+                self._medir_niveles(self._peticion_asgi(), objetivos, options)
+
+    @staticmethod
+    def _sembrar(usuarios):
+        """Un usuario con una tarea por cliente; retorna sus (token, id de tarea)."""
+        objetivos = []
+        for i in range(usuarios):
+            usuario = User.objects.create_user(username=f'{PREFIJO}{i}__')
+            tarea = Tarea.objects.create(usuario=usuario, titulo='Tarea')
+            objetivos.append((str(AccessToken.for_user(usuario)), tarea.id))
+        return objetivos
+
+    @staticmethod
+    def _limpiar():
+        User.objects.filter(username__startswith=PREFIJO, username__endswith='__').delete()
+
+    def _medir_niveles(self, peticion, objetivos, options):
+        for clientes in options['clientes']:
+            resultados = {}
+            for variante, ruta in RUTAS.items():
+                resultados[variante] = async_to_sync(self._medir)(
+                    peticion, ruta, objetivos, clientes, options['peticiones']
+                )
+            self.stdout.write(
+                f'{clientes:>5} clientes  sync {resultados["sync"]:8.1f} pet/s  '
+                f'async {resultados["async"]:8.1f} pet/s  '
+                f'({resultados["async"] / resultados["sync"]:.2f}x)'
+            )
+
+    async def _medir(self, peticion, ruta, objetivos, clientes, peticiones):
+        async def cliente(numero):
+            token, tarea_id = objetivos[numero % len(objetivos)]
+            async with peticion(token) as enviar:
+                for _ in range(peticiones):
+                    codigo = await enviar(ruta.format(id=tarea_id))
+                    if codigo != 200:
+                        raise RuntimeError(f'Respuesta inesperada: {codigo}')
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente(numero) for numero in range(clientes)))
+        return clientes * peticiones / (time.perf_counter() - inicio)
+
+    @staticmethod
+    def _peticion_asgi():
+        class Sesion:
+            def __init__(self, token):
+                self.cliente = AsyncClient()
+                self.cabeceras = {'Authorization': f'Bearer {token}'}
+
+            async def __aenter__(self):
+                return self.enviar
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def enviar(self, ruta):
+                return (await self.cliente.get(ruta, headers=self.cabeceras)).status_code
+
+        return Sesion
+
+    @staticmethod
+    def _peticion_http(url):
+        """Cliente HTTP/1.1 mínimo con keep-alive (requiere Content-Length)."""
+        partes = urlsplit(url)
+        host, puerto = partes.hostname, partes.port or 80
+
+        class Sesion:
+            def __init__(self, token):
+                self.token = token
+
+            async def __aenter__(self):
+                self.lector, self.escritor = await asyncio.open_connection(host, puerto)
+                return self.enviar
+
+            async def __aexit__(self, *exc):
+                self.escritor.close()
+                return False
+
+            async def enviar(self, ruta):
+                self.escritor.write((
+                    f'GET {ruta} HTTP/1.1\r\nHost: {partes.netloc}\r\n'
+                    f'Authorization: Bearer {self.token}\r\n\r\n'
+                ).encode('latin-1'))
+                await self.escritor.drain()
+                codigo = int((await self.lector.readline()).split()[1])
+                longitud = 0
+                while (linea := await self.lector.readline()) not in (b'\r\n', b''):
+                    nombre, _, valor = linea.decode('latin-1').partition(':')
+                    if nombre.strip().lower() == 'content-length':
+                        longitud = int(valor)
+                await self.lector.readexactly(longitud)
+                return codigo
+
+        return Sesion
@@ -0,0 +1,58 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tareas import authentication
+from tareas.authentication import CachedJWTAuthentication
+from tareas.management.bench import base_de_datos_temporal
+from tareas.models import Tarea
+from tareas.views import TareaViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara peticiones por segundo autenticadas con JWTAuthentication "
+        "y con CachedJWTAuthentication, sobre una base de datos temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=2000, help="Peticiones por variante")
+        parser.add_argument('--usuarios', type=int, default=20, help="Usuarios distintos que alternan")
+
+    def handle(self, *args, **options):
+        peticiones = options['peticiones']
+
+        with base_de_datos_temporal():
+            clientes = []
+            for i in range(options['usuarios']):
+                usuario = User.objects.create_user(username=f'__bench_autenticacion_{i}__')
+                tarea = Tarea.objects.create(usuario=usuario, titulo='Tarea de prueba')
+                cliente = APIClient(SERVER_NAME='localhost')
+                cliente.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+                clientes.append((cliente, f'/api/tareas/{tarea.id}/'))
+
+            resultados = {}
+            for clase in (JWTAuthentication, CachedJWTAuthentication):
+                authentication.usuarios.reiniciar()
+                with mock.patch.object(TareaViewSet, 'authentication_classes', [clase]):
+                    for cliente, url in clientes:  # calentamiento
+                        cliente.get(url)
+                    inicio = time.perf_counter()
+                    for i in range(peticiones):
+                        cliente, url = clientes[i % len(clientes)]
+                        respuesta = cliente.get(url)
+                        if respuesta.status_code != 200:
+                            raise RuntimeError(f'Respuesta inesperada: {respuesta.status_code}')
+                    resultados[clase.__name__] = peticiones / (time.perf_counter() - inicio)
+                self.stdout.write(f'{clase.__name__:<24} {resultados[clase.__name__]:9.1f} peticiones/s')
+
+            estadisticas = authentication.usuarios.estadisticas_local
+            self.stdout.write(f'Tasa de aciertos de la caché: {estadisticas.tasa_aciertos:.1%}')
+
+        mejora = resultados['CachedJWTAuthentication'] / resultados['JWTAuthentication']
+        self.stdout.write(self.style.SUCCESS(f'Mejora: {mejora:.2f}x'))
@@ -0,0 +1,82 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from tareas.filters import BusquedaTextoFilter
+from tareas.management.bench import base_de_datos_temporal
+from tareas.models import Tarea
+
+PALABRAS = (
+    'comprar leche pan informe reunión revisar enviar correo llamar cliente '
+    'factura proyecto entrega presupuesto diseño pruebas despliegue servidor '
+    'documentación contrato agenda viaje médico banco pagar renovar'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la búsqueda FTS5 con icontains sobre título y descripción, "
+        "sobre una base de datos temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=1_000_000, help="Número de tareas a generar")
+        parser.add_argument('--lote', type=int, default=10_000, help="Tamaño de cada bulk_create")
+        parser.add_argument('--repeticiones', type=int, default=5, help="Repeticiones por consulta")
+        parser.add_argument(
+            '--termino', default='zanahoria',
+            help="Término poco frecuente que se inserta en una de cada 1000 tareas y se busca",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("La búsqueda FTS5 solo está disponible en SQLite.")
+
+        filas = options['filas']
+        termino = options['termino']
+        aleatorio = random.Random(0)
+
+        with base_de_datos_temporal():
+            usuario = User.objects.create_user(username='__bench_busqueda__')
+            inicio = time.perf_counter()
+            for desde in range(0, filas, options['lote']):
+                Tarea.objects.bulk_create(
+                    Tarea(
+                        usuario=usuario,
+                        titulo=' '.join(aleatorio.choices(PALABRAS, k=3)),
+                        descripcion=' '.join(aleatorio.choices(PALABRAS, k=20))
+                        + (f' {termino}' if (desde + i) % 1000 == 0 else ''),
+                    )
+                    for i in range(min(options['lote'], filas - desde))
+                )
+            self.stdout.write(f'{filas} tareas generadas en {time.perf_counter() - inicio:.1f} s')
+
+            base = Tarea.objects.filter(usuario=usuario)
+            consultas = {
+                'icontains': lambda: list(
+                    base.filter(Q(titulo__icontains=termino) | Q(descripcion__icontains=termino))
+                    .values_list('id', flat=True)[:10]
+                ),
+                'fts5': lambda: list(
+                    base.filter(busqueda__indice__match=BusquedaTextoFilter.consulta_fts([termino]))
+                    .order_by('busqueda__rank').values_list('id', flat=True)[:10]
+                ),
+            }
+            resultados = {}
+            for nombre, consulta in consultas.items():
+                consulta()  # calentamiento
+                tiempos = []
+                for _ in range(options['repeticiones']):
+                    inicio = time.perf_counter()
+                    consulta()
+                    tiempos.append(time.perf_counter() - inicio)
+                resultados[nombre] = min(tiempos) * 1000
+                self.stdout.write(f'{nombre:<10} {resultados[nombre]:10.2f} ms (primera página)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Relación icontains/fts5: {resultados['icontains'] / resultados['fts5']:.2f}x"
+        ))
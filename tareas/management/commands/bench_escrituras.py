@@ -0,0 +1,86 @@
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.test import override_settings
+
+from tareas.management.bench import base_de_datos_temporal
+from tareas.models import Tarea
+
+# Configuración por defecto de Django frente al perfil de settings.py.
+PERFILES = {
+    'Django por defecto': ({'journal_mode': 'DELETE', 'synchronous': 'FULL'}, {}),
+    'Perfil de producción': (None, {'transaction_mode': 'IMMEDIATE'}),
+}
+
+
+def _trabajador(usuario_id, operaciones, resultados):
+    """Mezcla de escrituras típicas de la API; cuenta los "database is locked"."""
+    connections.close_all()
+    usuario = User.objects.get(pk=usuario_id)
+    exitos = errores = 0
+    for i in range(operaciones):
+        try:
+            if i % 3 == 0:
+                Tarea.objects.create(usuario=usuario, titulo=f'Tarea {i}', descripcion='Contención')
+            elif i % 3 == 1:
+                tarea_id = Tarea.objects.filter(usuario=usuario).values_list('id', flat=True).first()
+                Tarea.objects.alternar_completado(tarea_id, usuario)
+            else:
+                # Lectura seguida de escritura en la misma transacción (como
+                # las actualizaciones por lotes): con BEGIN DEFERRED es la que
+                # provoca "database is locked" sin esperar a busy_timeout.
+                with transaction.atomic():
+                    ids = list(Tarea.objects.filter(usuario=usuario).values_list('id', flat=True)[:5])
+                    Tarea.objects.filter(pk__in=ids).update(descripcion=f'Actualizada {i}')
+            exitos += 1
+        except OperationalError:
+            errores += 1
+    connections.close_all()
+    resultados.put((exitos, errores))
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la contención de escrituras con varios procesos sobre una copia "
+        "temporal de la base de datos, con la configuración por defecto de "
+        "Django y con el perfil SQLite de settings.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=8, help="Procesos escritores")
+        parser.add_argument('--operaciones', type=int, default=300, help="Operaciones por proceso")
+
+    def handle(self, *args, **options):
+        contexto = multiprocessing.get_context('fork')
+        for nombre, (pragmas, opciones) in PERFILES.items():
+            pragmas = settings.TAREAS_SQLITE_PRAGMAS if pragmas is None else pragmas
+            with override_settings(TAREAS_SQLITE_PRAGMAS=pragmas), base_de_datos_temporal(opciones):
+                usuarios = [
+                    User.objects.create_user(username=f'bench_{i}').pk
+                    for i in range(options['procesos'])
+                ]
+                connections.close_all()
+
+                resultados = contexto.Queue()
+                procesos = [
+                    contexto.Process(target=_trabajador, args=(usuario_id, options['operaciones'], resultados))
+                    for usuario_id in usuarios
+                ]
+                inicio = time.perf_counter()
+                for proceso in procesos:
+                    proceso.start()
+                totales = [resultados.get() for _ in procesos]
+                for proceso in procesos:
+                    proceso.join()
+                duracion = time.perf_counter() - inicio
+
+            exitos = sum(t[0] for t in totales)
+            errores = sum(t[1] for t in totales)
+            self.stdout.write(
+                f'{nombre:<22} {exitos / duracion:9.1f} escrituras/s  '
+                f'{errores:5d} errores "database is locked"'
+            )
@@ -0,0 +1,57 @@
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from tareas import esquema
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara servir el esquema OpenAPI regenerándolo en cada petición "
+        "(drf_yasg) frente al artefacto pregenerado y la copia en memoria."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200, help="Peticiones por variante")
+
+    def handle(self, *args, **options):
+        from tareas_api.urls import schema_view
+
+        peticiones = options['peticiones']
+        fabrica = RequestFactory(SERVER_NAME='localhost')
+        regenerar = schema_view.without_ui(cache_timeout=0)
+
+        with tempfile.TemporaryDirectory() as directorio, \
+                override_settings(TAREAS_ESQUEMA_DIR=directorio):
+            # Primer acceso: sin artefacto se genera el esquema, con él se lee del disco.
+            esquema.reiniciar()
+            inicio = time.perf_counter()
+            esquema.obtener_documento('.json')
+            self.stdout.write(f'{"Primer acceso (memoria)":<28} {(time.perf_counter() - inicio) * 1000:9.2f} ms')
+
+            esquema.escribir_artefactos(directorio)
+            inicio = time.perf_counter()
+            esquema.obtener_documento('.json')
+            self.stdout.write(f'{"Primer acceso (artefacto)":<28} {(time.perf_counter() - inicio) * 1000:9.2f} ms')
+
+            variantes = (
+                ('drf_yasg (regenera)', regenerar),
+                ('Artefacto pregenerado', esquema.esquema_view),
+            )
+            resultados = {}
+            for nombre, vista in variantes:
+                inicio = time.perf_counter()
+                for _ in range(peticiones):
+                    respuesta = vista(fabrica.get('/swagger.json'), format='.json')
+                    if hasattr(respuesta, 'render'):
+                        respuesta.render()
+                    if respuesta.status_code != 200:
+                        raise RuntimeError(f'Respuesta inesperada: {respuesta.status_code}')
+                resultados[nombre] = peticiones / (time.perf_counter() - inicio)
+                self.stdout.write(f'{nombre:<28} {resultados[nombre]:9.1f} peticiones/s')
+            esquema.reiniciar()
+
+        mejora = resultados['Artefacto pregenerado'] / resultados['drf_yasg (regenera)']
+        self.stdout.write(self.style.SUCCESS(f'Mejora: {mejora:.0f}x'))
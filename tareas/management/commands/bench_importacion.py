@@ -0,0 +1,109 @@
+import csv
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from tareas import importacion
+from tareas.management.bench import base_de_datos_temporal
+from tareas.models import Tarea
+from tareas.serializers import TareaSerializer
+
+PALABRAS = (
+    'revisar informe cliente reunión presupuesto entrega diseño pruebas '
+    'documentación despliegue factura proveedor equipo sprint incidencia'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el rendimiento de la importación en streaming (NDJSON y CSV) "
+        "para varios tamaños, sobre una base de datos temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+            help="Tamaños de archivo a importar",
+        )
+        parser.add_argument('--formatos', nargs='+', choices=['ndjson', 'csv'], default=['ndjson', 'csv'])
+        parser.add_argument(
+            '--base', type=int, default=2000,
+            help="Filas para la referencia de un TareaSerializer.save() por tarea (0 para omitirla)",
+        )
+        parser.add_argument(
+            '--memoria', action='store_true',
+            help="Mide el pico de memoria de Python con tracemalloc (más lento)",
+        )
+
+    def _escribir(self, archivo, formato, filas):
+        """Genera el archivo de entrada (semilla fija, una de cada 100 filas no válida)."""
+        aleatorio = random.Random(filas)
+        escritor = csv.writer(archivo) if formato == 'csv' else None
+        if escritor:
+            escritor.writerow(['titulo', 'descripcion', 'completado'])
+        for i in range(filas):
+            titulo = ' '.join(aleatorio.choices(PALABRAS, k=3)).capitalize() if i % 100 else '  '
+            descripcion = ' '.join(aleatorio.choices(PALABRAS, k=aleatorio.randint(5, 30)))
+            completado = aleatorio.random() < 0.3
+            if escritor:
+                escritor.writerow([titulo, descripcion, 'true' if completado else 'false'])
+            else:
+                archivo.write(json.dumps(
+                    {'titulo': titulo, 'descripcion': descripcion, 'completado': completado},
+                    ensure_ascii=False,
+                ) + '\n')
+
+    def _referencia(self, usuario, filas):
+        """Tareas por segundo creando cada una con TareaSerializer, como un POST por tarea."""
+        inicio = time.perf_counter()
+        for i in range(filas):
+            serializer = TareaSerializer(data={'titulo': f'Tarea {i}', 'descripcion': 'Referencia'})
+            serializer.is_valid(raise_exception=True)
+            with transaction.atomic():
+                serializer.save(usuario=usuario)
+        return filas / (time.perf_counter() - inicio)
+
+    def handle(self, *args, **options):
+        # Con DEBUG cada conexión guarda el SQL de sus últimas 9000 consultas:
+        # falsearía el pico de memoria y el tiempo.
+        with override_settings(DEBUG=False), base_de_datos_temporal():
+            if options['base']:
+                usuario = User.objects.create_user(username='bench_importacion_base')
+                por_segundo = self._referencia(usuario, options['base'])
+                self.stdout.write(f'Referencia (un serializer.save() por tarea): {por_segundo:,.0f} tareas/s')
+
+            self.stdout.write(
+                f'\n  {"formato":<8} {"filas":>10} {"creadas":>10} {"segundos":>9} '
+                f'{"tareas/s":>10}' + (f' {"pico MB":>8}' if options['memoria'] else '')
+            )
+            for filas in options['filas']:
+                for formato in options['formatos']:
+                    usuario = User.objects.create_user(username=f'bench_importacion_{formato}_{filas}')
+                    with tempfile.TemporaryFile('w+', encoding='utf-8', newline='') as archivo:
+                        self._escribir(archivo, formato, filas)
+                        archivo.flush()
+                        with open(archivo.fileno(), 'rb', closefd=False) as binario:
+                            binario.seek(0)
+                            if options['memoria']:
+                                tracemalloc.start()
+                            inicio = time.perf_counter()
+                            resultado = importacion.importar(usuario, binario, formato)
+                            segundos = time.perf_counter() - inicio
+                    linea = (
+                        f'  {formato:<8} {filas:>10,} {resultado["creadas"]:>10,} {segundos:>9.2f} '
+                        f'{resultado["creadas"] / segundos:>10,.0f}'
+                    )
+                    if options['memoria']:
+                        # Memoria de Python, sin la caché ni el mmap de SQLite.
+                        linea += f' {tracemalloc.get_traced_memory()[1] / 2**20:>8.1f}'
+                        tracemalloc.stop()
+                    self.stdout.write(linea)
+                    if Tarea.objects.filter(usuario=usuario).count() != resultado['creadas']:
+                        raise CommandError(f'{formato} {filas}: el número de tareas no coincide')
@@ -0,0 +1,102 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tareas import compresion
+from tareas.renderers import JSONRapidoRenderer, MessagePackRenderer, msgpack, orjson
+from tareas.serializers import TareaLecturaRapida
+
+PALABRAS = (
+    'revisar informe cliente reunión presupuesto entrega diseño pruebas '
+    'documentación despliegue factura proveedor equipo sprint incidencia '
+    'migración servidor copia seguridad llamada seguimiento'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide, por tamaño de página del listado, los bytes en la red y el "
+        "tiempo de CPU de cada renderer (JSON de DRF, JSON con orjson, "
+        "MessagePack) y de cada compresión (gzip, brotli)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamanos', type=int, nargs='+', default=[10, 100, 1000],
+            help="Tamaños de página a medir",
+        )
+        parser.add_argument('--repeticiones', type=int, default=20, help="Repeticiones por medida")
+
+    def _pagina(self, tamano):
+        """Página del listado con descripciones variadas (semilla fija)."""
+        aleatorio = random.Random(tamano)
+        ahora = timezone.now()
+        lectura = TareaLecturaRapida()
+        filas = [
+            {
+                'id': i + 1,
+                'usuario_nombre': f'usuario{i % 7}',
+                'titulo': ' '.join(aleatorio.choices(PALABRAS, k=4)).capitalize(),
+                'descripcion': ' '.join(aleatorio.choices(PALABRAS, k=aleatorio.randint(10, 60))),
+                'completado': aleatorio.random() < 0.4,
+                'fecha_creacion': ahora - timedelta(minutes=i * 13),
+                'fecha_actualizacion': ahora - timedelta(minutes=i * 7),
+            }
+            for i in range(tamano)
+        ]
+        return {
+            'count': tamano * 10,
+            'next': 'http://testserver/api/tareas/?page=2',
+            'previous': None,
+            'results': lectura.serializar(filas),
+        }
+
+    def _medir(self, funcion, repeticiones):
+        funcion()  # calentamiento
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado = funcion()
+            tiempos.append(time.perf_counter() - inicio)
+        return resultado, min(tiempos) * 1e6
+
+    def handle(self, *args, **options):
+        repeticiones = options['repeticiones']
+        renderers = [('json (DRF)', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('json (orjson)', JSONRapidoRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('orjson no está instalado: se omite JSONRapidoRenderer.'))
+        if msgpack is not None:
+            renderers.append(('msgpack', MessagePackRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack no está instalado: se omite MessagePackRenderer.'))
+        ajustes = compresion.configuracion()
+        codificaciones = [
+            (codificacion, ajustes['NIVEL_BROTLI'] if codificacion == 'br' else ajustes['NIVEL_GZIP'])
+            for codificacion in reversed(compresion.codificaciones_disponibles())
+        ]
+
+        for tamano in options['tamanos']:
+            pagina = self._pagina(tamano)
+            self.stdout.write(f'\nPágina de {tamano} tareas')
+            self.stdout.write(
+                f'  {"renderer":<14} {"bytes":>9} {"render µs":>10}'
+                + ''.join(f' {c + " bytes":>11} {c + " µs":>9}' for c, _ in codificaciones)
+            )
+            for nombre, renderer in renderers:
+                contenido, tiempo = self._medir(lambda: renderer.render(pagina), repeticiones)
+                linea = f'  {nombre:<14} {len(contenido):>9} {tiempo:>10.1f}'
+                for codificacion, nivel in codificaciones:
+                    comprimido, tiempo_compresion = self._medir(
+                        lambda: compresion.comprimir(contenido, codificacion, nivel), repeticiones
+                    )
+                    linea += f' {len(comprimido):>11} {tiempo_compresion:>9.1f}'
+                self.stdout.write(linea)
+
+        if compresion.brotli is None:
+            self.stdout.write(self.style.WARNING('\nbrotli no está instalado: solo se mide gzip.'))
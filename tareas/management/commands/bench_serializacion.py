@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from tareas.management.bench import base_de_datos_temporal
+from tareas.models import Tarea
+from tareas.serializers import TareaSerializer, TareaLecturaRapida
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el coste por fila de TareaSerializer frente a la ruta de "
+        "lectura rápida, sobre una base de datos temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=5000, help="Número de tareas a serializar")
+        parser.add_argument('--repeticiones', type=int, default=5, help="Repeticiones por variante")
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        repeticiones = options['repeticiones']
+
+        with base_de_datos_temporal():
+            usuario = User.objects.create_user(username='__bench_serializacion__')
+            Tarea.objects.bulk_create(
+                Tarea(usuario=usuario, titulo=f'Tarea {i}', descripcion='Descripción de prueba ' * 4)
+                for i in range(filas)
+            )
+            queryset = Tarea.objects.filter(usuario=usuario).select_related('usuario')
+
+            def completo():
+                return TareaSerializer(queryset.all(), many=True).data
+
+            def rapido():
+                lectura = TareaLecturaRapida()
+                return lectura.serializar(lectura.preparar(queryset.all()))
+
+            resultados = {}
+            for nombre, funcion in (('TareaSerializer', completo), ('TareaLecturaRapida', rapido)):
+                funcion()  # calentamiento
+                tiempos = []
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    funcion()
+                    tiempos.append(time.perf_counter() - inicio)
+                resultados[nombre] = min(tiempos) / filas * 1e6
+                self.stdout.write(f'{nombre:<20} {resultados[nombre]:8.2f} µs/fila')
+
+        aceleracion = resultados['TareaSerializer'] / resultados['TareaLecturaRapida']
+        self.stdout.write(self.style.SUCCESS(f'Aceleración por fila: {aceleracion:.1f}x'))
@@ -0,0 +1,320 @@
+import http.client
+import json
+import platform
+import socket
+import statistics
+import subprocess
+import threading
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tareas.management.bench import base_de_datos_temporal
+from tareas.sincronizacion import codificar_token
+from tareas.models import Tarea
+
+CONTRASENA = 'bench-tareas'
+
+
+class _ManejadorSilencioso(WSGIRequestHandler):
+    def setup(self):
+        super().setup()
+        # Sin Nagle: las cabeceras y el cuerpo van en escrituras separadas y,
+        # con el ACK retardado del cliente, cada respuesta esperaría ~40 ms.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ClienteHTTP:
+    """Cliente HTTP/1.1 contra el servidor local (sin recuento de consultas)."""
+
+    def __init__(self, puerto):
+        self.conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=60)
+
+    def enviar(self, metodo, ruta, cuerpo, cabeceras):
+        datos = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else None
+        cabeceras = {**cabeceras, 'Host': 'localhost'}
+        if datos is not None:
+            cabeceras['Content-Type'] = 'application/json'
+        self.conexion.request(metodo, ruta, body=datos, headers=cabeceras)
+        respuesta = self.conexion.getresponse()
+        respuesta.read()
+        return respuesta.status, None
+
+
+class _ClienteProceso:
+    """django.test.Client en el propio proceso; cuenta las consultas de cada petición."""
+
+    def __init__(self):
+        self.cliente = Client()
+
+    def enviar(self, metodo, ruta, cuerpo, cabeceras):
+        extra = {f'HTTP_{nombre.upper().replace("-", "_")}': valor for nombre, valor in cabeceras.items()}
+        if cuerpo is not None:
+            extra['data'] = json.dumps(cuerpo)
+            extra['content_type'] = 'application/json'
+        with ExitStack() as pila:
+            capturas = [pila.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+            respuesta = getattr(self.cliente, metodo.lower())(ruta, **extra)
+            if hasattr(respuesta, 'streaming_content'):
+                b''.join(respuesta.streaming_content)
+        return respuesta.status_code, sum(len(captura) for captura in capturas)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark reproducible de la API: crea un conjunto de datos (N usuarios "
+        "x M tareas) en una base de datos temporal, recorre todas las rutas de "
+        "TareaViewSet, los endpoints JWT y el esquema, y mide p50/p95/p99, "
+        "rendimiento y consultas por petición. Los resultados en JSON se pueden "
+        "comparar entre commits con --comparar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=10, help="Usuarios del conjunto de datos")
+        parser.add_argument('--tareas', type=int, default=1000, help="Tareas por usuario")
+        parser.add_argument('--peticiones', type=int, default=100, help="Peticiones por escenario")
+        parser.add_argument('--modo', choices=['proceso', 'http', 'ambos'], default='ambos',
+                            help="Cliente en el propio proceso, servidor HTTP local o ambos")
+        parser.add_argument('--escenarios', nargs='+', default=None, help="Limita los escenarios a ejecutar")
+        parser.add_argument('--salida', default=None, help="Archivo JSON donde guardar los resultados")
+        parser.add_argument('--comparar', default=None, help="JSON de una ejecución anterior")
+        parser.add_argument('--umbral', type=float, default=0.2,
+                            help="Empeoramiento relativo del p95 que cuenta como regresión")
+
+    def handle(self, *args, **options):
+        modos = ['proceso', 'http'] if options['modo'] == 'ambos' else [options['modo']]
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver', 'localhost']
+        resultados = {}
+        with override_settings(ALLOWED_HOSTS=hosts), base_de_datos_temporal():
+            datos = self._sembrar(options['usuarios'], options['tareas'], options['peticiones'])
+            for modo in modos:
+                self.stdout.write(self.style.MIGRATE_HEADING(f'Modo: {modo}'))
+                with self._cliente(modo) as cliente:
+                    resultados[modo] = self._ejecutar(cliente, datos, modo, options)
+
+        informe = {
+            'meta': {
+                'commit': self._commit(),
+                'fecha': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'parametros': {
+                    clave: options[clave] for clave in ('usuarios', 'tareas', 'peticiones')
+                },
+            },
+            'resultados': resultados,
+        }
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(informe, archivo, indent=2, ensure_ascii=False, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f'Resultados escritos en {options["salida"]}'))
+        if options['comparar']:
+            self._comparar(options['comparar'], resultados, options['umbral'])
+
+    def _sembrar(self, n_usuarios, n_tareas, peticiones):
+        """Crea el conjunto de datos con bulk_create y prepara tokens e ids."""
+        contrasena = make_password(CONTRASENA)
+        User.objects.bulk_create(
+            User(username=f'bench_{i}', password=contrasena) for i in range(n_usuarios)
+        )
+        usuarios = list(User.objects.filter(username__startswith='bench_').order_by('id'))
+        palabras = ('informe', 'reunión', 'compra', 'revisión', 'llamada', 'factura')
+        Tarea.objects.bulk_create(
+            (
+                Tarea(
+                    usuario=usuario,
+                    titulo=f'{palabras[j % len(palabras)].capitalize()} {j}',
+                    descripcion=f'Descripción de la tarea {j} sobre {palabras[(j * 7) % len(palabras)]}',
+                    completado=j % 3 == 0,
+                )
+                for usuario in usuarios for j in range(n_tareas)
+            ),
+            batch_size=1000,
+        )
+        datos = []
+        for usuario in usuarios:
+            refresh = RefreshToken.for_user(usuario)
+            datos.append({
+                'usuario': usuario,
+                'cabeceras': {'Authorization': f'Bearer {refresh.access_token}'},
+                'refresh': str(refresh),
+                'ids': list(Tarea.objects.filter(usuario=usuario).values_list('id', flat=True)[:200]),
+            })
+        self.stdout.write(f'Conjunto de datos: {n_usuarios} usuarios x {n_tareas} tareas')
+        return datos
+
+    def _cliente(self, modo):
+        comando = self
+
+        class Contexto:
+            def __enter__(self):
+                if modo == 'proceso':
+                    return _ClienteProceso()
+                self.servidor = ThreadedWSGIServer(('127.0.0.1', 0), _ManejadorSilencioso)
+                self.servidor.set_app(WSGIHandler())
+                threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+                comando.stdout.write(f'Servidor local en 127.0.0.1:{self.servidor.server_port}')
+                return _ClienteHTTP(self.servidor.server_port)
+
+            def __exit__(self, *exc):
+                if modo == 'http':
+                    self.servidor.shutdown()
+                    self.servidor.server_close()
+                return False
+
+        return Contexto()
+
+    def _escenarios(self, datos, peticiones):
+        """
+        Cada escenario es (nombre, método, ruta, cuerpo, peticiones); ruta y
+        cuerpo son funciones del número de petición.
+        """
+        def usuario(i):
+            return datos[i % len(datos)]
+
+        def tarea(i):
+            ids = usuario(i)['ids']
+            return ids[(i // len(datos)) % len(ids)]
+
+        # Tareas que se eliminan: se crean aparte para no vaciar el conjunto.
+        desechables = {}
+        for i in range(peticiones * 2):
+            desechables.setdefault(i % len(datos), [])
+        for indice, lista in desechables.items():
+            creadas = Tarea.objects.bulk_create(
+                Tarea(usuario=datos[indice]['usuario'], titulo='Desechable', descripcion='d')
+                for _ in range(peticiones * 2)
+            )
+            lista.extend(t.id for t in creadas)
+
+        def desechable(i, cantidad=1):
+            lista = desechables[i % len(datos)]
+            return [lista.pop() for _ in range(cantidad)]
+
+        pocas = max(1, peticiones // 10)  # obtener token calcula el hash de la contraseña
+        # Sincronización incremental de un cliente que sincronizó hace una hora.
+        desde = codificar_token(timezone.now() - timedelta(hours=1))
+        return [
+            ('listado', 'GET', lambda i: '/api/tareas/', None, peticiones),
+            ('listado_pagina_5', 'GET', lambda i: '/api/tareas/?page=5', None, peticiones),
+            ('listado_cursor', 'GET', lambda i: '/api/tareas/?paginacion=cursor', None, peticiones),
+            ('listado_completado', 'GET', lambda i: '/api/tareas/?completado=true', None, peticiones),
+            ('busqueda', 'GET', lambda i: '/api/tareas/?search=informe', None, peticiones),
+            ('detalle', 'GET', lambda i: f'/api/tareas/{tarea(i)}/', None, peticiones),
+            ('resumen', 'GET', lambda i: '/api/tareas/resumen/', None, peticiones),
+            ('cambios', 'GET', lambda i: f'/api/tareas/cambios/?since={desde}', None, peticiones),
+            ('exportar', 'GET', lambda i: '/api/tareas/exportar/', None, max(1, peticiones // 10)),
+            ('crear', 'POST', lambda i: '/api/tareas/',
+             lambda i: {'titulo': f'Nueva {i}', 'descripcion': 'Creada por bench_tareas'}, peticiones),
+            ('actualizar', 'PUT', lambda i: f'/api/tareas/{tarea(i)}/',
+             lambda i: {'titulo': f'Actualizada {i}', 'descripcion': 'd', 'completado': False}, peticiones),
+            ('actualizar_parcial', 'PATCH', lambda i: f'/api/tareas/{tarea(i)}/',
+             lambda i: {'completado': i % 2 == 0}, peticiones),
+            ('toggle_completado', 'POST', lambda i: f'/api/tareas/{tarea(i)}/toggle_completado/', None, peticiones),
+            ('lote_crear', 'POST', lambda i: '/api/tareas/lote/',
+             lambda i: [{'titulo': f'Lote {i}-{j}', 'descripcion': 'd'} for j in range(20)], peticiones),
+            ('lote_actualizar', 'PATCH', lambda i: '/api/tareas/lote/',
+             lambda i: [{'id': tarea(i + j * len(datos)), 'completado': True} for j in range(20)], peticiones),
+            ('eliminar', 'DELETE', lambda i: f'/api/tareas/{desechable(i)[0]}/', None, peticiones),
+            ('lote_eliminar', 'DELETE', lambda i: '/api/tareas/lote/', lambda i: desechable(i), peticiones),
+            ('token', 'POST', lambda i: '/api/token/',
+             lambda i: {'username': usuario(i)['usuario'].username, 'password': CONTRASENA}, pocas),
+            ('token_refresh', 'POST', lambda i: '/api/token/refresh/',
+             lambda i: {'refresh': usuario(i)['refresh']}, peticiones),
+            ('esquema', 'GET', lambda i: '/swagger.json', None, peticiones),
+        ]
+
+    def _ejecutar(self, cliente, datos, modo, options):
+        resultados = {}
+        for nombre, metodo, ruta, cuerpo, total in self._escenarios(datos, options['peticiones']):
+            if options['escenarios'] and nombre not in options['escenarios']:
+                continue
+            latencias, consultas = [], []
+            inicio = time.perf_counter()
+            for i in range(total):
+                # Los endpoints JWT no llevan token.
+                cabeceras = {} if nombre.startswith('token') else datos[i % len(datos)]['cabeceras']
+                t0 = time.perf_counter()
+                codigo, n_consultas = cliente.enviar(metodo, ruta(i), cuerpo(i) if cuerpo else None, cabeceras)
+                latencias.append((time.perf_counter() - t0) * 1000)
+                if codigo >= 400:
+                    raise CommandError(f'{modo}/{nombre}: respuesta {codigo} en {ruta(i)}')
+                if n_consultas is not None:
+                    consultas.append(n_consultas)
+            duracion = time.perf_counter() - inicio
+
+            resultado = {
+                'peticiones': total,
+                'p50_ms': round(self._percentil(latencias, 50), 3),
+                'p95_ms': round(self._percentil(latencias, 95), 3),
+                'p99_ms': round(self._percentil(latencias, 99), 3),
+                'peticiones_s': round(total / duracion, 1),
+                'consultas': round(statistics.mean(consultas), 2) if consultas else None,
+            }
+            resultados[nombre] = resultado
+            self.stdout.write(
+                f'{nombre:<20} p50 {resultado["p50_ms"]:8.2f} ms  p95 {resultado["p95_ms"]:8.2f} ms  '
+                f'p99 {resultado["p99_ms"]:8.2f} ms  {resultado["peticiones_s"]:8.1f} pet/s  '
+                f'consultas {resultado["consultas"] if resultado["consultas"] is not None else "-"}'
+            )
+        return resultados
+
+    @staticmethod
+    def _percentil(valores, percentil):
+        if len(valores) == 1:
+            return valores[0]
+        return statistics.quantiles(valores, n=100, method='inclusive')[percentil - 1]
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _comparar(self, ruta, resultados, umbral):
+        """Compara con una ejecución anterior; falla si el p95 o las consultas empeoran."""
+        with open(ruta, encoding='utf-8') as archivo:
+            anterior = json.load(archivo)
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Comparación con {anterior["meta"].get("commit")}'))
+        regresiones = []
+        for modo, escenarios in resultados.items():
+            for nombre, actual in escenarios.items():
+                base = anterior['resultados'].get(modo, {}).get(nombre)
+                if base is None:
+                    continue
+                cambio = actual['p95_ms'] / base['p95_ms'] - 1 if base['p95_ms'] else 0.0
+                mas_consultas = (
+                    actual['consultas'] is not None and base['consultas'] is not None
+                    and actual['consultas'] > base['consultas']
+                )
+                marca = ''
+                if cambio > umbral or mas_consultas:
+                    regresiones.append(f'{modo}/{nombre}')
+                    marca = '  <-- regresión'
+                self.stdout.write(
+                    f'{modo}/{nombre:<20} p95 {base["p95_ms"]:8.2f} -> {actual["p95_ms"]:8.2f} ms '
+                    f'({cambio:+.0%})  consultas {base["consultas"]} -> {actual["consultas"]}{marca}'
+                )
+        if regresiones:
+            raise CommandError(f'Regresiones: {", ".join(regresiones)}')
+        self.stdout.write(self.style.SUCCESS('Sin regresiones.'))
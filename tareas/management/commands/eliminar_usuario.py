@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tareas.eliminacion import configuracion, eliminar_usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina usuarios borrando sus tareas en lotes de tamaño fijo, cada "
+        "uno en una transacción corta, sin cargarlas en memoria."
+    )
+
+    def add_arguments(self, parser):
+        ajustes = configuracion()
+        parser.add_argument('usernames', nargs='+', help="Nombres de usuario a eliminar")
+        parser.add_argument(
+            '--lote', type=int, default=ajustes['LOTE'],
+            help="Tareas por lote (cada lote es una transacción)",
+        )
+        parser.add_argument(
+            '--pausa', type=float, default=ajustes['PAUSA'],
+            help="Segundos de espera entre lotes para dejar paso a otras escrituras",
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser al menos 1.')
+        usuarios = list(User.objects.filter(username__in=options['usernames']))
+        faltan = set(options['usernames']) - {usuario.username for usuario in usuarios}
+        if faltan:
+            raise CommandError(f'No existen los usuarios: {", ".join(sorted(faltan))}')
+        for usuario in usuarios:
+            resultado = eliminar_usuario(usuario, lote=options['lote'], pausa=options['pausa'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{usuario.username}: {resultado["tareas"]} tareas y {resultado["archivadas"]} '
+                f'archivadas en {resultado["lotes"]} lotes (lote más largo: '
+                f'{resultado["bloqueo_maximo"] * 1000:.1f} ms).'
+            ))
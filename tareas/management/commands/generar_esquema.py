@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from tareas.esquema import directorio_artefactos, escribir_artefactos
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera swagger.json y swagger.yaml para servirlos sin regenerar el "
+        "esquema en cada petición. Ejecútalo en cada despliegue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directorio', default=None,
+            help="Directorio de salida (por defecto TAREAS_ESQUEMA_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        directorio = options['directorio'] or directorio_artefactos()
+        for ruta in escribir_artefactos(directorio):
+            self.stdout.write(self.style.SUCCESS(f'Esquema escrito en {ruta}'))
@@ -0,0 +1,113 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tareas import trabajos
+from tareas.models import Trabajo
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los trabajos en segundo plano encolados por la API "
+        "(tabla tareas_trabajos) en un pool de procesos. Cada "
+        "INTERVALO_PURGA segundos elimina los trabajos terminados hace más "
+        "de RETENCION_DIAS días y sus archivos."
+    )
+
+    def add_arguments(self, parser):
+        ajustes = trabajos.configuracion()
+        parser.add_argument(
+            '--procesos', type=int, default=ajustes['PROCESOS'],
+            help="Procesos del pool; 0 ejecuta los trabajos en este mismo proceso",
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=ajustes['INTERVALO'],
+            help="Segundos entre consultas a la cola cuando está vacía",
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help="Procesa los trabajos pendientes y termina",
+        )
+
+    def handle(self, *args, **options):
+        if options['procesos'] < 0:
+            raise CommandError('--procesos no puede ser negativo.')
+        recuperados = trabajos.recuperar_abandonados()
+        if recuperados:
+            self.stdout.write(self.style.WARNING(f'{recuperados} trabajos abandonados vuelven a la cola.'))
+        self._intervalo_purga = trabajos.configuracion()['INTERVALO_PURGA']
+        self._ultima_purga = None
+        try:
+            if options['procesos'] == 0:
+                self._en_proceso(options)
+            else:
+                self._en_pool(options)
+        except KeyboardInterrupt:
+            self.stdout.write('Detenido.')
+
+    def _informar(self, trabajo_id, estado):
+        estilo = self.style.SUCCESS if estado == Trabajo.COMPLETADO else self.style.ERROR
+        self.stdout.write(estilo(f'Trabajo {trabajo_id}: {estado}'))
+
+    def _purgar(self):
+        """Purga los trabajos terminados antiguos al arrancar y cada INTERVALO_PURGA segundos."""
+        ahora = time.monotonic()
+        if self._ultima_purga is not None and ahora - self._ultima_purga < self._intervalo_purga:
+            return
+        self._ultima_purga = ahora
+        purgados = trabajos.purgar_terminados()
+        if purgados:
+            self.stdout.write(f'{purgados} trabajos terminados purgados.')
+
+    def _en_proceso(self, options):
+        while True:
+            self._purgar()
+            trabajo_id = trabajos.reclamar()
+            if trabajo_id is not None:
+                self._informar(trabajo_id, trabajos.ejecutar(trabajo_id))
+            elif options['una_vez']:
+                return
+            else:
+                time.sleep(options['intervalo'])
+
+    def _en_pool(self, options):
+        procesos = options['procesos']
+        en_curso = {}
+        # Con spawn o forkserver los hijos importarían tareas.trabajos sin
+        # django.setup(); con fork heredan Django ya configurado.
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('El pool requiere fork; use --procesos 0 en esta plataforma.')
+        contexto = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(
+            max_workers=procesos, mp_context=contexto, initializer=trabajos.inicializar_proceso
+        ) as pool:
+            while True:
+                self._purgar()
+                for futuro in [futuro for futuro in en_curso if futuro.done()]:
+                    trabajo_id = en_curso.pop(futuro)
+                    try:
+                        estado = futuro.result()
+                    except Exception as exc:
+                        # El proceso murió o falló fuera de ejecutar().
+                        trabajos.marcar_fallido(trabajo_id, f'{type(exc).__name__}: {exc}')
+                        estado = Trabajo.FALLIDO
+                    self._informar(trabajo_id, estado)
+
+                while len(en_curso) < procesos:
+                    trabajo_id = trabajos.reclamar()
+                    if trabajo_id is None:
+                        break
+                    # El pool puede crear un proceso con fork en submit(): que no
+                    # herede conexiones abiertas.
+                    connections.close_all()
+                    en_curso[pool.submit(trabajos.ejecutar_en_proceso, trabajo_id)] = trabajo_id
+
+                if not en_curso and options['una_vez']:
+                    return
+                if en_curso:
+                    wait(en_curso, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(options['intervalo'])
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tareas import sincronizacion
+from tareas.models import TareaEliminada
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina las lápidas de tareas más antiguas que el periodo de "
+        "retención de la sincronización incremental."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=None,
+            help="Días de retención (por defecto TAREAS_SINCRONIZACION['RETENCION_DIAS'])",
+        )
+
+    def handle(self, *args, **options):
+        dias = options['dias']
+        if dias is None:
+            dias = sincronizacion.configuracion()['RETENCION_DIAS']
+        if dias < 0:
+            raise CommandError('--dias no puede ser negativo.')
+        limite = timezone.now() - timedelta(days=dias)
+        # Sin señales ni relaciones: Django lo resuelve con un único DELETE.
+        eliminadas, _ = TareaEliminada.objects.filter(fecha_eliminacion__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f'{eliminadas} lápidas purgadas (anteriores a {limite:%Y-%m-%d %H:%M}).'))
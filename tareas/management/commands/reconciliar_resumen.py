@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+
+from tareas.models import ResumenTareas, Tarea, TareaArchivada
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara los contadores de ResumenTareas con las tareas reales "
+        "(activas y archivadas) de cada usuario y corrige las diferencias."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--comprobar', action='store_true',
+            help="Solo informa de las diferencias (termina con error si las hay)",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            reales = {}
+            for modelo in (Tarea, TareaArchivada):
+                for fila in modelo.objects.order_by().values('usuario').annotate(
+                    total=Count('id'), completadas=Count('id', filter=Q(completado=True))
+                ):
+                    total, completadas = reales.get(fila['usuario'], (0, 0))
+                    reales[fila['usuario']] = (total + fila['total'], completadas + fila['completadas'])
+            guardados = {
+                resumen.usuario_id: resumen
+                for resumen in ResumenTareas.objects.select_for_update()
+            }
+
+            corregir, crear = [], []
+            for usuario_id in reales.keys() | guardados.keys():
+                total, completadas = reales.get(usuario_id, (0, 0))
+                resumen = guardados.get(usuario_id)
+                if resumen is None:
+                    if total:
+                        crear.append(ResumenTareas(usuario_id=usuario_id, total=total, completadas=completadas))
+                        self.stdout.write(f'Usuario {usuario_id}: sin resumen (real {completadas}/{total})')
+                elif (resumen.total, resumen.completadas) != (total, completadas):
+                    self.stdout.write(
+                        f'Usuario {usuario_id}: {resumen.completadas}/{resumen.total} '
+                        f'(real {completadas}/{total})'
+                    )
+                    resumen.total, resumen.completadas = total, completadas
+                    corregir.append(resumen)
+
+            diferencias = len(corregir) + len(crear)
+            if options['comprobar']:
+                if diferencias:
+                    raise CommandError(f'{diferencias} resúmenes desviados.')
+                self.stdout.write(self.style.SUCCESS('Todos los resúmenes coinciden.'))
+                return
+
+            ResumenTareas.objects.bulk_update(corregir, ['total', 'completadas'])
+            ResumenTareas.objects.bulk_create(crear)
+
+        self.stdout.write(self.style.SUCCESS(f'{diferencias} resúmenes corregidos.'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de texto completo (FTS5) de las tareas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--optimizar',
+            action='store_true',
+            help="Fusiona los segmentos del índice tras reconstruirlo",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("El índice FTS5 solo existe en bases de datos SQLite.")
+
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO tareas_fts(tareas_fts) VALUES ('rebuild')")
+            if options['optimizar']:
+                cursor.execute("INSERT INTO tareas_fts(tareas_fts) VALUES ('optimize')")
+            cursor.execute("SELECT COUNT(*) FROM tareas")
+            total = cursor.fetchone()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Índice de búsqueda reconstruido ({total} tareas)."))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0003_alter_tarea_options_tarea_fecha_actualizacion_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['usuario', '-fecha_creacion', '-id'], name='tareas_usuario_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['usuario', 'completado', '-fecha_creacion', '-id'], name='tareas_usuario_compl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['usuario', 'titulo', '-fecha_creacion', '-id'], name='tareas_usuario_titulo_idx'),
+        ),
+    ]
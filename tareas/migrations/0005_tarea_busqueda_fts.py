@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:27
+
+import django.db.models.deletion
+import tareas.models
+from django.db import migrations, models
+
+# Tabla FTS5 de contenido externo sobre `tareas` y triggers que la mantienen
+# sincronizada. Si una migración posterior reconstruye la tabla `tareas`
+# (SQLite lo hace al alterar ciertas columnas) los triggers se pierden y
+# deben volver a crearse; `manage.py reconstruir_busqueda` repara el índice.
+CREAR_FTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tareas_fts USING fts5(
+        titulo, descripcion,
+        content='tareas', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tareas_fts_ai AFTER INSERT ON tareas BEGIN
+        INSERT INTO tareas_fts(rowid, titulo, descripcion)
+        VALUES (new.id, new.titulo, new.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tareas_fts_ad AFTER DELETE ON tareas BEGIN
+        INSERT INTO tareas_fts(tareas_fts, rowid, titulo, descripcion)
+        VALUES ('delete', old.id, old.titulo, old.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tareas_fts_au AFTER UPDATE OF titulo, descripcion ON tareas BEGIN
+        INSERT INTO tareas_fts(tareas_fts, rowid, titulo, descripcion)
+        VALUES ('delete', old.id, old.titulo, old.descripcion);
+        INSERT INTO tareas_fts(rowid, titulo, descripcion)
+        VALUES (new.id, new.titulo, new.descripcion);
+    END
+    """,
+    "INSERT INTO tareas_fts(tareas_fts) VALUES ('rebuild')",
+]
+
+ELIMINAR_FTS = [
+    "DROP TRIGGER IF EXISTS tareas_fts_au",
+    "DROP TRIGGER IF EXISTS tareas_fts_ad",
+    "DROP TRIGGER IF EXISTS tareas_fts_ai",
+    "DROP TABLE IF EXISTS tareas_fts",
+]
+
+
+def _ejecutar(sentencias):
+    def operacion(apps, schema_editor):
+        # FTS5 es específico de SQLite; en otros motores la búsqueda
+        # recurre a icontains (ver tareas/filters.py).
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0004_tarea_indices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaBusqueda',
+            fields=[
+                ('tarea', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='busqueda', serialize=False, to='tareas.tarea')),
+                ('titulo', models.CharField(max_length=200)),
+                ('descripcion', models.TextField()),
+                ('indice', tareas.models.IndiceBusquedaField(db_column='tareas_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'tareas_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(_ejecutar(CREAR_FTS), _ejecutar(ELIMINAR_FTS)),
+    ]
@@ -0,0 +1,132 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Triggers que mantienen `tareas_resumen` en la misma transacción que las
+# escrituras sobre `tareas`. Como los de FTS (0005), se pierden si una
+# migración posterior reconstruye la tabla `tareas` en SQLite y deben
+# volver a crearse; `manage.py reconciliar_resumen` repara los contadores.
+TRIGGERS = {
+    'sqlite': [
+        """
+        CREATE TRIGGER IF NOT EXISTS tareas_resumen_ai AFTER INSERT ON tareas BEGIN
+            INSERT INTO tareas_resumen(usuario_id, total, completadas)
+            VALUES (new.usuario_id, 1, new.completado)
+            ON CONFLICT(usuario_id) DO UPDATE SET
+                total = total + 1,
+                completadas = completadas + excluded.completadas;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tareas_resumen_ad AFTER DELETE ON tareas BEGIN
+            UPDATE tareas_resumen
+            SET total = total - 1, completadas = completadas - old.completado
+            WHERE usuario_id = old.usuario_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tareas_resumen_au AFTER UPDATE OF completado, usuario_id ON tareas
+        WHEN old.completado != new.completado OR old.usuario_id != new.usuario_id BEGIN
+            UPDATE tareas_resumen
+            SET total = total - 1, completadas = completadas - old.completado
+            WHERE usuario_id = old.usuario_id;
+            INSERT INTO tareas_resumen(usuario_id, total, completadas)
+            VALUES (new.usuario_id, 1, new.completado)
+            ON CONFLICT(usuario_id) DO UPDATE SET
+                total = total + 1,
+                completadas = completadas + excluded.completadas;
+        END
+        """,
+    ],
+    'postgresql': [
+        """
+        CREATE OR REPLACE FUNCTION tareas_resumen_actualizar() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE tareas_resumen
+                SET total = total - 1, completadas = completadas - OLD.completado::int
+                WHERE usuario_id = OLD.usuario_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO tareas_resumen(usuario_id, total, completadas)
+                VALUES (NEW.usuario_id, 1, NEW.completado::int)
+                ON CONFLICT (usuario_id) DO UPDATE SET
+                    total = tareas_resumen.total + 1,
+                    completadas = tareas_resumen.completadas + EXCLUDED.completadas;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER tareas_resumen_aid AFTER INSERT OR DELETE ON tareas
+        FOR EACH ROW EXECUTE FUNCTION tareas_resumen_actualizar()
+        """,
+        """
+        CREATE TRIGGER tareas_resumen_au AFTER UPDATE OF completado, usuario_id ON tareas
+        FOR EACH ROW
+        WHEN (OLD.completado IS DISTINCT FROM NEW.completado OR OLD.usuario_id IS DISTINCT FROM NEW.usuario_id)
+        EXECUTE FUNCTION tareas_resumen_actualizar()
+        """,
+    ],
+}
+
+ELIMINAR_TRIGGERS = {
+    'sqlite': [
+        "DROP TRIGGER IF EXISTS tareas_resumen_au",
+        "DROP TRIGGER IF EXISTS tareas_resumen_ad",
+        "DROP TRIGGER IF EXISTS tareas_resumen_ai",
+    ],
+    'postgresql': [
+        "DROP TRIGGER IF EXISTS tareas_resumen_au ON tareas",
+        "DROP TRIGGER IF EXISTS tareas_resumen_aid ON tareas",
+        "DROP FUNCTION IF EXISTS tareas_resumen_actualizar()",
+    ],
+}
+
+
+def crear_resumen(apps, schema_editor):
+    """Calcula los contadores iniciales y crea los triggers."""
+    Tarea = apps.get_model('tareas', 'Tarea')
+    ResumenTareas = apps.get_model('tareas', 'ResumenTareas')
+    db = schema_editor.connection.alias
+    filas = (
+        Tarea.objects.using(db).order_by().values('usuario')
+        .annotate(total=models.Count('id'), completadas=models.Count('id', filter=models.Q(completado=True)))
+    )
+    ResumenTareas.objects.using(db).bulk_create(
+        ResumenTareas(usuario_id=fila['usuario'], total=fila['total'], completadas=fila['completadas'])
+        for fila in filas
+    )
+    for sql in TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def eliminar_triggers(apps, schema_editor):
+    for sql in ELIMINAR_TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0005_tarea_busqueda_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenTareas',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumen_tareas', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.IntegerField(default=0)),
+                ('completadas', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen de tareas',
+                'verbose_name_plural': 'Resúmenes de tareas',
+                'db_table': 'tareas_resumen',
+            },
+        ),
+        migrations.RunPython(crear_resumen, eliminar_triggers),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Trigger que registra una lápida por cada fila borrada de `tareas`, con la
+# misma representación de fecha que usa Django en cada motor. Como los de
+# 0005 y 0006, se pierde si una migración posterior reconstruye `tareas`
+# en SQLite y debe volver a crearse.
+TRIGGERS = {
+    'sqlite': [
+        """
+        CREATE TRIGGER IF NOT EXISTS tareas_eliminadas_ad AFTER DELETE ON tareas BEGIN
+            INSERT INTO tareas_eliminadas(usuario_id, tarea_id, fecha_eliminacion)
+            VALUES (old.usuario_id, old.id, strftime('%Y-%m-%d %H:%M:%f', 'now') || '000');
+        END
+        """,
+    ],
+    'postgresql': [
+        """
+        CREATE OR REPLACE FUNCTION tareas_eliminadas_registrar() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO tareas_eliminadas(usuario_id, tarea_id, fecha_eliminacion)
+            VALUES (OLD.usuario_id, OLD.id, clock_timestamp());
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER tareas_eliminadas_ad AFTER DELETE ON tareas
+        FOR EACH ROW EXECUTE FUNCTION tareas_eliminadas_registrar()
+        """,
+    ],
+}
+
+ELIMINAR_TRIGGERS = {
+    'sqlite': [
+        "DROP TRIGGER IF EXISTS tareas_eliminadas_ad",
+    ],
+    'postgresql': [
+        "DROP TRIGGER IF EXISTS tareas_eliminadas_ad ON tareas",
+        "DROP FUNCTION IF EXISTS tareas_eliminadas_registrar()",
+    ],
+}
+
+
+def crear_triggers(apps, schema_editor):
+    for sql in TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def eliminar_triggers(apps, schema_editor):
+    for sql in ELIMINAR_TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0006_resumen_tareas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaEliminada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarea_id', models.BigIntegerField()),
+                ('fecha_eliminacion', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Tarea eliminada',
+                'verbose_name_plural': 'Tareas eliminadas',
+                'db_table': 'tareas_eliminadas',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='tareas_usuario_act_idx'),
+        ),
+        migrations.AddField(
+            model_name='tareaeliminada',
+            name='usuario',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tareaeliminada',
+            index=models.Index(fields=['usuario', 'fecha_eliminacion'], name='tareas_elim_usuario_idx'),
+        ),
+        migrations.RunPython(crear_triggers, eliminar_triggers),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Las tareas archivadas siguen contando en `tareas_resumen`: al archivar, el
+# INSERT en `tareas_archivadas` suma lo que resta el DELETE de `tareas`
+# (trigger de 0006), y borrar una tarea archivada la descuenta.
+TRIGGERS = {
+    'sqlite': [
+        """
+        CREATE TRIGGER IF NOT EXISTS tareas_archivadas_resumen_ai AFTER INSERT ON tareas_archivadas BEGIN
+            INSERT INTO tareas_resumen(usuario_id, total, completadas)
+            VALUES (new.usuario_id, 1, new.completado)
+            ON CONFLICT(usuario_id) DO UPDATE SET
+                total = total + 1,
+                completadas = completadas + excluded.completadas;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tareas_archivadas_resumen_ad AFTER DELETE ON tareas_archivadas BEGIN
+            UPDATE tareas_resumen
+            SET total = total - 1, completadas = completadas - old.completado
+            WHERE usuario_id = old.usuario_id;
+        END
+        """,
+    ],
+    'postgresql': [
+        # tareas_resumen_actualizar() (0006) solo usa usuario_id y completado.
+        """
+        CREATE TRIGGER tareas_archivadas_resumen_aid AFTER INSERT OR DELETE ON tareas_archivadas
+        FOR EACH ROW EXECUTE FUNCTION tareas_resumen_actualizar()
+        """,
+    ],
+}
+
+ELIMINAR_TRIGGERS = {
+    'sqlite': [
+        "DROP TRIGGER IF EXISTS tareas_archivadas_resumen_ad",
+        "DROP TRIGGER IF EXISTS tareas_archivadas_resumen_ai",
+    ],
+    'postgresql': [
+        "DROP TRIGGER IF EXISTS tareas_archivadas_resumen_aid ON tareas_archivadas",
+    ],
+}
+
+
+def crear_triggers(apps, schema_editor):
+    for sql in TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def eliminar_triggers(apps, schema_editor):
+    for sql in ELIMINAR_TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0007_sincronizacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaArchivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('titulo', models.CharField(max_length=200)),
+                ('descripcion', models.TextField()),
+                ('completado', models.BooleanField(default=True)),
+                ('fecha_creacion', models.DateTimeField()),
+                ('fecha_actualizacion', models.DateTimeField()),
+                ('fecha_archivado', models.DateTimeField(default=django.utils.timezone.now)),
+                ('usuario', models.ForeignKey(help_text='Usuario propietario de la tarea', on_delete=django.db.models.deletion.CASCADE, related_name='tareas_archivadas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarea archivada',
+                'verbose_name_plural': 'Tareas archivadas',
+                'db_table': 'tareas_archivadas',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['usuario', '-fecha_creacion', '-id'], name='tareas_arch_usuario_idx')],
+            },
+        ),
+        migrations.RunPython(crear_triggers, eliminar_triggers),
+    ]
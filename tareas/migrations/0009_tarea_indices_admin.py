@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0008_tareas_archivadas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['-fecha_creacion', '-id'], name='tareas_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['completado', '-fecha_creacion', '-id'], name='tareas_compl_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0010_trabajos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajo',
+            name='fecha_latido',
+            field=models.DateTimeField(blank=True, help_text='Última señal del trabajador que lo ejecuta; se renueva con el progreso', null=True),
+        ),
+    ]
@@ -1,5 +1,53 @@
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import connections, models, router, transaction
+from django.db.models import Lookup
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class TareaManager(models.Manager):
+    def alternar_completado(self, tarea_id, usuario):
+        """
+        Invierte `completado` de la tarea del usuario con una sola sentencia.
+
+        Ejecuta UPDATE ... SET completado = NOT completado (y actualiza
+        fecha_actualizacion) filtrando por id y usuario, de modo que dos
+        peticiones simultáneas nunca se anulan entre sí. Cuando el motor
+        admite RETURNING la tarea resultante se obtiene en la misma
+        sentencia. Retorna None si la tarea no existe o no es del usuario.
+        """
+        db = router.db_for_write(self.model)
+        connection = connections[db]
+        quote_name = connection.ops.quote_name
+        ahora = timezone.now()
+        sql = (
+            f'UPDATE {quote_name(self.model._meta.db_table)} '
+            f'SET {quote_name("completado")} = NOT {quote_name("completado")}, '
+            f'{quote_name("fecha_actualizacion")} = %s '
+            f'WHERE {quote_name("id")} = %s AND {quote_name("usuario_id")} = %s'
+        )
+        params = [connection.ops.adapt_datetimefield_value(ahora), tarea_id, usuario.pk]
+
+        if connection.vendor in ('sqlite', 'postgresql') and connection.features.can_return_columns_from_insert:
+            # raw() aplica los conversores del motor a las columnas devueltas.
+            tareas = list(self.raw(f'{sql} RETURNING *', params, using=db))
+        else:
+            with transaction.atomic(using=db):
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    actualizadas = cursor.rowcount
+                tareas = list(self.using(db).filter(pk=tarea_id)) if actualizadas else []
+
+        if not tareas:
+            return None
+        tarea = tareas[0]
+        tarea.usuario = usuario
+        return tarea
+
+    async def aalternar_completado(self, tarea_id, usuario):
+        """Versión asíncrona de alternar_completado (como aget/acreate del ORM)."""
+        return await sync_to_async(self.alternar_completado)(tarea_id, usuario)
+
 
 class Tarea(models.Model):
     """
@@ -34,16 +82,305 @@ class Tarea(models.Model):
         help_text="Fecha y hora de la última actualización"
     )
 
+    objects = TareaManager()
+
     class Meta:
         verbose_name = "Tarea"
         verbose_name_plural = "Tareas"
         ordering = ['-fecha_creacion']
         db_table = 'tareas'
+        indexes = [
+            # Listado por usuario ordenado por fecha (y desempate por id
+            # para la paginación por cursor) sin ordenar en memoria.
+            models.Index(
+                fields=['usuario', '-fecha_creacion', '-id'],
+                name='tareas_usuario_fecha_idx',
+            ),
+            # Filtro ?completado= manteniendo la misma ordenación.
+            models.Index(
+                fields=['usuario', 'completado', '-fecha_creacion', '-id'],
+                name='tareas_usuario_compl_idx',
+            ),
+            # Filtro ?titulo= (coincidencia exacta) manteniendo la ordenación.
+            models.Index(
+                fields=['usuario', 'titulo', '-fecha_creacion', '-id'],
+                name='tareas_usuario_titulo_idx',
+            ),
+            # Sincronización incremental (acción cambios): recorrido por
+            # (fecha_actualizacion, id) a partir del token del cliente.
+            models.Index(
+                fields=['usuario', 'fecha_actualizacion', 'id'],
+                name='tareas_usuario_act_idx',
+            ),
+            # Listado del admin (todas las tareas): orden por fecha,
+            # date_hierarchy y filtro por completado sin recorrer la tabla.
+            models.Index(
+                fields=['-fecha_creacion', '-id'],
+                name='tareas_fecha_idx',
+            ),
+            models.Index(
+                fields=['completado', '-fecha_creacion', '-id'],
+                name='tareas_compl_fecha_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.usuario.username}"
 
+    @staticmethod
+    def texto_estado(completado):
+        """Retorna el texto de estado correspondiente al valor de completado."""
+        return "Completada" if completado else "Pendiente"
+
     @property
     def estado(self):
         """Retorna el estado de la tarea como texto."""
-        return "Completada" if self.completado else "Pendiente"
+        return self.texto_estado(self.completado)
+
+
+class TareaArchivada(models.Model):
+    """
+    Tarea completada movida fuera de `tareas` por `manage.py archivar_tareas`.
+
+    Conserva el id original (los ids de `tareas` no se reutilizan) y las
+    fechas, de modo que el listado con ?incluir_archivadas=true puede
+    combinar ambas tablas con la misma representación. Es de solo lectura
+    desde la API.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='tareas_archivadas',
+        help_text="Usuario propietario de la tarea"
+    )
+    titulo = models.CharField(max_length=200)
+    descripcion = models.TextField()
+    completado = models.BooleanField(default=True)
+    fecha_creacion = models.DateTimeField()
+    fecha_actualizacion = models.DateTimeField()
+    fecha_archivado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Tarea archivada"
+        verbose_name_plural = "Tareas archivadas"
+        ordering = ['-fecha_creacion']
+        db_table = 'tareas_archivadas'
+        indexes = [
+            models.Index(
+                fields=['usuario', '-fecha_creacion', '-id'],
+                name='tareas_arch_usuario_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.titulo} (archivada)"
+
+    @property
+    def estado(self):
+        return Tarea.texto_estado(self.completado)
+
+
+# Motores en los que las migraciones 0006 y 0008 crean los triggers que
+# mantienen ResumenTareas; en el resto los contadores se calculan con un
+# agregado.
+MOTORES_CON_RESUMEN = ('sqlite', 'postgresql')
+
+
+class ResumenTareasManager(models.Manager):
+    def de_usuario(self, usuario):
+        """
+        Retorna los contadores de tareas del usuario.
+
+        Incluye las tareas archivadas. Con triggers disponibles es una
+        lectura por clave primaria; si no, se cuentan ambas tablas.
+        """
+        db = router.db_for_read(self.model)
+        if connections[db].vendor in MOTORES_CON_RESUMEN:
+            fila = self.using(db).filter(usuario=usuario).values('total', 'completadas').first()
+            fila = fila or {'total': 0, 'completadas': 0}
+        else:
+            fila = {'total': 0, 'completadas': 0}
+            for modelo in (Tarea, TareaArchivada):
+                parcial = modelo.objects.using(db).filter(usuario=usuario).aggregate(
+                    total=models.Count('id'),
+                    completadas=models.Count('id', filter=models.Q(completado=True)),
+                )
+                fila = {clave: fila[clave] + parcial[clave] for clave in fila}
+        return {**fila, 'pendientes': fila['total'] - fila['completadas']}
+
+
+class ResumenTareas(models.Model):
+    """
+    Contadores de tareas por usuario.
+
+    Los mantienen triggers de la base de datos (migración 0006) en la misma
+    transacción que cualquier INSERT, UPDATE o DELETE sobre `tareas`, de
+    modo que también cubren bulk_create, bulk_update, queryset.update() y
+    el UPDATE de alternar_completado. Las tareas archivadas siguen
+    contando (triggers de `tareas_archivadas`, migración 0008). `manage.py reconciliar_resumen`
+    detecta y corrige desviaciones.
+    """
+    usuario = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='resumen_tareas'
+    )
+    total = models.IntegerField(default=0)
+    completadas = models.IntegerField(default=0)
+
+    objects = ResumenTareasManager()
+
+    class Meta:
+        verbose_name = "Resumen de tareas"
+        verbose_name_plural = "Resúmenes de tareas"
+        db_table = 'tareas_resumen'
+
+    def __str__(self):
+        return f"{self.usuario_id}: {self.completadas}/{self.total}"
+
+    @property
+    def pendientes(self):
+        return self.total - self.completadas
+
+
+# Motores en los que la migración 0007 registra las eliminaciones con un
+# trigger; en el resto lo hace la señal post_delete (ver signals.py).
+MOTORES_CON_LAPIDAS = ('sqlite', 'postgresql')
+
+
+class TareaEliminada(models.Model):
+    """
+    Lápida de una tarea eliminada, para la sincronización incremental.
+
+    Un trigger (migración 0007) la inserta por cada fila borrada de
+    `tareas`, también en las eliminaciones por lotes y en cascada. Sin
+    restricción de clave foránea: las lápidas de un usuario eliminado no
+    bloquean su borrado y se purgan con las demás al superar la retención
+    (`manage.py purgar_eliminadas`).
+    """
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+    )
+    tarea_id = models.BigIntegerField()
+    fecha_eliminacion = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "Tarea eliminada"
+        verbose_name_plural = "Tareas eliminadas"
+        db_table = 'tareas_eliminadas'
+        indexes = [
+            models.Index(
+                fields=['usuario', 'fecha_eliminacion'],
+                name='tareas_elim_usuario_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tarea_id} ({self.fecha_eliminacion:%Y-%m-%d %H:%M})"
+
+
+class Trabajo(models.Model):
+    """
+    Trabajo en segundo plano (exportaciones, actualizaciones masivas...).
+
+    La API lo encola y responde de inmediato; `manage.py procesar_trabajos`
+    lo reclama y lo ejecuta en un pool de procesos (ver tareas/trabajos.py),
+    actualizando `procesadas`/`total` y `fecha_latido` a medida que avanza.
+    """
+    PENDIENTE = 'pendiente'
+    EN_CURSO = 'en_curso'
+    COMPLETADO = 'completado'
+    FALLIDO = 'fallido'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_CURSO, 'En curso'),
+        (COMPLETADO, 'Completado'),
+        (FALLIDO, 'Fallido'),
+    ]
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='trabajos',
+        help_text="Usuario que encoló el trabajo"
+    )
+    tipo = models.CharField(max_length=50, help_text="Tipo de trabajo (ver trabajos.TIPOS)")
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    procesadas = models.IntegerField(default=0)
+    total = models.IntegerField(null=True, blank=True)
+    resultado = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Archivo generado, relativo a TAREAS_TRABAJOS['DIRECTORIO']"
+    )
+    error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_latido = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Última señal del trabajador que lo ejecuta; se renueva con el progreso"
+    )
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+        ordering = ['-fecha_creacion']
+        db_table = 'tareas_trabajos'
+        indexes = [
+            # Cola: el trabajador busca el pendiente más antiguo.
+            models.Index(fields=['estado', 'id'], name='tareas_trab_estado_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.pk} ({self.estado})"
+
+
+class IndiceBusquedaField(models.TextField):
+    """
+    Columna oculta de FTS5 que lleva el nombre de la tabla virtual.
+
+    Solo se usa para filtrar con el lookup `match` sobre todas las
+    columnas indexadas a la vez.
+    """
+
+
+@IndiceBusquedaField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class TareaBusqueda(models.Model):
+    """
+    Índice de texto completo (SQLite FTS5) sobre el título y la descripción.
+
+    Es una tabla virtual de contenido externo sobre `tareas`, mantenida
+    por triggers creados en la migración 0005; Django no la gestiona.
+    """
+    tarea = models.OneToOneField(
+        Tarea,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='busqueda'
+    )
+    titulo = models.CharField(max_length=200)
+    descripcion = models.TextField()
+    indice = IndiceBusquedaField(db_column='tareas_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'tareas_fts'
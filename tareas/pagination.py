@@ -0,0 +1,168 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+class TareaCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) sobre (fecha_creacion, id).
+
+    A diferencia de PageNumberPagination no ejecuta COUNT(*) ni OFFSET:
+    cada página filtra a partir de la última fila vista usando la
+    ordenación del modelo (-fecha_creacion) con el id como desempate,
+    por lo que las páginas se mantienen estables aunque se inserten
+    tareas nuevas mientras el cliente pagina.
+    """
+    ordering = ('-fecha_creacion', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = self.cursor.reverse, self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by('fecha_creacion', 'id')
+        else:
+            queryset = queryset.order_by('-fecha_creacion', '-id')
+
+        if position is not None:
+            queryset = queryset.filter(self._filtro_posicion(position, reverse))
+
+        # Se pide una fila extra para saber si existe una página siguiente.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None
+
+        return self.page
+
+    def _filtro_posicion(self, position, reverse):
+        """Construye la condición keyset a partir de la posición del cursor."""
+        fecha, tarea_id = self._decode_position(position)
+        lookup = 'gt' if reverse else 'lt'
+        return (
+            Q(**{f'fecha_creacion__{lookup}': fecha})
+            | Q(fecha_creacion=fecha, **{f'id__{lookup}': tarea_id})
+        )
+
+    def _decode_position(self, position):
+        try:
+            fecha, tarea_id = position.rsplit('|', 1)
+            fecha = parse_datetime(fecha)
+            tarea_id = int(tarea_id)
+        except (AttributeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if fecha is None:
+            raise NotFound(self.invalid_cursor_message)
+        return fecha, tarea_id
+
+    def _encode_position(self, instance):
+        if isinstance(instance, dict):
+            fecha, tarea_id = instance['fecha_creacion'], instance['id']
+        else:
+            fecha, tarea_id = instance.fecha_creacion, instance.id
+        return f'{fecha.isoformat()}|{tarea_id}'
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._encode_position(self.page[-1]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._encode_position(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class PaginadorConTotal(Paginator):
+    """Paginator que reutiliza un total ya calculado en lugar de repetir el COUNT."""
+
+    def __init__(self, object_list, per_page, total=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if total is not None:
+            self.count = total
+
+
+class TareaPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination que recibe en `total` el número de filas del
+    listado, ya contado por el agregado del ETag, para no contarlas dos veces.
+    """
+    total = None
+
+    def django_paginator_class(self, queryset, page_size):
+        return PaginadorConTotal(queryset, page_size, total=self.total)
+
+
+def estimar_filas(modelo, using):
+    """
+    Número aproximado de filas de la tabla de `modelo` según las
+    estadísticas del motor (pg_class en PostgreSQL, sqlite_stat1 tras
+    ANALYZE o PRAGMA optimize en SQLite). None si no hay estadísticas.
+    """
+    connection = connections[using]
+    tabla = modelo._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [tabla])
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # La primera cifra de `stat` es el número de filas del índice.
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [tabla])
+        else:
+            return None
+        fila = cursor.fetchone()
+    if fila is None or fila[0] is None:
+        return None
+    estimado = int(str(fila[0]).split()[0])
+    # PostgreSQL devuelve -1 si la tabla nunca se ha analizado.
+    return estimado if estimado >= 0 else None
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Paginator para el admin de tablas grandes.
+
+    Cuenta de forma exacta hasta `limite_exacto` filas con un COUNT sobre
+    una subconsulta con LIMIT, de coste acotado. Por encima, un listado
+    sin filtros usa la estimación de estimar_filas, y uno filtrado se
+    queda en `limite_exacto` (las páginas posteriores no se enlazan; hay
+    que acotar más los filtros).
+    """
+    limite_exacto = 10000
+
+    @cached_property
+    def count(self):
+        acotado = self.object_list[:self.limite_exacto + 1].count()
+        if acotado <= self.limite_exacto:
+            return acotado
+        if not self.object_list.query.has_filters():
+            estimado = estimar_filas(self.object_list.model, self.object_list.db)
+            if estimado is not None and estimado > self.limite_exacto:
+                return estimado
+        return self.limite_exacto
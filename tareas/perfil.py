@@ -0,0 +1,261 @@
+"""
+Perfilado de peticiones.
+
+PerfilPeticionMiddleware mide cada petición (consultas y tiempo en la base
+de datos, autenticación, vista, serialización y renderizado), lo expone en
+la cabecera Server-Timing y lo registra como una línea JSON en el logger
+`tareas.perfil`. Una fracción configurable de las peticiones se perfila
+además con cProfile y el volcado se guarda en disco para analizarlo con
+pstats o snakeviz.
+
+Las fases se miden con medir(), que el resto del código llama en los
+puntos relevantes. Sin el middleware en MIDDLEWARE no hay medición activa
+y medir() solo consulta una variable de contexto.
+"""
+import contextvars
+import cProfile
+import json
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('tareas.perfil')
+
+CONFIGURACION_POR_DEFECTO = {
+    # Fracción de peticiones que se perfilan con cProfile (0 = ninguna).
+    'MUESTREO': 0.0,
+    # Directorio donde se escriben los volcados .prof, relativo a BASE_DIR.
+    'DIRECTORIO': 'perfiles',
+    # Añadir la cabecera Server-Timing a las respuestas.
+    'CABECERA': True,
+    # Registrar una línea por petición en el logger tareas.perfil.
+    'LOG': True,
+}
+
+_medicion_actual = contextvars.ContextVar('tareas_medicion', default=None)
+_SIN_MEDICION = nullcontext()
+
+
+def _configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'TAREAS_PERFIL', {})}
+
+
+def medir(fase):
+    """
+    Retorna un gestor de contexto que acumula su duración en `fase`.
+
+    Fuera de una petición medida retorna siempre el mismo nullcontext.
+    """
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return _SIN_MEDICION
+    return medicion.fase(fase)
+
+
+class Medicion:
+    """Tiempos y consultas acumulados durante una petición."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.fases = {}
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.inicio_vista = None
+        self._activas = set()
+
+    @contextmanager
+    def fase(self, nombre):
+        # Las llamadas anidadas a la misma fase (p. ej. to_representation
+        # dentro de serializar) se cuentan una sola vez.
+        if nombre in self._activas:
+            yield
+            return
+        self._activas.add(nombre)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._activas.discard(nombre)
+            self.sumar(nombre, time.perf_counter() - inicio)
+
+    def sumar(self, nombre, segundos):
+        self.fases[nombre] = self.fases.get(nombre, 0.0) + segundos
+
+    def __call__(self, execute, sql, params, many, context):
+        """Ejecuta la consulta contando su número y duración (ver _contar_consulta)."""
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.tiempo_db += time.perf_counter() - inicio
+
+    def duraciones(self, total):
+        """Duraciones en milisegundos, en el orden en que se publican."""
+        duraciones = {'db': self.tiempo_db * 1000}
+        for nombre in ('auth', 'vista', 'serializacion', 'render'):
+            if nombre in self.fases:
+                duraciones[nombre] = self.fases[nombre] * 1000
+        duraciones['total'] = total * 1000
+        return duraciones
+
+    def server_timing(self, total):
+        partes = []
+        for nombre, ms in self.duraciones(total).items():
+            parte = f'{nombre};dur={ms:.2f}'
+            if nombre == 'db':
+                parte += f';desc="{self.consultas} consultas"'
+            partes.append(parte)
+        return ', '.join(partes)
+
+
+def _contar_consulta(execute, sql, params, many, context):
+    """execute_wrapper permanente: cuenta en la medición de la petición en curso, si la hay."""
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    return medicion(execute, sql, params, many, context)
+
+
+def _instalar_contador(sender=None, connection=None, **kwargs):
+    if _contar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_contar_consulta)
+
+
+class PerfilPeticionMiddleware:
+    """
+    Middleware de perfilado por petición.
+
+    Conviene situarlo al principio de MIDDLEWARE para que el total incluya
+    el resto de middlewares. La fase `vista` incluye la autenticación y la
+    serialización, que se publican también por separado. El cuerpo de las
+    respuestas en streaming se genera después y no se mide.
+
+    Bajo ASGI espera a get_response sin adaptarlo a un hilo: el perfilado no
+    añade saltos entre hilos que falseen los tiempos de las vistas async. En
+    ese modo cProfile mide también lo que el bucle de eventos ejecute
+    mientras la petición espera.
+
+    Las conexiones son propias de cada hilo y bajo ASGI las consultas se
+    ejecutan en el hilo de sync_to_async, no en el del middleware. Por eso
+    el contador de consultas se instala una vez en cada conexión (al
+    abrirse) y encuentra la medición a través de la variable de contexto,
+    que sync_to_async propaga.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django adapta con sync_to_async los métodos de enganche síncronos.
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+        connection_created.connect(_instalar_contador, dispatch_uid='tareas.perfil')
+        for conexion in connections.all(initialized_only=True):
+            _instalar_contador(connection=conexion)
+        configuracion = _configuracion()
+        self.muestreo = configuracion['MUESTREO']
+        # Una ruta relativa se toma desde BASE_DIR y no desde el directorio actual.
+        self.directorio = Path(settings.BASE_DIR) / configuracion['DIRECTORIO']
+        self.cabecera = configuracion['CABECERA']
+        self.log = configuracion['LOG']
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        medicion = Medicion()
+        perfil = self.nuevo_perfil()
+        with self.midiendo(request, medicion, perfil):
+            response = self.get_response(request)
+        return self.terminar(request, response, medicion, perfil)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        perfil = self.nuevo_perfil()
+        with self.midiendo(request, medicion, perfil):
+            response = await self.get_response(request)
+        return self.terminar(request, response, medicion, perfil)
+
+    def nuevo_perfil(self):
+        """Un cProfile.Profile para la fracción MUESTREO de las peticiones, o None."""
+        return cProfile.Profile() if self.muestreo and random.random() < self.muestreo else None
+
+    @contextmanager
+    def midiendo(self, request, medicion, perfil):
+        """Activa la medición (y el perfil, si lo hay) mientras se atiende la petición."""
+        request._medicion = medicion
+        token = _medicion_actual.set(medicion)
+        if perfil is not None:
+            perfil.enable()
+        try:
+            yield
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            _medicion_actual.reset(token)
+
+    def terminar(self, request, response, medicion, perfil):
+        """Publica y registra la medición de la respuesta ya obtenida."""
+        total = time.perf_counter() - medicion.inicio
+
+        if 'vista' not in medicion.fases and medicion.inicio_vista is not None:
+            medicion.sumar('vista', time.perf_counter() - medicion.inicio_vista)
+        if self.cabecera:
+            response['Server-Timing'] = medicion.server_timing(total)
+        archivo = self.volcar(perfil, request, total) if perfil is not None else None
+        if self.log:
+            self.registrar(request, response, medicion, total, archivo)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._medicion.inicio_vista = time.perf_counter()
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        request._medicion.inicio_vista = time.perf_counter()
+
+    async def aprocess_template_response(self, request, response):
+        return PerfilPeticionMiddleware.process_template_response(self, request, response)
+
+    def process_template_response(self, request, response):
+        # Las respuestas de DRF se renderizan justo después de este método.
+        medicion = request._medicion
+        inicio_render = time.perf_counter()
+        if medicion.inicio_vista is not None:
+            medicion.sumar('vista', inicio_render - medicion.inicio_vista)
+        response.add_post_render_callback(
+            lambda respuesta: medicion.sumar('render', time.perf_counter() - inicio_render)
+        )
+        return response
+
+    def volcar(self, perfil, request, total):
+        """Escribe el volcado de cProfile y retorna su ruta."""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        ruta = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'raiz'
+        archivo = self.directorio / (
+            f'{time.strftime("%Y%m%d-%H%M%S")}_{request.method}_{ruta}_{total * 1000:.0f}ms.prof'
+        )
+        perfil.dump_stats(archivo)
+        return archivo
+
+    def registrar(self, request, response, medicion, total, archivo):
+        datos = {
+            'metodo': request.method,
+            'ruta': request.path,
+            'estado': response.status_code,
+            'consultas': medicion.consultas,
+            **{f'{nombre}_ms': round(ms, 2) for nombre, ms in medicion.duraciones(total).items()},
+        }
+        if archivo is not None:
+            datos['perfil'] = str(archivo)
+        logger.info(json.dumps(datos), extra={'perfil': datos})
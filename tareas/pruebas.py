@@ -0,0 +1,36 @@
+"""
+Ejecutor de las pruebas (TEST_RUNNER).
+
+CACHES['tareas_versiones'] es una FileBasedCache bajo BASE_DIR, y Django
+la instancia (y crea su directorio) ya en las comprobaciones del sistema.
+EjecutorPruebas la lleva a un directorio temporal antes de ellas y lo
+elimina al terminar, de modo que las pruebas no escriben en el árbol del
+proyecto. Sigue siendo FileBasedCache: las pruebas que invalidan desde un
+proceso hijo necesitan una caché compartida.
+"""
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class EjecutorPruebas(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._directorio_versiones = tempfile.mkdtemp(prefix='tareas-versiones-')
+        self._caches = override_settings(CACHES={
+            **settings.CACHES,
+            'tareas_versiones': {
+                **settings.CACHES['tareas_versiones'],
+                'LOCATION': self._directorio_versiones,
+            },
+        })
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        shutil.rmtree(self._directorio_versiones, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
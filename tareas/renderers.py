@@ -0,0 +1,67 @@
+"""
+Renderers de la API.
+
+JSONRapidoRenderer produce los mismos bytes que JSONRenderer de DRF usando
+orjson, y MessagePackRenderer ofrece una representación binaria más
+compacta que el cliente elige con `Accept: application/msgpack`. Ambas
+bibliotecas son opcionales: sin orjson se usa el renderer de DRF y, sin
+msgpack, NegociacionContenido descarta el renderer (406 si es el único
+aceptable).
+"""
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende del entorno
+    msgpack = None
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    """
+    JSONRenderer con orjson.
+
+    Las fechas, decimales y demás tipos no nativos pasan por el mismo
+    JSONEncoder de DRF para que la salida sea idéntica. Con indentación
+    (navegador o `Accept: application/json; indent=4`) se usa el de DRF.
+    """
+    disponible = True
+    _opciones = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self._opciones)
+        # Igual que DRF: U+2028/U+2029 escapados por compatibilidad con JavaScript.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Serializa la respuesta en MessagePack (requiere el paquete msgpack)."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    disponible = msgpack is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True, default=JSONRenderer.encoder_class().default)
+
+
+class NegociacionContenido(DefaultContentNegotiation):
+    """Negociación de DRF sin los renderers cuya biblioteca no está instalada."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderers = [renderer for renderer in renderers if getattr(renderer, 'disponible', True)]
+        return super().select_renderer(request, renderers, format_suffix)
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class LecturaEscrituraRouter:
+    """
+    Envía las lecturas de la app tareas a la conexión de solo lectura.
+
+    Las escrituras van siempre a la base de datos principal. Dentro de una
+    transacción de la principal (select_for_update, lecturas tras una
+    escritura en el mismo atomic) las lecturas también se quedan en ella,
+    para que vean sus propios cambios.
+    """
+    app_label = 'tareas'
+    alias_lectura = 'lectura'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label or self.alias_lectura not in connections:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return self.alias_lectura
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ambos alias apuntan al mismo archivo: una tarea leída de 'lectura'
+        # puede relacionarse con su usuario de 'default'. El resto de modelos
+        # siguen con la comprobación de Django (misma base de datos).
+        if self._relacionable(obj1) and self._relacionable(obj2):
+            return True
+        return None
+
+    def _relacionable(self, obj):
+        return obj._meta.app_label == self.app_label or obj._meta.label == settings.AUTH_USER_MODEL
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != self.alias_lectura
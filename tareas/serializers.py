@@ -1,5 +1,89 @@
 from rest_framework import serializers
-from .models import Tarea
+from rest_framework.reverse import reverse
+from django.db.models import F
+from django.utils import timezone
+from .models import Tarea, Trabajo
+from .perfil import medir
+
+# Columnas que necesita cada campo de salida en la ruta de lectura rápida.
+COLUMNAS_POR_CAMPO = {
+    'id': ('id',),
+    'usuario': ('usuario_nombre',),
+    'titulo': ('titulo',),
+    'descripcion': ('descripcion',),
+    'completado': ('completado',),
+    'fecha_creacion': ('fecha_creacion',),
+    'fecha_actualizacion': ('fecha_actualizacion',),
+    'estado': ('completado',),
+}
+
+
+def seleccionar_campos(fields=None, exclude=None):
+    """
+    Interpreta los parámetros ?fields= y ?exclude= (nombres separados por comas).
+
+    Retorna la tupla de campos a incluir, en el orden de TareaSerializer, o
+    None si se piden todos. Un nombre desconocido lanza ValidationError.
+    """
+    if not fields and not exclude:
+        return None
+    disponibles = tuple(COLUMNAS_POR_CAMPO)
+    errores = {}
+    seleccion = {}
+    for parametro, valor in (('fields', fields), ('exclude', exclude)):
+        nombres = [nombre.strip() for nombre in (valor or '').split(',') if nombre.strip()]
+        desconocidos = [nombre for nombre in nombres if nombre not in disponibles]
+        if desconocidos:
+            errores[parametro] = [
+                f"Campos desconocidos: {', '.join(desconocidos)}. "
+                f"Disponibles: {', '.join(disponibles)}."
+            ]
+        seleccion[parametro] = set(nombres)
+    if errores:
+        raise serializers.ValidationError(errores)
+    campos = tuple(
+        campo for campo in disponibles
+        if (not seleccion['fields'] or campo in seleccion['fields'])
+        and campo not in seleccion['exclude']
+    )
+    if not campos:
+        raise serializers.ValidationError({'fields': ['La selección no incluye ningún campo.']})
+    return None if campos == disponibles else campos
+
+
+class TareaListSerializer(serializers.ListSerializer):
+    """
+    Serializer de listas para operaciones por lotes.
+
+    Escribe todas las tareas con una sola sentencia (bulk_create /
+    bulk_update) en lugar de guardar cada instancia por separado.
+    """
+
+    @property
+    def data(self):
+        with medir('serializacion'):
+            return super().data
+
+    def create(self, validated_data):
+        tareas = [Tarea(**attrs) for attrs in validated_data]
+        return Tarea.objects.bulk_create(tareas)
+
+    def update(self, instance, validated_data):
+        """
+        Actualiza las instancias de `instance` (en el mismo orden que
+        `validated_data`) con un único bulk_update.
+        """
+        # bulk_update no aplica auto_now, así que se asigna explícitamente.
+        ahora = timezone.now()
+        campos = {'fecha_actualizacion'}
+        for tarea, attrs in zip(instance, validated_data):
+            for campo, valor in attrs.items():
+                setattr(tarea, campo, valor)
+                campos.add(campo)
+            tarea.fecha_actualizacion = ahora
+        Tarea.objects.bulk_update(instance, sorted(campos))
+        return instance
+
 
 class TareaSerializer(serializers.ModelSerializer):
     """
@@ -7,6 +91,8 @@ class TareaSerializer(serializers.ModelSerializer):
     
     Permite la serialización y deserialización de objetos Tarea.
     El campo usuario se establece automáticamente como solo lectura.
+    Con `campos` (ver seleccionar_campos) la salida se limita a esos campos;
+    la entrada sigue aceptando todos los campos escribibles.
     """
     usuario = serializers.ReadOnlyField(
         source='usuario.username',
@@ -20,7 +106,23 @@ class TareaSerializer(serializers.ModelSerializer):
         model = Tarea
         fields = ['id', 'usuario', 'titulo', 'descripcion', 'completado', 'fecha_creacion', 'fecha_actualizacion', 'estado']
         read_only_fields = ['id', 'usuario', 'fecha_creacion', 'fecha_actualizacion', 'estado']
-        
+        list_serializer_class = TareaListSerializer
+
+    def __init__(self, *args, campos=None, **kwargs):
+        self.campos = campos
+        super().__init__(*args, **kwargs)
+
+    @property
+    def data(self):
+        with medir('serializacion'):
+            return super().data
+
+    def to_representation(self, instance):
+        datos = super().to_representation(instance)
+        if self.campos is None:
+            return datos
+        return {campo: datos[campo] for campo in self.campos}
+
     def validate_titulo(self, value):
         """
         Valida que el título no esté vacío y tenga un formato adecuado.
@@ -35,4 +137,114 @@ class TareaSerializer(serializers.ModelSerializer):
         """
         if not value.strip():
             raise serializers.ValidationError("La descripción no puede estar vacía")
-        return value.strip() 
\ No newline at end of file
+        return value.strip()
+
+
+class TareaLecturaRapida:
+    """
+    Serialización de solo lectura para listar y obtener tareas.
+
+    Produce exactamente la misma salida que TareaSerializer, pero lee solo
+    las columnas necesarias con values() y construye cada diccionario con
+    una función fija, sin instanciar campos de DRF por fila.
+
+    Con `campos` solo se leen las columnas de esos campos: sin `usuario` no
+    se une la tabla de usuarios y sin `descripcion` no se lee el texto.
+    """
+    columnas = (
+        'id', 'usuario_nombre', 'titulo', 'descripcion', 'completado',
+        'fecha_creacion', 'fecha_actualizacion',
+    )
+    # Siempre se leen: ETag, Last-Modified y posición del cursor.
+    columnas_base = ('id', 'fecha_creacion', 'fecha_actualizacion')
+
+    def __init__(self, campos=None):
+        # Mismo formato de fechas (zona horaria e ISO 8601) que el serializer.
+        self._fecha = serializers.DateTimeField().to_representation
+        self.campos = campos or TareaSerializer.Meta.fields
+        if campos is not None:
+            necesarias = set(self.columnas_base)
+            for campo in campos:
+                necesarias.update(COLUMNAS_POR_CAMPO[campo])
+            self.columnas = tuple(columna for columna in self.columnas if columna in necesarias)
+            extractores = self._extractores()
+            self._seleccion = [(campo, extractores[campo]) for campo in campos]
+            self._representar = self._representar_seleccion
+
+    def preparar(self, queryset):
+        """Reduce el queryset a las columnas que necesita la representación."""
+        if 'usuario_nombre' in self.columnas:
+            queryset = queryset.annotate(usuario_nombre=F('usuario__username'))
+        return queryset.values(*self.columnas)
+
+    def _extractores(self):
+        fecha = self._fecha
+        return {
+            'id': lambda fila: fila['id'],
+            'usuario': lambda fila: fila['usuario_nombre'],
+            'titulo': lambda fila: fila['titulo'],
+            'descripcion': lambda fila: fila['descripcion'],
+            'completado': lambda fila: fila['completado'],
+            'fecha_creacion': lambda fila: fecha(fila['fecha_creacion']),
+            'fecha_actualizacion': lambda fila: fecha(fila['fecha_actualizacion']),
+            'estado': lambda fila: Tarea.texto_estado(fila['completado']),
+        }
+
+    def _representar_seleccion(self, fila):
+        return {campo: extraer(fila) for campo, extraer in self._seleccion}
+
+    def to_representation(self, fila):
+        with medir('serializacion'):
+            return self._representar(fila)
+
+    def _representar(self, fila):
+        fecha = self._fecha
+        return {
+            'id': fila['id'],
+            'usuario': fila['usuario_nombre'],
+            'titulo': fila['titulo'],
+            'descripcion': fila['descripcion'],
+            'completado': fila['completado'],
+            'fecha_creacion': fecha(fila['fecha_creacion']),
+            'fecha_actualizacion': fecha(fila['fecha_actualizacion']),
+            'estado': Tarea.texto_estado(fila['completado']),
+        }
+
+    def serializar(self, filas):
+        representar = self._representar
+        with medir('serializacion'):
+            return [representar(fila) for fila in filas]
+
+
+class TrabajoSerializer(serializers.ModelSerializer):
+    """
+    Estado de un trabajo en segundo plano (ver tareas/trabajos.py).
+
+    `progreso` es el porcentaje completado, o null mientras no se conoce el
+    total. `resultado` es la URL de descarga del archivo generado, o null.
+    """
+    progreso = serializers.SerializerMethodField()
+    resultado = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Trabajo
+        fields = [
+            'id', 'tipo', 'parametros', 'estado', 'procesadas', 'total', 'progreso',
+            'resultado', 'error', 'fecha_creacion', 'fecha_inicio', 'fecha_fin',
+        ]
+        read_only_fields = fields
+
+    def get_progreso(self, trabajo):
+        if trabajo.estado == Trabajo.COMPLETADO:
+            return 100
+        if not trabajo.total:
+            return None
+        return min(100, trabajo.procesadas * 100 // trabajo.total)
+
+    def get_resultado(self, trabajo):
+        if trabajo.estado != Trabajo.COMPLETADO or not trabajo.resultado:
+            return None
+        return reverse(
+            'tarea-resultado-trabajo', kwargs={'trabajo_id': trabajo.pk},
+            request=self.context.get('request'),
+        )
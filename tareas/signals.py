@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import authentication
+from .cache import invalidar_usuario
+from .models import MOTORES_CON_LAPIDAS, Tarea, TareaEliminada
+
+
+@receiver(post_save, sender=Tarea)
+@receiver(post_delete, sender=Tarea)
+def invalidar_cache_listado(sender, instance, **kwargs):
+    """Invalida el listado en caché del propietario de la tarea modificada."""
+    invalidar_usuario(instance.usuario_id)
+
+
+@receiver(post_delete, sender=Tarea)
+def registrar_lapida(sender, instance, using, **kwargs):
+    """Registra la eliminación en los motores sin el trigger de la migración 0007."""
+    if connections[using].vendor in MOTORES_CON_LAPIDAS:
+        return
+    TareaEliminada.objects.using(using).create(
+        usuario_id=instance.usuario_id, tarea_id=instance.pk
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_usuario_autenticado(sender, instance, **kwargs):
+    """Descarta el usuario de la caché de autenticación (p. ej. al desactivarlo)."""
+    authentication.usuarios.invalidar(instance.pk)
+
+
+@receiver(connection_created)
+def aplicar_pragmas_sqlite(sender, connection, **kwargs):
+    """Aplica TAREAS_SQLITE_PRAGMAS (WAL, synchronous, mmap...) a cada conexión SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    solo_lectura = 'mode=ro' in str(connection.settings_dict['NAME'])
+    for nombre, valor in getattr(settings, 'TAREAS_SQLITE_PRAGMAS', {}).items():
+        if nombre == 'journal_mode' and solo_lectura:
+            # El modo de diario se guarda en el archivo; lo fija la conexión principal.
+            continue
+        connection.connection.execute(f'PRAGMA {nombre} = {valor}')
@@ -0,0 +1,121 @@
+"""
+Sincronización incremental de tareas (acción `cambios`).
+
+El token que recibe el cliente es una marca de agua opaca: una posición
+(fecha_actualizacion, id) en el orden de recorrido. Cada respuesta incluye
+las tareas posteriores a esa posición y los ids de las eliminadas desde
+entonces (lápidas de TareaEliminada), junto con el token siguiente.
+
+Las fechas las asigna el servidor, nunca el cliente. Una escritura puede
+confirmarse algo después de la fecha que registra, y varios servidores
+pueden tener relojes algo desfasados. Por eso, cuando la respuesta llega al
+final de los cambios, el token siguiente se retrasa MARGEN segundos
+respecto a la hora actual. Las tareas de ese intervalo se vuelven a enviar
+en la siguiente sincronización, y el cliente las aplica de forma
+idempotente por id. Los ids de las tareas no se reutilizan.
+"""
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import TareaEliminada
+
+CONFIGURACION_POR_DEFECTO = {
+    # Segundos que se retrasa el token respecto a la hora actual.
+    'MARGEN': 30,
+    # Días que se conservan las lápidas; los tokens más antiguos caducan.
+    'RETENCION_DIAS': 30,
+    # Tareas por respuesta (parámetro `limite`) y su máximo.
+    'LIMITE': 500,
+    'MAX_LIMITE': 1000,
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'TAREAS_SINCRONIZACION', {})}
+
+
+class TokenCaducado(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = (
+        'El token es anterior al periodo de retención de eliminaciones. '
+        'Vuelva a sincronizar sin el parámetro since.'
+    )
+    default_code = 'token_caducado'
+
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSEGUNDO = timedelta(microseconds=1)
+
+
+def microsegundos(fecha):
+    """Microsegundos desde la época (también para los ETag, ver condicional.py)."""
+    # Aritmética entera: timestamp() pierde microsegundos al pasar por float.
+    return (fecha - _EPOCA) // _MICROSEGUNDO
+
+
+def codificar_token(fecha, tarea_id=0):
+    """Token opaco para la posición (fecha, id)."""
+    valor = f'{microsegundos(fecha)}.{tarea_id}'.encode('ascii')
+    return base64.urlsafe_b64encode(valor).decode('ascii').rstrip('=')
+
+
+def decodificar_token(token):
+    """Retorna la posición (fecha, id) del token o lanza ValidationError."""
+    try:
+        relleno = '=' * (-len(token) % 4)
+        marca, tarea_id = base64.urlsafe_b64decode(token + relleno).decode('ascii').split('.')
+        fecha = _EPOCA + int(marca) * _MICROSEGUNDO
+        return fecha, int(tarea_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError, OSError):
+        raise ValidationError({'since': ['Token de sincronización no válido.']})
+
+
+def cambios_desde(queryset, usuario, token=None, limite=None):
+    """
+    Calcula los cambios de `queryset` (tareas del usuario, ya reducido a
+    filas con values(); ver TareaLecturaRapida.preparar) desde `token`.
+
+    Retorna (tareas, ids_eliminadas, token_siguiente, completo). Las tareas
+    se devuelven en orden (fecha_actualizacion, id). Si hay más de `limite`,
+    el token siguiente apunta a la última devuelta y `completo` es False.
+    """
+    ajustes = configuracion()
+    ahora = timezone.now()
+    limite = limite or ajustes['LIMITE']
+
+    if token is None:
+        fecha, tarea_id = None, 0
+    else:
+        fecha, tarea_id = decodificar_token(token)
+        if fecha < ahora - timedelta(days=ajustes['RETENCION_DIAS']):
+            raise TokenCaducado()
+        queryset = queryset.filter(
+            Q(fecha_actualizacion__gt=fecha) | Q(fecha_actualizacion=fecha, id__gt=tarea_id)
+        )
+    tareas = list(queryset.order_by('fecha_actualizacion', 'id')[:limite + 1])
+    completo = len(tareas) <= limite
+    tareas = tareas[:limite]
+
+    if completo:
+        hasta = ahora - timedelta(seconds=ajustes['MARGEN'])
+        siguiente = codificar_token(hasta)
+    else:
+        ultima = tareas[-1]
+        hasta = ultima['fecha_actualizacion']
+        siguiente = codificar_token(hasta, ultima['id'])
+
+    # En la sincronización inicial no hay nada que eliminar en el cliente.
+    eliminadas = []
+    if fecha is not None:
+        lapidas = TareaEliminada.objects.filter(usuario=usuario, fecha_eliminacion__gt=fecha)
+        if not completo:
+            lapidas = lapidas.filter(fecha_eliminacion__lte=hasta)
+        eliminadas = list(lapidas.order_by('fecha_eliminacion').values_list('tarea_id', flat=True))
+    return tareas, eliminadas, siguiente, completo
@@ -1,20 +1,73 @@
-from django.test import TestCase
-from .models import Tarea
-from django.contrib.auth.models import User
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import pstats
+import tempfile
+import threading
+import tracemalloc
+import time
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from .models import ResumenTareas, Tarea, TareaArchivada, TareaEliminada, Trabajo
+from .serializers import TareaSerializer, TareaLecturaRapida
+from .views import TareaViewSet
+from . import archivo
+from . import authentication
+from . import cache as cache_tareas
+from . import esquema
+from . import compresion
+from . import eliminacion
+from . import perfil
+from . import renderers
+from . import sincronizacion
+from . import trabajos
+from .condicional import etag_tarea
+from .eliminacion import eliminar_usuario
+from .filters import BusquedaTextoFilter
+from .pagination import PaginadorEstimado, estimar_filas
+from django.contrib.auth.models import Permission, User
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+from django.utils import timezone
+from django.db import OperationalError, connection, connections, router, transaction
+from django.test.utils import CaptureQueriesContext
 
 # Create your tests here.
 
+# Desactiva la caché de listados en las pruebas que escriben directamente
+# con el ORM (bulk_create no emite señales) o que cuentan consultas.
+SIN_CACHE = override_settings(CACHES={
+    **settings.CACHES,
+    'tareas': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+})
+
 class TareaModelTest(TestCase):
     def test_creacion_tarea(self):
+        usuario = User.objects.create_user(username='modeluser', password='testpass')
         tarea = Tarea.objects.create(
+            usuario=usuario,
             titulo='Prueba',
             descripcion='Descripción de prueba',
             completado=False
         )
         self.assertEqual(tarea.titulo, 'Prueba')
         self.assertFalse(tarea.completado)
+        self.assertEqual(tarea.estado, 'Pendiente')
 
 class TareaAPITest(TestCase):
     def setUp(self):
@@ -28,10 +81,1848 @@ class TareaAPITest(TestCase):
 
     def test_usuario_autenticado_puede_crear_tarea(self):
         self.client.force_authenticate(user=self.user)
-        response = self.client.post('/tareas/', self.tarea_data, format='json')
+        response = self.client.post('/api/tareas/', self.tarea_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['usuario'], 'testuser')
 
     def test_usuario_no_autenticado_no_puede_crear_tarea(self):
         self.client.force_authenticate(user=None)
-        response = self.client.post('/tareas/', self.tarea_data, format='json')
+        response = self.client.post('/api/tareas/', self.tarea_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+@SIN_CACHE
+class TareaCursorPaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='cursoruser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        # Todas con la misma fecha de creación para forzar el desempate por id.
+        fecha = timezone.now()
+        self.tareas = Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'Tarea {i}', descripcion='Descripción')
+            for i in range(25)
+        ])
+        Tarea.objects.filter(usuario=self.user).update(fecha_creacion=fecha)
+
+    def _ids(self, response):
+        return [tarea['id'] for tarea in response.data['results']]
+
+    def test_modo_cursor_no_incluye_count(self):
+        response = self.client.get('/api/tareas/?paginacion=cursor')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_recorrido_completo_sin_duplicados(self):
+        vistos = []
+        url = '/api/tareas/?paginacion=cursor'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            vistos.extend(self._ids(response))
+            url = response.data['next']
+        esperados = sorted((t.id for t in self.tareas), reverse=True)
+        self.assertEqual(vistos, esperados)
+
+    def test_estable_ante_inserciones_concurrentes(self):
+        primera = self.client.get('/api/tareas/?paginacion=cursor')
+        Tarea.objects.create(usuario=self.user, titulo='Nueva', descripcion='Insertada')
+        segunda = self.client.get(primera.data['next'])
+        self.assertEqual(self._ids(segunda), sorted((t.id for t in self.tareas), reverse=True)[10:20])
+
+    def test_enlace_previous_vuelve_a_la_pagina_anterior(self):
+        primera = self.client.get('/api/tareas/?paginacion=cursor')
+        segunda = self.client.get(primera.data['next'])
+        anterior = self.client.get(segunda.data['previous'])
+        self.assertEqual(self._ids(anterior), self._ids(primera))
+
+    def test_cursor_invalido(self):
+        response = self.client.get('/api/tareas/?cursor=invalido')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_paginacion_por_defecto_se_mantiene(self):
+        response = self.client.get('/api/tareas/')
+        self.assertEqual(response.data['count'], 25)
+
+@SIN_CACHE
+class TareaQueryPlanTest(TestCase):
+    """
+    Verifica con EXPLAIN QUERY PLAN que las consultas de TareaViewSet usan
+    los índices compuestos y no recurren a recorridos completos de la tabla
+    ni a ordenaciones en un B-tree temporal.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='planuser', password='testpass')
+        otro = User.objects.create_user(username='otro', password='testpass')
+        Tarea.objects.bulk_create([
+            Tarea(usuario=usuario, titulo=f'Tarea {i % 5}', descripcion='Descripción', completado=i % 2 == 0)
+            for usuario in (self.user, otro)
+            for i in range(20)
+        ])
+        self.tarea = Tarea.objects.filter(usuario=self.user).first()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [fila[-1] for fila in cursor.fetchall()]
+
+    def assertPlanesIndexados(self, metodo, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, metodo)(url, data, format='json')
+        self.assertLess(response.status_code, 400, response.content)
+        consultas = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith(('SELECT', 'UPDATE', 'DELETE'))
+        ]
+        self.assertTrue(consultas)
+        for sql in consultas:
+            for paso in self._plan(sql):
+                self.assertFalse(paso.startswith('SCAN'), f'{paso}\n{sql}')
+                self.assertNotIn('TEMP B-TREE', paso, f'{paso}\n{sql}')
+
+    def test_listado(self):
+        self.assertPlanesIndexados('get', '/api/tareas/')
+
+    def test_listado_filtrado_por_completado(self):
+        self.assertPlanesIndexados('get', '/api/tareas/?completado=true')
+
+    def test_listado_filtrado_por_titulo(self):
+        self.assertPlanesIndexados('get', '/api/tareas/?titulo=Tarea%201')
+
+    def test_listado_filtrado_combinado(self):
+        self.assertPlanesIndexados('get', '/api/tareas/?completado=false&titulo=Tarea%202')
+
+    def test_listado_con_cursor(self):
+        primera = self.client.get('/api/tareas/?paginacion=cursor')
+        self.assertPlanesIndexados('get', '/api/tareas/?paginacion=cursor')
+        self.assertPlanesIndexados('get', primera.data['next'])
+        self.assertPlanesIndexados('get', '/api/tareas/?paginacion=cursor&completado=true')
+
+    def test_detalle(self):
+        self.assertPlanesIndexados('get', f'/api/tareas/{self.tarea.id}/')
+
+    def test_actualizacion(self):
+        self.assertPlanesIndexados('patch', f'/api/tareas/{self.tarea.id}/', {'titulo': 'Nuevo'})
+
+    def test_toggle_completado(self):
+        self.assertPlanesIndexados('post', f'/api/tareas/{self.tarea.id}/toggle_completado/')
+
+    def test_eliminacion(self):
+        self.assertPlanesIndexados('delete', f'/api/tareas/{self.tarea.id}/')
+
+    def test_cambios(self):
+        primera = self.client.get('/api/tareas/cambios/?limite=5')
+        self.assertPlanesIndexados('get', '/api/tareas/cambios/?limite=5')
+        self.assertPlanesIndexados('get', f"/api/tareas/cambios/?since={primera.data['token']}")
+
+@SIN_CACHE
+class TareaQueryBudgetTest(TestCase):
+    """
+    Presupuesto fijo de consultas por ruta de TareaViewSet. El número de
+    consultas no debe crecer con el número de filas de la página.
+    """
+    PRESUPUESTOS = {
+        # Listado: agregado del ETag (su total hace de COUNT) + página; el
+        # cursor no cuenta filas.
+        'list': 2,
+        'list_cursor': 2,
+        'retrieve': 1,
+        'create': 1,
+        'update': 2,
+        'partial_update': 2,
+        'destroy': 2,
+        'toggle_completado': 1,
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='budgetuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tarea = Tarea.objects.create(usuario=self.user, titulo='Tarea', descripcion='Descripción')
+
+    def _crear_tareas(self, cantidad):
+        Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'Tarea {i}', descripcion='Descripción')
+            for i in range(cantidad)
+        ])
+
+    def test_listado_no_depende_del_tamano_de_pagina(self):
+        rutas = (('/api/tareas/', 'list'), ('/api/tareas/?paginacion=cursor', 'list_cursor'))
+        for url, clave in rutas:
+            with self.assertNumQueries(self.PRESUPUESTOS[clave]):
+                self.client.get(url)
+        self._crear_tareas(150)
+        for url, clave in rutas:
+            with self.assertNumQueries(self.PRESUPUESTOS[clave]):
+                response = self.client.get(url)
+            self.assertEqual(len(response.data['results']), 10)
+        with self.assertNumQueries(self.PRESUPUESTOS['list_cursor']):
+            response = self.client.get('/api/tareas/?paginacion=cursor&page_size=100')
+        self.assertEqual(len(response.data['results']), 100)
+
+    def test_detalle(self):
+        with self.assertNumQueries(self.PRESUPUESTOS['retrieve']):
+            self.client.get(f'/api/tareas/{self.tarea.id}/')
+
+    def test_creacion(self):
+        with self.assertNumQueries(self.PRESUPUESTOS['create']):
+            response = self.client.post('/api/tareas/', {'titulo': 'Nueva', 'descripcion': 'Desc'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_actualizacion(self):
+        datos = {'titulo': 'Editada', 'descripcion': 'Desc', 'completado': True}
+        with self.assertNumQueries(self.PRESUPUESTOS['update']):
+            self.client.put(f'/api/tareas/{self.tarea.id}/', datos, format='json')
+        with self.assertNumQueries(self.PRESUPUESTOS['partial_update']):
+            self.client.patch(f'/api/tareas/{self.tarea.id}/', {'titulo': 'Otra'}, format='json')
+
+    def test_toggle_completado(self):
+        with self.assertNumQueries(self.PRESUPUESTOS['toggle_completado']):
+            self.client.post(f'/api/tareas/{self.tarea.id}/toggle_completado/')
+
+    def test_eliminacion(self):
+        with self.assertNumQueries(self.PRESUPUESTOS['destroy']):
+            response = self.client.delete(f'/api/tareas/{self.tarea.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_changelist_del_admin_no_depende_del_numero_de_filas(self):
+        admin_user = User.objects.create_superuser(username='admin', password='testpass')
+        self.client.force_login(admin_user)
+        with CaptureQueriesContext(connection) as antes:
+            self.client.get('/admin/tareas/tarea/')
+        self._crear_tareas(30)
+        with CaptureQueriesContext(connection) as despues:
+            response = self.client.get('/admin/tareas/tarea/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(antes), len(despues))
+
+class TareaLoteTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='loteuser', password='testpass')
+        self.otro = User.objects.create_user(username='otrolote', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = '/api/tareas/lote/'
+
+    def _crear(self, usuario, cantidad):
+        return Tarea.objects.bulk_create([
+            Tarea(usuario=usuario, titulo=f'Tarea {i}', descripcion='Descripción')
+            for i in range(cantidad)
+        ])
+
+    def test_crear_lote_en_una_sola_insercion(self):
+        datos = [{'titulo': f' Tarea {i} ', 'descripcion': 'Desc'} for i in range(50)]
+        with self.assertNumQueries(3):  # SAVEPOINT + INSERT + RELEASE
+            response = self.client.post(self.url, datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['resultados']), 50)
+        primero = response.data['resultados'][0]
+        self.assertEqual(primero['estado'], 201)
+        self.assertEqual(primero['tarea']['titulo'], 'Tarea 0')
+        self.assertEqual(primero['tarea']['usuario'], 'loteuser')
+        self.assertIsNotNone(primero['tarea']['id'])
+        self.assertEqual(Tarea.objects.filter(usuario=self.user).count(), 50)
+
+    def test_crear_lote_invalido_no_crea_nada(self):
+        datos = [
+            {'titulo': 'Válida', 'descripcion': 'Desc'},
+            {'titulo': '   ', 'descripcion': 'Desc'},
+        ]
+        response = self.client.post(self.url, datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['resultados']), 1)
+        self.assertEqual(response.data['resultados'][0]['indice'], 1)
+        self.assertIn('titulo', response.data['resultados'][0]['errores'])
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_lote_demasiado_grande(self):
+        datos = [{'titulo': 'T', 'descripcion': 'D'}] * 501
+        response = self.client.post(self.url, datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_actualizar_lote(self):
+        tareas = self._crear(self.user, 3)
+        datos = [
+            {'id': tareas[0].id, 'completado': True},
+            {'id': tareas[1].id, 'titulo': 'Renombrada'},
+        ]
+        response = self.client.patch(self.url, datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['tarea']['id'] for r in response.data['resultados']], [tareas[0].id, tareas[1].id])
+        tareas[0].refresh_from_db()
+        tareas[1].refresh_from_db()
+        self.assertTrue(tareas[0].completado)
+        self.assertEqual(tareas[1].titulo, 'Renombrada')
+        self.assertGreater(tareas[1].fecha_actualizacion, tareas[2].fecha_actualizacion)
+
+    def test_actualizar_lote_respeta_propietario(self):
+        propia = self._crear(self.user, 1)[0]
+        ajena = self._crear(self.otro, 1)[0]
+        datos = [
+            {'id': propia.id, 'completado': True},
+            {'id': ajena.id, 'completado': True},
+        ]
+        response = self.client.patch(self.url, datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['resultados'][0]['indice'], 1)
+        self.assertFalse(Tarea.objects.filter(completado=True).exists())
+
+    def test_eliminar_lote(self):
+        propias = self._crear(self.user, 3)
+        ajena = self._crear(self.otro, 1)[0]
+        ids = [propias[0].id, propias[1].id, ajena.id]
+        response = self.client.delete(self.url, ids, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r['estado'] for r in response.data['resultados']],
+            [status.HTTP_204_NO_CONTENT, status.HTTP_204_NO_CONTENT, status.HTTP_404_NOT_FOUND]
+        )
+        self.assertEqual(list(Tarea.objects.filter(usuario=self.user)), [propias[2]])
+        self.assertTrue(Tarea.objects.filter(id=ajena.id).exists())
+
+class TareaExportarTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='exportuser', password='testpass')
+        otro = User.objects.create_user(username='otroexport', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'Tarea {i}', descripcion='Línea, con "comillas"', completado=i % 2 == 0)
+            for i in range(30)
+        ] + [Tarea(usuario=otro, titulo='Ajena', descripcion='Desc')])
+
+    def _contenido(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_exportar_ndjson(self):
+        response = self.client.get('/api/tareas/exportar/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        filas = [json.loads(linea) for linea in self._contenido(response).splitlines()]
+        self.assertEqual(len(filas), 30)
+        self.assertEqual(set(filas[0]), set(TareaSerializer.Meta.fields))
+        self.assertEqual({fila['usuario'] for fila in filas}, {'exportuser'})
+
+    def test_exportar_csv_con_filtros(self):
+        response = self.client.get('/api/tareas/exportar/?formato=csv&completado=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        filas = list(csv.DictReader(io.StringIO(self._contenido(response))))
+        self.assertEqual(len(filas), 15)
+        self.assertEqual(filas[0]['descripcion'], 'Línea, con "comillas"')
+        self.assertEqual({fila['estado'] for fila in filas}, {'Completada'})
+
+    def test_exportar_formato_invalido(self):
+        response = self.client.get('/api/tareas/exportar/?formato=xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_exportar_lee_en_bloques(self):
+        with mock.patch.object(TareaViewSet, 'export_chunk_size', 7):
+            with CaptureQueriesContext(connection) as ctx:
+                contenido = self._contenido(self.client.get('/api/tareas/exportar/'))
+        self.assertEqual(len(contenido.splitlines()), 30)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+@SIN_CACHE
+class TareaLecturaRapidaTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='rapidouser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'Tarea ñ {i}', descripcion='Descripción "larga"', completado=i % 3 == 0)
+            for i in range(12)
+        ])
+
+    def test_paridad_byte_a_byte_con_tarea_serializer(self):
+        queryset = Tarea.objects.filter(usuario=self.user).select_related('usuario')
+        lectura = TareaLecturaRapida()
+        rapido = JSONRenderer().render(lectura.serializar(lectura.preparar(queryset)))
+        completo = JSONRenderer().render(TareaSerializer(queryset, many=True).data)
+        self.assertEqual(rapido, completo)
+
+    def test_listado_y_detalle_coinciden_con_tarea_serializer(self):
+        response = self.client.get('/api/tareas/')
+        esperado = TareaSerializer(Tarea.objects.filter(usuario=self.user)[:10], many=True).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(esperado))
+
+        tarea = Tarea.objects.filter(usuario=self.user).first()
+        response = self.client.get(f'/api/tareas/{tarea.id}/')
+        self.assertEqual(JSONRenderer().render(response.data), JSONRenderer().render(TareaSerializer(tarea).data))
+
+    def test_detalle_de_otro_usuario_devuelve_404(self):
+        ajena = Tarea.objects.create(
+            usuario=User.objects.create_user(username='ajeno', password='testpass'),
+            titulo='Ajena', descripcion='Desc'
+        )
+        response = self.client.get(f'/api/tareas/{ajena.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_detalle_con_id_no_numerico_devuelve_404(self):
+        response = self.client.get('/api/tareas/abc/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@SIN_CACHE
+class TareaCamposTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='camposuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tareas = Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'Tarea {i}', descripcion='Descripción larga', completado=i % 2 == 0)
+            for i in range(12)
+        ])
+
+    def _sql_listado(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [q['sql'] for q in ctx.captured_queries if 'LIMIT' in q['sql']][-1]
+
+    def test_fields_recorta_salida_y_columnas(self):
+        response, sql = self._sql_listado('/api/tareas/?fields=id,titulo,completado')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'titulo', 'completado'})
+        self.assertNotIn('"descripcion"', sql)
+        self.assertNotIn('auth_user', sql)
+
+    def test_exclude(self):
+        response, sql = self._sql_listado('/api/tareas/?exclude=descripcion')
+        self.assertEqual(
+            set(response.data['results'][0]), set(TareaSerializer.Meta.fields) - {'descripcion'}
+        )
+        self.assertNotIn('"descripcion"', sql)
+
+    def test_cursor_con_fields(self):
+        response = self.client.get('/api/tareas/?paginacion=cursor&page_size=5&fields=titulo')
+        self.assertEqual(response.data['results'][0], {'titulo': 'Tarea 11'})
+        siguiente = self.client.get(response.data['next'])
+        self.assertEqual(len(siguiente.data['results']), 5)
+
+    def test_detalle_con_fields_mantiene_etag(self):
+        response = self.client.get(f'/api/tareas/{self.tareas[0].id}/?fields=estado')
+        self.assertEqual(response.data, {'estado': 'Completada'})
+        self.assertIn('ETag', response)
+
+    def test_campo_desconocido(self):
+        response = self.client.get('/api/tareas/?fields=titulo,prioridad')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('prioridad', str(response.data['fields']))
+
+    def test_escritura_acepta_todos_los_campos(self):
+        tarea = self.tareas[0]
+        response = self.client.patch(
+            f'/api/tareas/{tarea.id}/?fields=id', {'descripcion': 'Nueva'}, format='json'
+        )
+        self.assertEqual(response.data, {'id': tarea.id})
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.descripcion, 'Nueva')
+
+    def test_exportar_csv_con_fields(self):
+        response = self.client.get('/api/tareas/exportar/?formato=csv&fields=id,titulo')
+        lineas = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lineas[0], 'id,titulo')
+        self.assertEqual(len(lineas), 13)
+
+
+class TareaCacheListadoTest(TestCase):
+    def setUp(self):
+        caches['tareas'].clear()
+        cache_tareas.estadisticas.reiniciar()
+        self.user = User.objects.create_user(username='cacheuser', password='testpass')
+        self.otro = User.objects.create_user(username='otrocache', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tarea = Tarea.objects.create(usuario=self.user, titulo='Tarea', descripcion='Desc')
+
+    def test_segunda_peticion_sale_de_cache(self):
+        primera = self.client.get('/api/tareas/')
+        self.assertEqual(primera['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            segunda = self.client.get('/api/tareas/')
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(segunda.data, primera.data)
+        self.assertEqual(cache_tareas.estadisticas.aciertos, 1)
+        self.assertEqual(cache_tareas.estadisticas.fallos, 1)
+
+    def test_acierto_de_cache_responde_304_sin_consultas(self):
+        etag = self.client.get('/api/tareas/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/tareas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_clave_incluye_filtros_y_pagina(self):
+        self.client.get('/api/tareas/')
+        response = self.client.get('/api/tareas/?completado=true')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 0)
+        response = self.client.get('/api/tareas/?paginacion=cursor')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_escrituras_invalidan_todas_las_paginas_del_usuario(self):
+        self.client.get('/api/tareas/')
+        self.client.get('/api/tareas/?completado=false')
+        self.client.post('/api/tareas/', {'titulo': 'Nueva', 'descripcion': 'Desc'}, format='json')
+        response = self.client.get('/api/tareas/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get('/api/tareas/?completado=false')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_toggle_y_eliminacion_invalidan(self):
+        self.client.get('/api/tareas/')
+        self.client.post(f'/api/tareas/{self.tarea.id}/toggle_completado/')
+        response = self.client.get('/api/tareas/')
+        self.assertTrue(response.data['results'][0]['completado'])
+        self.client.delete(f'/api/tareas/{self.tarea.id}/')
+        response = self.client.get('/api/tareas/')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_operaciones_por_lotes_invalidan(self):
+        self.client.get('/api/tareas/')
+        self.client.post('/api/tareas/lote/', [{'titulo': 'A', 'descripcion': 'B'}], format='json')
+        self.assertEqual(self.client.get('/api/tareas/').data['count'], 2)
+        self.client.patch('/api/tareas/lote/', [{'id': self.tarea.id, 'titulo': 'Lote'}], format='json')
+        titulos = [t['titulo'] for t in self.client.get('/api/tareas/').data['results']]
+        self.assertIn('Lote', titulos)
+
+    def test_escrituras_de_otro_usuario_no_invalidan(self):
+        self.client.get('/api/tareas/')
+        Tarea.objects.create(usuario=self.otro, titulo='Ajena', descripcion='Desc')
+        self.assertEqual(self.client.get('/api/tareas/')['X-Cache'], 'HIT')
+
+    def test_version_no_se_reutiliza_si_se_expulsa(self):
+        version = cache_tareas.version_usuario(self.user.pk)
+        caches['tareas_versiones'].clear()
+        self.assertGreater(cache_tareas.version_usuario(self.user.pk), version)
+
+    def test_invalidar_sin_incr(self):
+        # incr() es get + set en FileBasedCache: dos procesos podrían perder un incremento.
+        version = cache_tareas.version_usuario(self.user.pk)
+        with mock.patch.object(caches['tareas_versiones'], 'incr', side_effect=AssertionError):
+            cache_tareas.invalidar_usuario(self.user.pk)
+        self.assertNotEqual(cache_tareas.version_usuario(self.user.pk), version)
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'requiere fork')
+    def test_escritura_de_otro_proceso_invalida(self):
+        self.client.get('/api/tareas/')
+        self.assertEqual(self.client.get('/api/tareas/')['X-Cache'], 'HIT')
+        # Otro proceso (p. ej. procesar_trabajos) tiene su propia memoria.
+        proceso = multiprocessing.get_context('fork').Process(
+            target=cache_tareas.invalidar_usuario, args=(self.user.pk,)
+        )
+        proceso.start()
+        proceso.join()
+        self.assertEqual(proceso.exitcode, 0)
+        self.assertEqual(self.client.get('/api/tareas/')['X-Cache'], 'MISS')
+
+
+@SIN_CACHE
+class TareaCondicionalTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='etaguser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tarea = Tarea.objects.create(usuario=self.user, titulo='Tarea', descripcion='Desc')
+        self.url = f'/api/tareas/{self.tarea.id}/'
+
+    def test_detalle_emite_validadores(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], etag_tarea(self.tarea.id, self.tarea.fecha_actualizacion))
+        self.assertIn('Last-Modified', response)
+
+    def test_detalle_responde_304_con_if_none_match(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_detalle_responde_304_con_if_modified_since(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detalle_modificado_devuelve_200(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.patch(self.url, {'titulo': 'Cambio'}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_listado_responde_304_hasta_que_cambia_la_coleccion(self):
+        etag = self.client.get('/api/tareas/')['ETag']
+        response = self.client.get('/api/tareas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        otra = Tarea.objects.create(usuario=self.user, titulo='Otra', descripcion='Desc')
+        response = self.client.get('/api/tareas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        otra.delete()
+        response = self.client.get('/api/tareas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_listado_por_cursor_responde_304_hasta_que_cambia_la_coleccion(self):
+        url = '/api/tareas/?paginacion=cursor'
+        # La tarea archivada no es la última actualizada: solo su lápida cambia.
+        Tarea.objects.filter(pk=self.tarea.pk).update(
+            completado=True, fecha_actualizacion=timezone.now() - timedelta(days=1)
+        )
+        otra = Tarea.objects.create(usuario=self.user, titulo='Otra', descripcion='Desc')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        archivo.archivar_lote(timezone.now(), 10)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tarea['id'] for tarea in response.data['results']], [otra.id])
+
+        etag = response['ETag']
+        self.client.patch(f'/api/tareas/{otra.id}/', {'titulo': 'Cambio'}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        otra.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+    def test_listado_por_paginas_reutiliza_el_total_del_etag(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/api/tareas/')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(sum('COUNT(' in q['sql'] for q in consultas.captured_queries), 1)
+
+    def test_listado_etag_distinto_por_filtro(self):
+        todos = self.client.get('/api/tareas/')['ETag']
+        completados = self.client.get('/api/tareas/?completado=true')['ETag']
+        self.assertNotEqual(todos, completados)
+
+    def test_if_match_actual_permite_actualizar(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, {'titulo': 'Nuevo'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response['ETag'], self.client.get(self.url)['ETag'])
+
+    def test_if_match_desactualizado_devuelve_412(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.patch(self.url, {'titulo': 'Primero'}, format='json')
+        response = self.client.put(
+            self.url, {'titulo': 'Segundo', 'descripcion': 'Desc'}, format='json', HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.tarea.refresh_from_db()
+        self.assertEqual(self.tarea.titulo, 'Primero')
+
+@SIN_CACHE
+class TareaBusquedaTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buscauser', password='testpass')
+        otro = User.objects.create_user(username='otrobusca', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.leche = Tarea.objects.create(usuario=self.user, titulo='Comprar leche', descripcion='En el súper')
+        self.informe = Tarea.objects.create(
+            usuario=self.user, titulo='Informe', descripcion='Redactar informe anual, informe trimestral e informe mensual'
+        )
+        self.mencion = Tarea.objects.create(usuario=self.user, titulo='Reunión', descripcion='Revisar el informe')
+        Tarea.objects.create(usuario=otro, titulo='Comprar leche', descripcion='Ajena')
+
+    def _titulos(self, query):
+        response = self.client.get('/api/tareas/', {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tarea['titulo'] for tarea in response.data['results']]
+
+    def test_busqueda_limitada_al_usuario(self):
+        self.assertEqual(self._titulos('leche'), ['Comprar leche'])
+
+    def test_busqueda_por_prefijo_y_sin_acentos(self):
+        self.assertEqual(self._titulos('compr'), ['Comprar leche'])
+        self.assertEqual(self._titulos('super'), ['Comprar leche'])
+
+    def test_resultados_ordenados_por_relevancia(self):
+        self.assertEqual(self._titulos('informe'), ['Informe', 'Reunión'])
+
+    def test_todos_los_terminos_son_obligatorios(self):
+        self.assertEqual(self._titulos('informe anual'), ['Informe'])
+
+    def test_sintaxis_fts_se_trata_como_texto(self):
+        self.assertEqual(self._titulos('leche" OR "informe'), [])
+        self.assertEqual(self._titulos('NEAR(('), [])
+
+    def test_indice_sigue_a_actualizaciones_y_eliminaciones(self):
+        self.client.patch(f'/api/tareas/{self.leche.id}/', {'titulo': 'Comprar pan'}, format='json')
+        self.assertEqual(self._titulos('pan'), ['Comprar pan'])
+        self.assertEqual(self._titulos('leche'), [])
+        self.client.delete(f'/api/tareas/{self.leche.id}/')
+        self.assertEqual(self._titulos('pan'), [])
+
+    def test_motor_de_la_conexion_del_queryset(self):
+        request = RequestFactory().get('/api/tareas/', {'search': 'leche'})
+        filtro = BusquedaTextoFilter()
+        with mock.patch.object(connections['default'], 'vendor', 'postgresql'):
+            en_lectura = filtro.filter_queryset(request, Tarea.objects.using('lectura'), None)
+            en_default = filtro.filter_queryset(request, Tarea.objects.using('default'), None)
+            self.assertIn('MATCH', str(en_lectura.query))
+            self.assertNotIn('MATCH', str(en_default.query))
+
+    def test_cursor_con_busqueda_devuelve_400(self):
+        response = self.client.get('/api/tareas/', {'search': 'informe', 'paginacion': 'cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/tareas/', {'search': '', 'paginacion': 'cursor'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_comando_reconstruir_busqueda(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO tareas_fts(tareas_fts) VALUES ('delete-all')")
+        self.assertEqual(self._titulos('leche'), [])
+        call_command('reconstruir_busqueda', stdout=io.StringIO())
+        self.assertEqual(self._titulos('leche'), ['Comprar leche'])
+
+
+class TareaToggleAtomicoTest(TransactionTestCase):
+    # Fuera de transacción el router envía las lecturas a 'lectura'.
+    databases = {'default', 'lectura'}
+
+    def setUp(self):
+        caches['tareas'].clear()
+        self.user = User.objects.create_user(username='toggleuser', password='testpass')
+        self.tarea = Tarea.objects.create(usuario=self.user, titulo='Tarea', descripcion='Desc')
+        self.url = f'/api/tareas/{self.tarea.id}/toggle_completado/'
+
+    def test_devuelve_el_nuevo_estado_en_una_sola_sentencia(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        antes = Tarea.objects.get(pk=self.tarea.pk).fecha_actualizacion
+        with self.assertNumQueries(1):
+            response = client.post(self.url)
+        self.assertTrue(response.data['completado'])
+        self.assertEqual(response.data['estado'], 'Completada')
+        self.assertEqual(response.data['usuario'], 'toggleuser')
+        self.assertGreater(Tarea.objects.get(pk=self.tarea.pk).fecha_actualizacion, antes)
+
+    def test_tarea_de_otro_usuario_devuelve_404(self):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username='otrotoggle', password='testpass'))
+        self.assertEqual(client.post(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Tarea.objects.get(pk=self.tarea.pk).completado)
+
+    def test_toggles_concurrentes_mantienen_la_paridad(self):
+        hilos, toggles_por_hilo = 8, 25
+        exitos = []
+        barrera = threading.Barrier(hilos)
+
+        def alternar():
+            barrera.wait()
+            realizados = 0
+            try:
+                for _ in range(toggles_por_hilo):
+                    while True:
+                        try:
+                            Tarea.objects.alternar_completado(self.tarea.pk, self.user)
+                        except OperationalError:
+                            # Tabla bloqueada por otro hilo: el UPDATE no se aplicó.
+                            continue
+                        realizados += 1
+                        break
+            finally:
+                exitos.append(realizados)
+                connection.close()
+
+        trabajadores = [threading.Thread(target=alternar) for _ in range(hilos)]
+        for trabajador in trabajadores:
+            trabajador.start()
+        for trabajador in trabajadores:
+            trabajador.join()
+
+        total = sum(exitos)
+        self.assertEqual(total, hilos * toggles_por_hilo)
+        self.assertEqual(Tarea.objects.get(pk=self.tarea.pk).completado, total % 2 == 1)
+
+    def test_toggles_concurrentes_con_numero_impar(self):
+        def alternar():
+            while True:
+                try:
+                    Tarea.objects.alternar_completado(self.tarea.pk, self.user)
+                    break
+                except OperationalError:
+                    continue
+            connection.close()
+
+        trabajadores = [threading.Thread(target=alternar) for _ in range(7)]
+        for trabajador in trabajadores:
+            trabajador.start()
+        for trabajador in trabajadores:
+            trabajador.join()
+        self.assertTrue(Tarea.objects.get(pk=self.tarea.pk).completado)
+
+
+@SIN_CACHE
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        authentication.usuarios.reiniciar()
+        self.user = User.objects.create_user(username='jwtuser', password='12345')
+        self.tarea = Tarea.objects.create(usuario=self.user, titulo='Tarea')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = f'/api/tareas/{self.tarea.id}/'
+
+    def _consultas_usuario(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [q['sql'] for q in ctx.captured_queries if 'FROM "auth_user" WHERE' in q['sql']]
+
+    def test_segunda_peticion_no_consulta_usuario(self):
+        self.assertEqual(len(self._consultas_usuario()), 1)
+        self.assertEqual(self._consultas_usuario(), [])
+        self.assertEqual(authentication.usuarios.estadisticas_local.aciertos, 1)
+
+    def test_desactivar_usuario_invalida_cache(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_ttl_caduca_la_entrada(self):
+        self.client.get(self.url)
+        ahora = time.monotonic()
+        with mock.patch('tareas.authentication.time.monotonic', return_value=ahora + 3600):
+            self.assertEqual(len(self._consultas_usuario()), 1)
+
+    @override_settings(TAREAS_AUTH_CACHE={'MAX_USUARIOS': 2})
+    def test_lru_respeta_el_limite(self):
+        authentication.usuarios.reiniciar()
+        for i in range(5):
+            authentication.usuarios.guardar(i, self.user)
+        self.assertEqual(len(authentication.usuarios), 2)
+        self.assertIsNone(authentication.usuarios.obtener(0))
+        self.assertIsNotNone(authentication.usuarios.obtener(4))
+
+    @override_settings(TAREAS_AUTH_CACHE={'CACHE_COMPARTIDA': 'default'})
+    def test_cache_compartida_entre_procesos(self):
+        authentication.usuarios.reiniciar()
+        caches['default'].clear()
+        self.client.get(self.url)
+        # Simula otro proceso: caché local vacía, caché compartida poblada.
+        authentication.usuarios._entradas.clear()
+        self.assertEqual(self._consultas_usuario(), [])
+        self.assertEqual(authentication.usuarios.estadisticas_compartida.aciertos, 1)
+
+    def test_usuario_devuelto_es_una_copia(self):
+        authentication.usuarios.guardar(self.user.pk, self.user)
+        copia = authentication.usuarios.obtener(self.user.pk)
+        copia.first_name = 'modificado'
+        self.assertEqual(authentication.usuarios.obtener(self.user.pk).first_name, '')
+
+
+class EsquemaPregeneradoTest(TestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+        ajustes = override_settings(TAREAS_ESQUEMA_DIR=self.directorio)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        esquema.reiniciar()
+        self.addCleanup(esquema.reiniciar)
+
+    def test_sirve_el_artefacto_con_etag_y_cache(self):
+        call_command('generar_esquema', stdout=io.StringIO())
+        response = self.client.get('/swagger.json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Esquema-Origen'], 'artefacto')
+        self.assertIn('max-age=', response['Cache-Control'])
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertIn('/tareas/', json.loads(response.content)['paths'])
+
+        response = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_yaml(self):
+        call_command('generar_esquema', stdout=io.StringIO())
+        response = self.client.get('/swagger.yaml')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.content.startswith(b'swagger:'))
+
+    def test_sin_artefacto_genera_una_sola_vez(self):
+        with mock.patch('tareas.esquema.generar_esquema', wraps=esquema.generar_esquema) as generar:
+            primera = self.client.get('/swagger.json')
+            segunda = self.client.get('/swagger.json')
+        self.assertEqual(generar.call_count, 1)
+        self.assertEqual(primera['X-Esquema-Origen'], 'memoria')
+        self.assertEqual(primera.content, segunda.content)
+
+    def test_artefacto_igual_al_esquema_generado(self):
+        call_command('generar_esquema', stdout=io.StringIO())
+        generado = json.loads(esquema.renderizar(esquema.generar_esquema(), '.json'))
+        self.assertEqual(json.loads(self.client.get('/swagger.json').content), generado)
+
+
+@SIN_CACHE
+class TareaAsyncViewTest(TestCase):
+    """El camino ASGI responde igual que TareaViewSet."""
+
+    def setUp(self):
+        authentication.usuarios.reiniciar()
+        self.user = User.objects.create_user(username='asyncuser', password='12345')
+        self.otro = User.objects.create_user(username='otro', password='12345')
+        for i in range(15):
+            Tarea.objects.create(usuario=self.user, titulo=f'Tarea {i}', descripcion='desc', completado=i % 2 == 0)
+        self.ajena = Tarea.objects.create(usuario=self.otro, titulo='Ajena', descripcion='desc')
+        self.tarea = Tarea.objects.filter(usuario=self.user).first()
+        self.auth = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.auth['Authorization'])
+
+    def _async(self, metodo, url, headers=None, **kwargs):
+        headers = {**self.auth, **(headers or {})}
+        return async_to_sync(getattr(self.async_client, metodo))(url, headers=headers, **kwargs)
+
+    def test_listado_igual_que_sync(self):
+        for consulta in ('', '?page=2', '?completado=true', '?search=tarea&page=last', '?fields=id,titulo&page=2'):
+            sincrona = self.client.get(f'/api/tareas/{consulta}')
+            asincrona = self._async('get', f'/api/async/tareas/{consulta}')
+            self.assertEqual(asincrona.status_code, status.HTTP_200_OK)
+            datos = json.loads(sincrona.content)
+            esperado = json.loads(asincrona.content)
+            # Los enlaces apuntan a rutas distintas; el resto es idéntico.
+            for campo in ('next', 'previous'):
+                if datos[campo]:
+                    datos[campo] = datos[campo].replace('/api/tareas/', '/api/async/tareas/')
+            self.assertEqual(datos, esperado)
+
+    def test_pagina_invalida(self):
+        self.assertEqual(self._async('get', '/api/async/tareas/?page=9').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_listado_responde_304_hasta_que_cambia(self):
+        etag = self._async('get', '/api/async/tareas/')['ETag']
+        response = self._async('get', '/api/async/tareas/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        Tarea.objects.create(usuario=self.user, titulo='Nueva', descripcion='desc')
+        response = self._async('get', '/api/async/tareas/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_parametros_no_admitidos_devuelven_400(self):
+        for consulta in ('?paginacion=cursor', '?cursor=abc', '?incluir_archivadas=true', '?fields=nada'):
+            response = self._async('get', f'/api/async/tareas/{consulta}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, consulta)
+
+    def test_detalle_igual_que_sync(self):
+        url = f'/api/tareas/{self.tarea.id}/'
+        sincrona = self.client.get(url)
+        asincrona = self._async('get', f'/api/async/tareas/{self.tarea.id}/')
+        self.assertEqual(asincrona.content, sincrona.content)
+        self.assertEqual(asincrona['ETag'], sincrona['ETag'])
+        asincrona = self._async('get', f'/api/async/tareas/{self.tarea.id}/', headers={'If-None-Match': sincrona['ETag']})
+        self.assertEqual(asincrona.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detalle_ajeno_404(self):
+        response = self._async('get', f'/api/async/tareas/{self.ajena.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_crear(self):
+        response = self._async(
+            'post', '/api/async/tareas/', data={'titulo': ' Nueva ', 'descripcion': 'd'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        datos = json.loads(response.content)
+        self.assertEqual((datos['titulo'], datos['usuario']), ('Nueva', 'asyncuser'))
+        self.assertTrue(Tarea.objects.filter(pk=datos['id'], usuario=self.user).exists())
+
+    def test_crear_invalido_igual_que_sync(self):
+        cuerpo = {'titulo': '   ', 'descripcion': ''}
+        sincrona = self.client.post('/api/tareas/', cuerpo, format='json')
+        asincrona = self._async('post', '/api/async/tareas/', data=cuerpo, content_type='application/json')
+        self.assertEqual(asincrona.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(asincrona.content, sincrona.content)
+
+    def test_toggle(self):
+        response = self._async('post', f'/api/async/tareas/{self.tarea.id}/toggle_completado/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.tarea.refresh_from_db()
+        self.assertEqual(json.loads(response.content)['completado'], self.tarea.completado)
+        self.assertEqual(response['ETag'], etag_tarea(self.tarea.id, self.tarea.fecha_actualizacion))
+        response = self._async('post', f'/api/async/tareas/{self.ajena.id}/toggle_completado/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_compresion_sin_adaptar_a_sync(self):
+        # Con DEBUG, Django registra cada middleware que obliga a adaptar la cadena async.
+        with override_settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+        response = self._async('get', '/api/async/tareas/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], 15)
+
+    def test_sin_token_o_token_invalido(self):
+        response = async_to_sync(self.async_client.get)('/api/async/tareas/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+        response = async_to_sync(self.async_client.get)(
+            '/api/async/tareas/', headers={'Authorization': 'Bearer basura'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(json.loads(response.content)['code'], 'token_not_valid')
+
+
+@SIN_CACHE
+class ResumenTareasTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='resumenuser', password='12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _resumen(self):
+        return ResumenTareas.objects.de_usuario(self.user)
+
+    def _esperado(self):
+        tareas = Tarea.objects.filter(usuario=self.user)
+        total, completadas = tareas.count(), tareas.filter(completado=True).count()
+        return {'total': total, 'completadas': completadas, 'pendientes': total - completadas}
+
+    def test_contadores_siguen_a_todas_las_escrituras(self):
+        response = self.client.post('/api/tareas/', {'titulo': 'Una', 'descripcion': 'd'}, format='json')
+        tarea_id = response.data['id']
+        self.client.post('/api/tareas/lote/', [
+            {'titulo': f'Lote {i}', 'descripcion': 'd', 'completado': True} for i in range(5)
+        ], format='json')
+        self.assertEqual(self._resumen(), {'total': 6, 'completadas': 5, 'pendientes': 1})
+
+        self.client.post(f'/api/tareas/{tarea_id}/toggle_completado/')
+        self.assertEqual(self._resumen(), self._esperado())
+        self.client.patch(f'/api/tareas/{tarea_id}/', {'completado': False}, format='json')
+        self.assertEqual(self._resumen(), self._esperado())
+
+        ids = list(Tarea.objects.filter(usuario=self.user).values_list('id', flat=True))
+        self.client.patch('/api/tareas/lote/', [{'id': i, 'completado': False} for i in ids[:3]], format='json')
+        self.assertEqual(self._resumen(), self._esperado())
+        self.client.delete('/api/tareas/lote/', ids[:2], format='json')
+        self.client.delete(f'/api/tareas/{ids[2]}/')
+        self.assertEqual(self._resumen(), self._esperado())
+        self.assertEqual(self._resumen()['total'], 3)
+
+    def test_escritura_revertida_no_altera_contadores(self):
+        Tarea.objects.create(usuario=self.user, titulo='a', descripcion='d')
+        try:
+            with transaction.atomic():
+                Tarea.objects.create(usuario=self.user, titulo='b', descripcion='d')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(self._resumen()['total'], 1)
+
+    def test_endpoint_resumen_una_consulta(self):
+        Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'T{i}', descripcion='d', completado=i < 2) for i in range(5)
+        ])
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/tareas/resumen/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'total': 5, 'completadas': 2, 'pendientes': 3})
+
+    def test_reconciliar_detecta_y_corrige(self):
+        Tarea.objects.create(usuario=self.user, titulo='a', descripcion='d', completado=True)
+        ResumenTareas.objects.filter(usuario=self.user).update(total=7, completadas=0)
+
+        with self.assertRaises(CommandError):
+            call_command('reconciliar_resumen', '--comprobar', stdout=io.StringIO())
+        salida = io.StringIO()
+        call_command('reconciliar_resumen', stdout=salida)
+        self.assertIn('1 resúmenes corregidos', salida.getvalue())
+        self.assertEqual(self._resumen(), {'total': 1, 'completadas': 1, 'pendientes': 0})
+        call_command('reconciliar_resumen', '--comprobar', stdout=io.StringIO())
+
+    def test_reconciliar_crea_resumen_ausente(self):
+        Tarea.objects.create(usuario=self.user, titulo='a', descripcion='d')
+        ResumenTareas.objects.all().delete()
+        call_command('reconciliar_resumen', stdout=io.StringIO())
+        self.assertEqual(self._resumen()['total'], 1)
+
+
+class PerfilSQLiteTest(TransactionTestCase):
+    databases = {'default', 'lectura'}
+
+    def test_pragmas_aplicados(self):
+        # Conexión nueva a un archivo: la base de datos de pruebas está en memoria.
+        with tempfile.TemporaryDirectory() as directorio:
+            conexion = connections['default'].__class__(
+                {**connections['default'].settings_dict, 'NAME': f'{directorio}/pragmas.sqlite3'}, alias='pragmas'
+            )
+            try:
+                with conexion.cursor() as cursor:
+                    esperados = {
+                        'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+                        'mmap_size': 268435456, 'cache_size': -65536,
+                    }
+                    for nombre, valor in esperados.items():
+                        cursor.execute(f'PRAGMA {nombre}')
+                        self.assertEqual(cursor.fetchone(), (valor,), nombre)
+            finally:
+                conexion.close()
+
+    def test_lecturas_a_lectura_y_escrituras_a_default(self):
+        user = User.objects.create_user(username='routeruser')
+        self.assertEqual(Tarea.objects.filter(usuario=user).db, 'lectura')
+        self.assertEqual(ResumenTareas.objects.all().db, 'lectura')
+        self.assertEqual(router.db_for_write(Tarea), 'default')
+        # Los modelos de otras apps no se enrutan.
+        self.assertEqual(User.objects.all().db, 'default')
+
+    def test_en_transaccion_lee_de_default(self):
+        with transaction.atomic():
+            self.assertEqual(Tarea.objects.all().db, 'default')
+
+    def test_no_migra_lectura(self):
+        self.assertFalse(router.allow_migrate('lectura', 'tareas'))
+        self.assertTrue(router.allow_migrate('default', 'tareas'))
+
+    def test_relaciones_entre_alias(self):
+        tarea = Tarea(usuario_id=1)
+        tarea._state.db = 'lectura'
+        usuario = User(pk=1)
+        usuario._state.db = 'default'
+        self.assertTrue(router.allow_relation(tarea, usuario))
+        # Fuera de tareas y del usuario decide Django: misma base de datos.
+        permiso = Permission()
+        permiso._state.db = 'lectura'
+        self.assertFalse(router.allow_relation(permiso, usuario))
+
+
+CON_PERFIL = ['tareas.perfil.PerfilPeticionMiddleware', *settings.MIDDLEWARE]
+
+
+@SIN_CACHE
+class PerfilPeticionMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='perfiluser', password='12345')
+        Tarea.objects.create(usuario=self.user, titulo='Tarea', descripcion='Descripción')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def _fases(self, response):
+        return {parte.split(';')[0]: parte for parte in response['Server-Timing'].split(', ')}
+
+    @override_settings(MIDDLEWARE=CON_PERFIL)
+    def test_server_timing_y_log(self):
+        with self.assertLogs('tareas.perfil', 'INFO') as logs:
+            response = self.client.get('/api/tareas/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        fases = self._fases(response)
+        self.assertEqual(set(fases), {'db', 'auth', 'vista', 'serializacion', 'render', 'total'})
+        datos = json.loads(logs.records[0].getMessage())
+        self.assertEqual(datos['ruta'], '/api/tareas/')
+        self.assertEqual(datos['estado'], 200)
+        self.assertGreater(datos['consultas'], 0)
+        self.assertIn(f'desc="{datos["consultas"]} consultas"', fases['db'])
+
+    def test_perfil_por_muestreo(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            configuracion = {'MUESTREO': 1.0, 'DIRECTORIO': directorio, 'LOG': False}
+            with override_settings(MIDDLEWARE=CON_PERFIL, TAREAS_PERFIL=configuracion):
+                self.client.get('/api/tareas/')
+            volcados = list(Path(directorio).glob('*.prof'))
+            self.assertEqual(len(volcados), 1)
+            self.assertIn('GET_api_tareas', volcados[0].name)
+            self.assertGreater(pstats.Stats(str(volcados[0])).total_calls, 0)
+
+    def test_asgi_sin_adaptar_a_sync(self):
+        with override_settings(MIDDLEWARE=CON_PERFIL):
+            with override_settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+                ASGIHandler()
+            cabeceras = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+            with self.assertLogs('tareas.perfil', 'INFO') as logs:
+                asincrona = async_to_sync(self.async_client.get)('/api/async/tareas/', headers=cabeceras)
+                sincrona = async_to_sync(self.async_client.get)('/api/tareas/', headers=cabeceras)
+        self.assertIn('serializacion', self._fases(asincrona))
+        # La vista DRF bajo ASGI sigue midiendo vista y renderizado.
+        self.assertLessEqual({'vista', 'render'}, set(self._fases(sincrona)))
+        self.assertTrue(all(json.loads(registro.getMessage())['consultas'] > 0 for registro in logs.records))
+
+    def test_directorio_relativo_a_base_dir(self):
+        with tempfile.TemporaryDirectory() as base:
+            configuracion = {'MUESTREO': 1.0, 'DIRECTORIO': 'perfiles', 'LOG': False}
+            with override_settings(MIDDLEWARE=CON_PERFIL, TAREAS_PERFIL=configuracion, BASE_DIR=Path(base)):
+                self.client.get('/api/tareas/')
+            self.assertEqual(len(list((Path(base) / 'perfiles').glob('*.prof'))), 1)
+
+    def test_sin_middleware_no_mide(self):
+        response = self.client.get('/api/tareas/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertIs(perfil.medir('auth'), perfil.medir('serializacion'))
+
+
+@override_settings(TAREAS_SINCRONIZACION={'MARGEN': 0})
+class TareaCambiosTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='syncuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tareas = Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'Tarea {i}', descripcion='Desc')
+            for i in range(12)
+        ])
+        self.url = '/api/tareas/cambios/'
+
+    def _cambios(self, token=None, **params):
+        if token is not None:
+            params['since'] = token
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response.data
+
+    def test_sincronizacion_inicial_y_delta(self):
+        inicial = self._cambios()
+        self.assertEqual(len(inicial['tareas']), 12)
+        self.assertEqual(inicial['eliminadas'], [])
+        self.assertTrue(inicial['completo'])
+
+        modificada, eliminada = self.tareas[0], self.tareas[1]
+        self.client.patch(f'/api/tareas/{modificada.id}/', {'titulo': 'Cambiada'}, format='json')
+        self.client.delete(f'/api/tareas/{eliminada.id}/')
+        nueva = self.client.post('/api/tareas/', {'titulo': 'Nueva', 'descripcion': 'Desc'}, format='json')
+
+        delta = self._cambios(inicial['token'])
+        self.assertEqual(
+            [tarea['id'] for tarea in delta['tareas']], [modificada.id, nueva.data['id']]
+        )
+        self.assertEqual(delta['eliminadas'], [eliminada.id])
+        self.assertEqual(self._cambios(delta['token'])['tareas'], [])
+
+    def test_paginas_con_limite(self):
+        vistas = []
+        token, completo = None, False
+        while not completo:
+            datos = self._cambios(token, limite=5, fields='id')
+            vistas += [tarea['id'] for tarea in datos['tareas']]
+            token, completo = datos['token'], datos['completo']
+        self.assertEqual(sorted(vistas), sorted(tarea.id for tarea in self.tareas))
+
+    @override_settings(TAREAS_SINCRONIZACION={'MARGEN': 30})
+    def test_margen_repite_cambios_recientes(self):
+        token = self._cambios()['token']
+        self.assertEqual(len(self._cambios(token)['tareas']), 12)
+
+    def test_lapidas_en_lote_y_cascada(self):
+        token = self._cambios()['token']
+        self.client.delete('/api/tareas/lote/', [t.id for t in self.tareas[:3]], format='json')
+        self.assertEqual(
+            sorted(self._cambios(token)['eliminadas']), sorted(t.id for t in self.tareas[:3])
+        )
+        usuario_id = self.user.pk
+        self.user.delete()
+        self.assertEqual(TareaEliminada.objects.filter(usuario_id=usuario_id).count(), 12)
+
+    def test_token_invalido_y_caducado(self):
+        response = self.client.get(self.url, {'since': 'no-es-un-token'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        antiguo = sincronizacion.codificar_token(timezone.now() - timedelta(days=31))
+        response = self.client.get(self.url, {'since': antiguo})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        response = self.client.get(self.url, {'limite': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purgar_eliminadas(self):
+        Tarea.objects.filter(id__in=[t.id for t in self.tareas[:2]]).delete()
+        TareaEliminada.objects.filter(tarea_id=self.tareas[0].id).update(
+            fecha_eliminacion=timezone.now() - timedelta(days=40)
+        )
+        call_command('purgar_eliminadas', stdout=io.StringIO())
+        self.assertEqual(
+            list(TareaEliminada.objects.values_list('tarea_id', flat=True)), [self.tareas[1].id]
+        )
+
+
+@SIN_CACHE
+class RenderizadoCompresionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='renderuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'Tarea ñ {i}', descripcion='Descripción larga ' * 20)
+            for i in range(10)
+        ])
+
+    def test_json_rapido_igual_que_drf(self):
+        datos = {
+            'texto': 'línea\u2028separada', 'fecha': timezone.now(), 'importe': Decimal('1.50'),
+            1: None, 'lista': [1.5, True],
+        }
+        self.assertEqual(renderers.JSONRapidoRenderer().render(datos), JSONRenderer().render(datos))
+        response = self.client.get('/api/tareas/')
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    @unittest.skipIf(renderers.msgpack is None, 'msgpack no está instalado')
+    def test_msgpack(self):
+        response = self.client.get('/api/tareas/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(renderers.msgpack.unpackb(response.content)['count'], 10)
+
+    @unittest.skipIf(renderers.msgpack is not None, 'msgpack está instalado')
+    def test_msgpack_no_disponible(self):
+        response = self.client.get('/api/tareas/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+    def test_gzip_negociado(self):
+        response = self.client.get('/api/tareas/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], 10)
+        # El ETag del listado es débil: vale para ambas codificaciones.
+        self.assertEqual(response['ETag'], self.client.get('/api/tareas/')['ETag'])
+
+    def test_etag_fuerte_distinto_por_codificacion(self):
+        tarea = Tarea.objects.create(usuario=self.user, titulo='Larga', descripcion='x' * 2000)
+        url = f'/api/tareas/{tarea.id}/'
+        identidad = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], f'{identidad[:-1]}-gzip"')
+
+        # El cliente devuelve el ETag codificado: 304 con ese mismo ETag.
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], f'{identidad[:-1]}-gzip"')
+
+        # If-Match acepta el ETag codificado; uno desactualizado sigue dando 412.
+        codificado = response['ETag']
+        response = self.client.patch(url, {'titulo': 'Nuevo'}, format='json', HTTP_IF_MATCH=codificado)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(url, {'titulo': 'Otro'}, format='json', HTTP_IF_MATCH=codificado)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_quitar_codificacion(self):
+        self.assertEqual(compresion.quitar_codificacion('"5-10-gzip", "6-11-br"'), '"5-10", "6-11"')
+        self.assertEqual(compresion.quitar_codificacion('W/"abc-gzip", "5-10"'), 'W/"abc-gzip", "5-10"')
+        self.assertEqual(compresion.etag_codificado('W/"abc"', 'gzip'), 'W/"abc"')
+
+    def test_sin_compresion(self):
+        for cabecera in ('', 'identity', 'gzip;q=0', 'br'):
+            response = self.client.get('/api/tareas/', HTTP_ACCEPT_ENCODING=cabecera)
+            if cabecera == 'br' and compresion.brotli is not None:
+                continue
+            self.assertFalse(response.has_header('Content-Encoding'), cabecera)
+        # Por debajo del mínimo.
+        response = self.client.get('/api/tareas/resumen/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_exportar_en_streaming(self):
+        response = self.client.get('/api/tareas/exportar/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lineas = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8').splitlines()
+        self.assertEqual(len(lineas), 10)
+
+    def test_elegir_codificacion(self):
+        disponibles = ('br', 'gzip')
+        self.assertEqual(compresion.elegir_codificacion('gzip, br', disponibles), 'br')
+        self.assertEqual(compresion.elegir_codificacion('br;q=0.5, gzip', disponibles), 'gzip')
+        self.assertEqual(compresion.elegir_codificacion('*', disponibles), 'br')
+        self.assertEqual(compresion.elegir_codificacion('*, br;q=0', disponibles), 'gzip')
+        self.assertIsNone(compresion.elegir_codificacion('deflate', disponibles))
+
+
+class ArchivoTareasTest(TestCase):
+    def setUp(self):
+        caches['tareas'].clear()
+        self.user = User.objects.create_user(username='archivouser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tareas = Tarea.objects.bulk_create([
+            Tarea(usuario=self.user, titulo=f'Tarea {i}', descripcion=f'Descripción {i}', completado=i < 6)
+            for i in range(10)
+        ])
+        # 0-3: completadas antiguas; 4-5: completadas recientes; 6-9: pendientes (2 antiguas).
+        antigua = timezone.now() - timedelta(days=400)
+        Tarea.objects.filter(id__in=[t.id for t in self.tareas[:4] + self.tareas[6:8]]).update(
+            fecha_actualizacion=antigua
+        )
+        self.antiguas = sorted(t.id for t in self.tareas[:4])
+
+    def _archivar(self, *argumentos):
+        salida = io.StringIO()
+        call_command('archivar_tareas', '--dias', '365', '--pausa', '0', *argumentos, stdout=salida)
+        return salida.getvalue()
+
+    def test_archiva_en_lotes_solo_completadas_antiguas(self):
+        resumen = self.client.get('/api/tareas/resumen/').data
+        self.assertIn('4 tareas archivadas en 2 lotes', self._archivar('--lote', '3'))
+        self.assertEqual(
+            sorted(TareaArchivada.objects.values_list('id', flat=True)), self.antiguas
+        )
+        self.assertFalse(Tarea.objects.filter(id__in=self.antiguas).exists())
+        self.assertEqual(Tarea.objects.count(), 6)
+        # Los contadores siguen incluyendo las archivadas.
+        self.assertEqual(self.client.get('/api/tareas/resumen/').data, resumen)
+        call_command('reconciliar_resumen', '--comprobar', stdout=io.StringIO())
+
+    def test_simular_no_mueve(self):
+        self.assertIn('4 tareas', self._archivar('--simular'))
+        self.assertEqual(TareaArchivada.objects.count(), 0)
+
+    def test_listado_con_y_sin_archivadas(self):
+        self.assertEqual(self.client.get('/api/tareas/').data['count'], 10)
+        self._archivar()
+        # La caché del listado se invalida al archivar.
+        self.assertEqual(self.client.get('/api/tareas/').data['count'], 6)
+
+        response = self.client.get('/api/tareas/?incluir_archivadas=true&page=1')
+        self.assertEqual(response.data['count'], 10)
+        combinados = [fila['id'] for fila in response.data['results']]
+        self.assertEqual(sorted(combinados), sorted(t.id for t in self.tareas))
+        # Orden del listado: -fecha_creacion, -id sobre ambas tablas.
+        self.assertEqual(combinados, sorted(combinados, reverse=True))
+
+        filtrada = self.client.get('/api/tareas/?incluir_archivadas=true&completado=true&search=Descripción 1')
+        self.assertEqual([fila['titulo'] for fila in filtrada.data['results']], ['Tarea 1'])
+
+    def test_incluir_archivadas_con_cursor(self):
+        response = self.client.get('/api/tareas/?incluir_archivadas=true&paginacion=cursor')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_archivadas_aparecen_como_eliminadas_en_cambios(self):
+        token = sincronizacion.codificar_token(timezone.now() - timedelta(minutes=1))
+        self._archivar()
+        response = self.client.get('/api/tareas/cambios/', {'since': token})
+        self.assertEqual(sorted(response.data['eliminadas']), self.antiguas)
+
+
+class EliminarUsuarioTest(TestCase):
+    N_TAREAS = 3000
+
+    def setUp(self):
+        caches['tareas'].clear()
+        self.otro = User.objects.create_user(username='conservado', password='testpass')
+        Tarea.objects.create(usuario=self.otro, titulo='Tarea pesada ajena', descripcion='d')
+
+    def _usuario_con_tareas(self, username):
+        usuario = User.objects.create_user(username=username, password='testpass')
+        Tarea.objects.bulk_create(
+            (
+                Tarea(usuario=usuario, titulo=f'Tarea pesada {i}', descripcion='d' * 200, completado=i % 2 == 0)
+                for i in range(self.N_TAREAS)
+            ),
+            batch_size=1000,
+        )
+        return usuario
+
+    def _medir(self, funcion):
+        tracemalloc.start()
+        try:
+            inicio = time.perf_counter()
+            resultado = funcion()
+            duracion = time.perf_counter() - inicio
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return resultado, duracion, pico
+
+    def test_memoria_y_bloqueo_acotados_frente_al_cascade(self):
+        cascada = self._usuario_con_tareas('cascada')
+        _, duracion_cascada, pico_cascada = self._medir(cascada.delete)
+
+        usuario = self._usuario_con_tareas('lotes')
+        resultado, _, pico_lotes = self._medir(lambda: eliminar_usuario(usuario, lote=200))
+
+        self.assertEqual(resultado['tareas'], self.N_TAREAS)
+        self.assertEqual(resultado['lotes'], self.N_TAREAS // 200)
+        # El colector instancia todas las tareas; los lotes solo manejan ids.
+        self.assertLess(pico_lotes * 4, pico_cascada)
+        # Ningún lote retiene el bloqueo tanto como el borrado completo.
+        self.assertLess(resultado['bloqueo_maximo'] * 4, duracion_cascada)
+
+    def test_mantiene_contadores_lapidas_e_indice(self):
+        usuario = self._usuario_con_tareas('completo')
+        archivadas = list(
+            Tarea.objects.filter(usuario=usuario, completado=True).order_by('id').values_list('id', flat=True)[:10]
+        )
+        archivo.archivar_lote(timezone.now() + timedelta(days=1), 10)
+        self.assertEqual(TareaArchivada.objects.filter(usuario=usuario).count(), len(archivadas))
+        ids = list(Tarea.objects.filter(usuario=usuario).values_list('id', flat=True))
+        usuario_id = usuario.pk
+
+        resultado = eliminar_usuario(usuario, lote=500)
+
+        self.assertEqual(resultado['tareas'], self.N_TAREAS - 10)
+        self.assertEqual(resultado['archivadas'], 10)
+        self.assertFalse(User.objects.filter(pk=usuario_id).exists())
+        self.assertFalse(ResumenTareas.objects.filter(usuario_id=usuario_id).exists())
+        self.assertEqual(
+            set(TareaEliminada.objects.filter(usuario_id=usuario_id).values_list('tarea_id', flat=True)),
+            set(ids) | set(archivadas),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM tareas_fts WHERE tareas_fts MATCH 'pesada'")
+            self.assertEqual(cursor.fetchone()[0], 1)
+        self.assertEqual(ResumenTareas.objects.de_usuario(self.otro)['total'], 1)
+        call_command('reconciliar_resumen', '--comprobar', stdout=io.StringIO())
+
+    def test_comando_y_admin(self):
+        self._usuario_con_tareas('porcomando')
+        salida = io.StringIO()
+        call_command('eliminar_usuario', 'porcomando', '--lote', '1000', stdout=salida)
+        self.assertIn(f'{self.N_TAREAS} tareas y 0 archivadas en 3 lotes', salida.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('eliminar_usuario', 'noexiste', stdout=io.StringIO())
+
+        usuario = self._usuario_con_tareas('poradmin')
+        admin_user = User.objects.create_superuser(username='admin', password='testpass')
+        self.client.force_login(admin_user)
+        url = f'/admin/auth/user/{usuario.pk}/delete/'
+        # La confirmación cuenta las tareas en vez de cargarlas.
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertContains(response, f'Tareas: {self.N_TAREAS}')
+        self.assertLess(len(consultas), 15)
+        response = self.client.post(url, {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Tarea.objects.filter(usuario_id=usuario.pk).exists())
+        self.assertFalse(User.objects.filter(pk=usuario.pk).exists())
+
+    def test_admin_conserva_permisos_necesarios(self):
+        usuario = User.objects.create_user(username='sinpermiso', password='testpass')
+        Tarea.objects.create(usuario=usuario, titulo='Tarea', descripcion='d')
+        staff = User.objects.create_user(username='staff', password='testpass', is_staff=True)
+        staff.user_permissions.add(*Permission.objects.filter(
+            content_type__app_label='auth', codename__in=['view_user', 'delete_user'],
+        ))
+        self.client.force_login(staff)
+        url = f'/admin/auth/user/{usuario.pk}/delete/'
+        response = self.client.get(url)
+        self.assertEqual(response.context['perms_lacking'], {'Tarea'})
+        self.assertEqual(self.client.post(url, {'post': 'yes'}).status_code, 403)
+        self.assertTrue(Tarea.objects.filter(usuario=usuario).exists())
+
+
+class EliminarUsuarioAdminTransaccionTest(TransactionTestCase):
+    databases = {'default', 'lectura'}
+
+    def test_lotes_del_admin_fuera_de_transaccion(self):
+        usuario = User.objects.create_user(username='poradmin', password='testpass')
+        Tarea.objects.bulk_create(
+            Tarea(usuario=usuario, titulo=f'Tarea {i}', descripcion='d') for i in range(50)
+        )
+        admin_user = User.objects.create_superuser(username='admin', password='testpass')
+        self.client.force_login(admin_user)
+        en_transaccion = []
+        borrar_lote = eliminacion._borrar_lote
+
+        def registrar(*args, **kwargs):
+            en_transaccion.append(connection.in_atomic_block)
+            return borrar_lote(*args, **kwargs)
+
+        with override_settings(TAREAS_ELIMINACION={'LOTE': 10}), \
+                mock.patch('tareas.eliminacion._borrar_lote', side_effect=registrar):
+            response = self.client.post(f'/admin/auth/user/{usuario.pk}/delete/', {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        # 5 lotes de tareas más la comprobación final de cada modelo.
+        self.assertEqual(len(en_transaccion), 7)
+        self.assertFalse(any(en_transaccion))
+        self.assertFalse(User.objects.filter(pk=usuario.pk).exists())
+
+
+@SIN_CACHE
+class TareaAdminTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='adminlistado', password='testpass')
+        self.otro = User.objects.create_user(username='adminotro', password='testpass')
+        Tarea.objects.bulk_create([
+            Tarea(usuario=self.user if i % 2 else self.otro, titulo=f'T{i}', descripcion='d', completado=i < 4)
+            for i in range(30)
+        ])
+        self.client.force_login(User.objects.create_superuser(username='admin', password='testpass'))
+
+    def test_changelist_un_count_acotado(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/admin/tareas/tarea/', {'completado__exact': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context['cl'].result_count, 4)
+        recuentos = [q['sql'] for q in consultas if 'COUNT(' in q['sql'].upper()]
+        self.assertEqual(len(recuentos), 1)
+        self.assertIn('LIMIT', recuentos[0].upper())
+
+    def test_paginador_estimado(self):
+        with mock.patch.object(PaginadorEstimado, 'limite_exacto', 10):
+            filtrado = PaginadorEstimado(Tarea.objects.filter(completado=False), 5)
+            self.assertEqual(filtrado.count, 10)
+            self.assertEqual(PaginadorEstimado(Tarea.objects.filter(completado=True), 5).count, 4)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.assertEqual(PaginadorEstimado(Tarea.objects.all(), 5).count, 30)
+            self.assertEqual(estimar_filas(Tarea, 'default'), 30)
+
+    def test_selector_de_usuario_con_autocompletado(self):
+        tarea = Tarea.objects.filter(usuario=self.user).first()
+        response = self.client.get(f'/admin/tareas/tarea/{tarea.pk}/change/')
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'adminotro')
+
+    def test_acciones_masivas_un_update(self):
+        ids = list(Tarea.objects.filter(usuario=self.user).values_list('id', flat=True))
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post('/admin/tareas/tarea/', {
+                'action': 'marcar_completadas', '_selected_action': ids,
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len([q for q in consultas if q['sql'].startswith('UPDATE "tareas"')]), 1)
+        self.assertFalse(Tarea.objects.filter(usuario=self.user, completado=False).exists())
+        self.assertEqual(ResumenTareas.objects.de_usuario(self.user)['pendientes'], 0)
+
+        self.client.post('/admin/tareas/tarea/', {'action': 'marcar_pendientes', '_selected_action': ids[:3]})
+        self.assertEqual(Tarea.objects.filter(usuario=self.user, completado=False).count(), 3)
+
+
+class TrabajosSegundoPlanoTest(TestCase):
+    def setUp(self):
+        caches['tareas'].clear()
+        self.directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directorio.cleanup)
+        ajustes = override_settings(TAREAS_TRABAJOS={'DIRECTORIO': self.directorio.name, 'LOTE': 3})
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.user = User.objects.create_user(username='trabajosuser', password='testpass')
+        self.otro = User.objects.create_user(username='trabajosotro', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Tarea.objects.bulk_create(
+            [Tarea(usuario=self.user, titulo=f'Tarea {i}', descripcion='d', completado=i < 3) for i in range(10)]
+            + [Tarea(usuario=self.otro, titulo='Ajena', descripcion='d')]
+        )
+
+    def _encolar(self, tipo, parametros):
+        return self.client.post('/api/tareas/trabajos/', {'tipo': tipo, 'parametros': parametros}, format='json')
+
+    def _procesar(self):
+        call_command('procesar_trabajos', '--procesos', '0', '--una-vez', stdout=io.StringIO())
+
+    def test_exportacion_diferida(self):
+        response = self._encolar('exportar', {
+            'formato': 'ndjson', 'filtros': {'completado': False}, 'fields': 'id,titulo',
+        })
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['estado'], 'pendiente')
+        self.assertIsNone(response.data['resultado'])
+        ubicacion = response['Location']
+
+        self._procesar()
+        estado = self.client.get(ubicacion).data
+        self.assertEqual(estado['estado'], 'completado')
+        self.assertEqual((estado['procesadas'], estado['total'], estado['progreso']), (7, 7, 100))
+
+        descarga = self.client.get(estado['resultado'])
+        self.assertEqual(descarga['Content-Type'], 'application/x-ndjson')
+        filas = [json.loads(linea) for linea in b''.join(descarga.streaming_content).decode().splitlines()]
+        self.assertEqual(len(filas), 7)
+        self.assertEqual(set(filas[0]), {'id', 'titulo'})
+        self.assertEqual(list(Path(self.directorio.name).iterdir()), [Path(self.directorio.name) / f'{estado["id"]}.ndjson'])
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'requiere fork')
+    def test_pool_de_procesos(self):
+        exportacion = self._encolar('exportar', {'formato': 'csv', 'fields': 'id,titulo'}).data['id']
+        fallido = self._encolar('exportar', {}).data['id']
+        Trabajo.objects.filter(pk=fallido).update(tipo='desconocido')
+        salida = io.StringIO()
+        # Los hijos heredan el parche del registro.
+        with mock.patch.object(trabajos.logger, 'exception'):
+            call_command('procesar_trabajos', '--procesos', '2', '--una-vez', stdout=salida)
+
+        # Los hijos trabajan sobre su copia de la base de datos en memoria de
+        # las pruebas: el resultado se comprueba con la salida y el archivo.
+        self.assertIn(f'Trabajo {exportacion}: completado', salida.getvalue())
+        self.assertIn(f'Trabajo {fallido}: fallido', salida.getvalue())
+        with open(Path(self.directorio.name) / f'{exportacion}.csv', encoding='utf-8') as archivo:
+            lineas = archivo.read().splitlines()
+        self.assertEqual(lineas[0], 'id,titulo')
+        self.assertEqual(len(lineas), 11)
+
+    def test_directorio_relativo_a_base_dir(self):
+        with override_settings(TAREAS_TRABAJOS={'DIRECTORIO': 'trabajos'}):
+            self.assertEqual(trabajos.directorio(), Path(settings.BASE_DIR) / 'trabajos')
+
+    def test_actualizacion_masiva_por_lotes(self):
+        response = self._encolar('actualizar', {'completado': True, 'filtros': {'search': 'tarea'}})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self._procesar()
+        estado = self.client.get(response['Location']).data
+        self.assertEqual(estado['estado'], 'completado')
+        self.assertEqual(estado['procesadas'], 7)
+        self.assertIsNone(estado['resultado'])
+        self.assertFalse(Tarea.objects.filter(usuario=self.user, completado=False).exists())
+        self.assertTrue(Tarea.objects.filter(usuario=self.otro, completado=False).exists())
+        self.assertEqual(self.client.get('/api/tareas/resumen/').data['pendientes'], 0)
+
+    def test_validacion_y_limite(self):
+        self.assertEqual(self._encolar('desconocido', {}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._encolar('exportar', {'formato': 'xml'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self._encolar('exportar', {'filtros': {'usuario': 1}}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(self._encolar('actualizar', {}).status_code, status.HTTP_400_BAD_REQUEST)
+        for _ in range(5):
+            self.assertEqual(self._encolar('exportar', {}).status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self._encolar('exportar', {}).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_trabajos_ajenos_no_visibles(self):
+        trabajo = Trabajo.objects.create(usuario=self.otro, tipo='exportar')
+        self.assertEqual(self.client.get(f'/api/tareas/trabajos/{trabajo.pk}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/tareas/trabajos/{trabajo.pk}/resultado/').status_code, 404)
+
+    def test_fallo_y_reclamo(self):
+        primero = self._encolar('exportar', {}).data['id']
+        segundo = self._encolar('exportar', {}).data['id']
+        self.assertEqual(trabajos.reclamar(), primero)
+        self.assertEqual(trabajos.reclamar(), segundo)
+        self.assertIsNone(trabajos.reclamar())
+
+        def fallar(trabajo, progreso):
+            raise RuntimeError('sin disco')
+
+        with mock.patch.dict(trabajos.TIPOS, {'exportar': (None, fallar)}), \
+                self.assertLogs('tareas.trabajos', 'ERROR'):
+            self.assertEqual(trabajos.ejecutar(primero), Trabajo.FALLIDO)
+        self.assertEqual(Trabajo.objects.get(pk=primero).error, 'RuntimeError: sin disco')
+
+        # Un trabajo largo que sigue dando latido no vuelve a la cola.
+        Trabajo.objects.filter(pk=segundo).update(fecha_inicio=timezone.now() - timedelta(hours=2))
+        self.assertEqual(trabajos.recuperar_abandonados(), 0)
+        # Un trabajador caído deja de darlo: vuelve a la cola al caducar.
+        Trabajo.objects.filter(pk=segundo).update(fecha_latido=timezone.now() - timedelta(hours=2))
+        self.assertEqual(trabajos.recuperar_abandonados(), 1)
+        self.assertEqual(trabajos.reclamar(), segundo)
+
+    def test_progreso_renueva_latido(self):
+        trabajo_id = self._encolar('exportar', {}).data['id']
+        trabajos.reclamar()
+        antiguo = timezone.now() - timedelta(hours=2)
+        Trabajo.objects.filter(pk=trabajo_id).update(fecha_latido=antiguo)
+        trabajos.Progreso(trabajo_id, intervalo=0)(5)
+        self.assertGreater(Trabajo.objects.get(pk=trabajo_id).fecha_latido, antiguo)
+        self.assertEqual(trabajos.recuperar_abandonados(), 0)
+
+    def test_purga_de_terminados(self):
+        antiguo = self._encolar('exportar', {}).data['id']
+        reciente = self._encolar('exportar', {}).data['id']
+        pendiente = self._encolar('exportar', {}).data['id']
+        for _ in range(2):
+            self.assertEqual(trabajos.ejecutar(trabajos.reclamar()), Trabajo.COMPLETADO)
+        Trabajo.objects.filter(pk=antiguo).update(fecha_fin=timezone.now() - timedelta(days=8))
+
+        salida = io.StringIO()
+        call_command('procesar_trabajos', '--procesos', '0', '--una-vez', stdout=salida)
+        self.assertIn('1 trabajos terminados purgados.', salida.getvalue())
+        self.assertFalse(Trabajo.objects.filter(pk=antiguo).exists())
+        # El pendiente se ejecuta en esta misma pasada; el reciente se conserva.
+        self.assertEqual(
+            sorted(path.name for path in Path(self.directorio.name).iterdir()),
+            sorted([f'{reciente}.ndjson', f'{pendiente}.ndjson']),
+        )
+
+
+class TareaImportarTest(TestCase):
+    def setUp(self):
+        caches['tareas'].clear()
+        self.user = User.objects.create_user(username='importuser', password='testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _importar(self, cuerpo, content_type='application/x-ndjson', **extra):
+        if isinstance(cuerpo, str):
+            cuerpo = cuerpo.encode('utf-8')
+        return self.client.post('/api/tareas/importar/', data=cuerpo, content_type=content_type, **extra)
+
+    def test_ndjson_con_errores_por_fila(self):
+        lineas = [
+            json.dumps({'titulo': '  Primera  ', 'descripcion': 'Uno', 'completado': True}),
+            json.dumps({'titulo': '   ', 'descripcion': 'Título vacío'}),
+            '',
+            '{no es json',
+            json.dumps(['lista']),
+            json.dumps({'titulo': 'Cuarta', 'descripcion': 'Informe zanahoria', 'usuario': 'otro', 'id': 999}),
+        ]
+        response = self._importar('\n'.join(lineas) + '\n')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['creadas'], response.data['rechazadas']), (2, 3))
+        self.assertEqual([error['fila'] for error in response.data['errores']], [2, 3, 4])
+        self.assertIn('titulo', response.data['errores'][0]['errores'])
+
+        tareas = Tarea.objects.filter(usuario=self.user).order_by('id')
+        self.assertEqual([t.titulo for t in tareas], ['Primera', 'Cuarta'])
+        self.assertNotEqual(tareas[1].id, 999)
+        # Triggers: contadores e índice de búsqueda; caché invalidada.
+        self.assertEqual(self.client.get('/api/tareas/resumen/').data, {'total': 2, 'completadas': 1, 'pendientes': 1})
+        titulos = [t['titulo'] for t in self.client.get('/api/tareas/', {'search': 'zanahoria'}).data['results']]
+        self.assertEqual(titulos, ['Cuarta'])
+
+    def test_csv_con_bom_y_campos_multilinea(self):
+        cuerpo = (
+            '\ufefftitulo,descripcion,completado\r\n'
+            'Uno,"Línea 1\nLínea 2",true\r\n'
+            'Dos,Sin estado,\r\n'
+            ',Sin título,false\r\n'
+        )
+        response = self._importar(cuerpo, 'text/csv; charset=utf-8')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['creadas'], response.data['rechazadas']), (2, 1))
+        self.assertEqual(response.data['errores'][0]['fila'], 3)
+        uno = Tarea.objects.get(usuario=self.user, titulo='Uno')
+        self.assertEqual((uno.descripcion, uno.completado), ('Línea 1\nLínea 2', True))
+        self.assertFalse(Tarea.objects.get(usuario=self.user, titulo='Dos').completado)
+
+        response = self._importar('nombre,texto\r\na,b\r\n', 'text/csv')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(TAREAS_IMPORTACION={'LOTE': 3, 'MAX_ERRORES': 2})
+    def test_bloques_acotados(self):
+        filas = [{'titulo': f'T{i}', 'descripcion': 'd' if i % 4 else ' '} for i in range(10)]
+        with CaptureQueriesContext(connection) as consultas:
+            response = self._importar(''.join(json.dumps(fila) + '\n' for fila in filas))
+        self.assertEqual((response.data['creadas'], response.data['rechazadas']), (7, 3))
+        self.assertEqual(len(response.data['errores']), 2)
+        inserciones = [q for q in consultas if q['sql'].startswith('INSERT INTO "tareas"')]
+        # Un bulk_create por bloque de 3 filas (el segundo bloque tiene una válida menos).
+        self.assertEqual(len(inserciones), 4)
+
+    def test_formato_cuerpo_y_linea(self):
+        self.assertEqual(self._importar('x', 'text/plain').status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        self.assertEqual(
+            self._importar('{"titulo": "a", "descripcion": "b"}', 'text/plain', QUERY_STRING='formato=ndjson').status_code,
+            status.HTTP_200_OK,
+        )
+        self.assertEqual(self._importar(b'', CONTENT_LENGTH='0').status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(TAREAS_IMPORTACION={'MAX_LINEA': 100}):
+            response = self._importar(
+                json.dumps({'titulo': 'ok', 'descripcion': 'd'}) + '\n'
+                + json.dumps({'titulo': 'larga', 'descripcion': 'x' * 200}) + '\n'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('interrumpida', response.data)
+
+    @override_settings(TAREAS_IMPORTACION={'LOTE': 1, 'MAX_LINEA': 100})
+    def test_interrumpida_tras_crear_tareas(self):
+        response = self._importar(
+            json.dumps({'titulo': 'ok', 'descripcion': 'd'}) + '\n'
+            + json.dumps({'titulo': 'larga', 'descripcion': 'x' * 200}) + '\n'
+        )
+        # El primer bloque ya está guardado: un 4xx invitaría a reintentar y duplicarlo.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['creadas'], 1)
+        self.assertIn('interrumpida', response.data)
+        self.assertEqual(Tarea.objects.filter(usuario=self.user).count(), 1)
+
+    def test_sin_content_length(self):
+        # Un envío chunked llega sin Content-Length y DRF no abre el stream.
+        response = self._importar(
+            '{"titulo": "a", "descripcion": "b"}\n',
+            CONTENT_LENGTH='', HTTP_TRANSFER_ENCODING='chunked',
+        )
+        self.assertEqual(response.status_code, status.HTTP_411_LENGTH_REQUIRED)
+        self.assertFalse(Tarea.objects.filter(usuario=self.user).exists())
@@ -0,0 +1,328 @@
+"""
+Trabajos en segundo plano sin broker externo.
+
+La API encola un Trabajo (una fila de `tareas_trabajos`) y responde 202 de
+inmediato. `manage.py procesar_trabajos` reclama los pendientes con un
+UPDATE condicionado al estado, de modo que varios trabajadores nunca
+ejecutan el mismo, y los reparte en un pool de procesos. Cada tipo de
+trabajo informa de su avance con Progreso y retorna el nombre del archivo
+generado (en TAREAS_TRABAJOS['DIRECTORIO']), si lo hay. El progreso sirve
+también de latido: solo vuelven a la cola los trabajos en curso cuyo
+trabajador lleva CADUCIDAD segundos sin darlo. Los trabajos terminados y
+sus archivos se purgan pasados RETENCION_DIAS días.
+
+Los procesos del pool se crean con fork (mp_context en procesar_trabajos):
+heredan Django ya configurado, y el trabajador cierra sus conexiones antes
+de cada envío para que ningún hijo comparta la conexión del padre. La
+caché del listado se invalida desde el proceso del trabajo; llega a los
+procesos web porque los contadores de versión están en el alias compartido
+CACHES['tareas_versiones'] (ver cache.py). Si ese alias apunta a una caché
+local de cada proceso, los listados tardan hasta su TIMEOUT en reflejar
+los cambios del trabajo.
+"""
+import logging
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+from rest_framework.exceptions import Throttled, ValidationError
+
+from . import cache as cache_tareas
+from .filters import BusquedaTextoFilter
+from .models import Tarea, Trabajo
+from .serializers import TareaLecturaRapida, seleccionar_campos
+
+logger = logging.getLogger('tareas.trabajos')
+
+CONFIGURACION_POR_DEFECTO = {
+    # Directorio de los archivos generados (exportaciones), relativo a BASE_DIR.
+    'DIRECTORIO': 'trabajos',
+    # Procesos del pool de `procesar_trabajos`.
+    'PROCESOS': 2,
+    # Segundos entre consultas a la cola cuando está vacía.
+    'INTERVALO': 1.0,
+    # Segundos mínimos entre actualizaciones del progreso.
+    'INTERVALO_PROGRESO': 1.0,
+    # Filas por bloque de lectura o de UPDATE.
+    'LOTE': 2000,
+    # Trabajos pendientes o en curso por usuario (429 al superarlo).
+    'MAX_PENDIENTES': 5,
+    # Segundos sin latido (ver Progreso) tras los que un trabajo en curso se
+    # considera abandonado (trabajador caído) y vuelve a la cola.
+    'CADUCIDAD': 3600,
+    # Días que se conservan los trabajos terminados y sus archivos.
+    'RETENCION_DIAS': 7,
+    # Segundos entre purgas de trabajos terminados en `procesar_trabajos`.
+    'INTERVALO_PURGA': 3600,
+}
+
+# Filtros admitidos en los parámetros, los mismos que en el listado.
+FILTROS = ('completado', 'titulo', 'search')
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'TAREAS_TRABAJOS', {})}
+
+
+def directorio():
+    """
+    Directorio de los resultados. Una ruta relativa se toma desde BASE_DIR y
+    no desde el directorio actual, que puede ser distinto en el servidor web
+    y en el trabajador.
+    """
+    return Path(settings.BASE_DIR) / configuracion()['DIRECTORIO']
+
+
+def ruta_resultado(trabajo):
+    return directorio() / trabajo.resultado
+
+
+# Tipos de trabajo: nombre -> (validar(usuario, parametros), ejecutar(trabajo, progreso)).
+TIPOS = {}
+
+
+def registrar(nombre, validar):
+    def decorador(funcion):
+        TIPOS[nombre] = (validar, funcion)
+        return funcion
+    return decorador
+
+
+class Progreso:
+    """
+    Guarda procesadas/total del trabajo, como mucho cada `intervalo` segundos.
+
+    Cada actualización renueva también fecha_latido: mientras el trabajo
+    informe de su avance, recuperar_abandonados no lo devuelve a la cola.
+    """
+
+    def __init__(self, trabajo_id, intervalo):
+        self.trabajo_id = trabajo_id
+        self.intervalo = intervalo
+        self._ultimo = 0.0
+
+    def __call__(self, procesadas, total=None, forzar=False):
+        ahora = time.monotonic()
+        if not forzar and total is None and ahora - self._ultimo < self.intervalo:
+            return
+        self._ultimo = ahora
+        campos = {'procesadas': procesadas, 'fecha_latido': timezone.now()}
+        if total is not None:
+            campos['total'] = total
+        Trabajo.objects.filter(pk=self.trabajo_id).update(**campos)
+
+
+def encolar(usuario, tipo, parametros):
+    """Valida los parámetros y crea el trabajo pendiente."""
+    if tipo not in TIPOS:
+        raise ValidationError({'tipo': [f"Tipo de trabajo desconocido. Use uno de: {', '.join(sorted(TIPOS))}."]})
+    if not isinstance(parametros, dict):
+        raise ValidationError({'parametros': ['Se esperaba un objeto.']})
+    validar, _ = TIPOS[tipo]
+    validar(usuario, parametros)
+    # Cuenta y alta en una transacción con la fila del usuario bloqueada
+    # (SELECT ... FOR UPDATE; en SQLite la transacción IMMEDIATE ya toma el
+    # bloqueo de escritura): dos peticiones simultáneas no pueden superar
+    # juntas MAX_PENDIENTES.
+    with transaction.atomic():
+        User.objects.select_for_update().only('pk').get(pk=usuario.pk)
+        activos = Trabajo.objects.filter(
+            usuario=usuario, estado__in=(Trabajo.PENDIENTE, Trabajo.EN_CURSO)
+        ).count()
+        if activos >= configuracion()['MAX_PENDIENTES']:
+            raise Throttled(detail='Demasiados trabajos pendientes. Espere a que terminen.')
+        return Trabajo.objects.create(usuario=usuario, tipo=tipo, parametros=parametros)
+
+
+def reclamar():
+    """Pasa a en curso el pendiente más antiguo y retorna su id, o None si no hay."""
+    while True:
+        trabajo_id = (
+            Trabajo.objects.filter(estado=Trabajo.PENDIENTE)
+            .order_by('id').values_list('id', flat=True).first()
+        )
+        if trabajo_id is None:
+            return None
+        # Otro trabajador puede haberlo reclamado entre la lectura y el UPDATE.
+        ahora = timezone.now()
+        if Trabajo.objects.filter(pk=trabajo_id, estado=Trabajo.PENDIENTE).update(
+            estado=Trabajo.EN_CURSO, fecha_inicio=ahora, fecha_latido=ahora
+        ):
+            return trabajo_id
+
+
+def recuperar_abandonados():
+    """
+    Devuelve a la cola los trabajos en curso sin latido desde hace más de
+    CADUCIDAD segundos. Un trabajo largo que sigue informando de su
+    progreso no se recupera, aunque empezara hace más tiempo.
+    """
+    limite = timezone.now() - timedelta(seconds=configuracion()['CADUCIDAD'])
+    sin_latido = Q(fecha_latido__lt=limite) | Q(fecha_latido__isnull=True, fecha_inicio__lt=limite)
+    return Trabajo.objects.filter(sin_latido, estado=Trabajo.EN_CURSO).update(
+        estado=Trabajo.PENDIENTE, fecha_inicio=None, fecha_latido=None
+    )
+
+
+def purgar_terminados():
+    """
+    Elimina los trabajos terminados hace más de RETENCION_DIAS días junto
+    con sus archivos; retorna cuántos se eliminaron.
+    """
+    ajustes = configuracion()
+    limite = timezone.now() - timedelta(days=ajustes['RETENCION_DIAS'])
+    terminados = Trabajo.objects.filter(
+        estado__in=(Trabajo.COMPLETADO, Trabajo.FALLIDO), fecha_fin__lt=limite
+    ).order_by('id')
+    eliminados = 0
+    while True:
+        lote = list(terminados.values_list('id', 'resultado')[:ajustes['LOTE']])
+        if not lote:
+            return eliminados
+        # Primero los archivos: si el proceso se detiene entre medias, la
+        # siguiente purga encuentra las filas y lo reintenta.
+        for _, resultado in lote:
+            if resultado:
+                (directorio() / resultado).unlink(missing_ok=True)
+        Trabajo.objects.filter(pk__in=[trabajo_id for trabajo_id, _ in lote]).delete()
+        eliminados += len(lote)
+
+
+def marcar_fallido(trabajo_id, error):
+    Trabajo.objects.filter(pk=trabajo_id).update(
+        estado=Trabajo.FALLIDO, error=error, fecha_fin=timezone.now()
+    )
+
+
+def inicializar_proceso():
+    """Inicializador del pool: el hijo abre sus propias conexiones."""
+    connections.close_all()
+
+
+def ejecutar(trabajo_id):
+    """Ejecuta un trabajo ya reclamado y guarda su estado final; retorna ese estado."""
+    try:
+        trabajo = Trabajo.objects.select_related('usuario').get(pk=trabajo_id)
+        _, funcion = TIPOS[trabajo.tipo]
+        resultado = funcion(trabajo, Progreso(trabajo_id, configuracion()['INTERVALO_PROGRESO']))
+    except Exception as exc:
+        logger.exception('El trabajo %s ha fallado', trabajo_id)
+        marcar_fallido(trabajo_id, f'{type(exc).__name__}: {exc}')
+        return Trabajo.FALLIDO
+    Trabajo.objects.filter(pk=trabajo_id).update(
+        estado=Trabajo.COMPLETADO, resultado=resultado or '', fecha_fin=timezone.now()
+    )
+    return Trabajo.COMPLETADO
+
+
+def ejecutar_en_proceso(trabajo_id):
+    """ejecutar() para el pool: como en una petición, descarta las conexiones caducadas."""
+    close_old_connections()
+    try:
+        return ejecutar(trabajo_id)
+    finally:
+        close_old_connections()
+
+
+def filtrar(usuario, filtros):
+    """
+    Tareas del usuario con los filtros del listado (django-filter y
+    ?search=), igual que TareaViewSet. Lanza ValidationError si no son válidos.
+    """
+    from .views import TareaViewSet  # importación diferida: views importa este módulo
+
+    if not isinstance(filtros, dict) or set(filtros) - set(FILTROS):
+        raise ValidationError({'filtros': [f"Se esperaba un objeto con: {', '.join(FILTROS)}."]})
+    peticion = HttpRequest()
+    peticion.GET = QueryDict(mutable=True)
+    peticion.GET.update({nombre: str(valor).lower() if isinstance(valor, bool) else str(valor)
+                         for nombre, valor in filtros.items()})
+    queryset = Tarea.objects.filter(usuario=usuario)
+    filterset_class = DjangoFilterBackend().get_filterset_class(TareaViewSet, queryset)
+    filterset = filterset_class(peticion.GET, queryset=queryset)
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    return BusquedaTextoFilter().filter_queryset(peticion, filterset.qs, None)
+
+
+def _validar_exportacion(usuario, parametros):
+    if parametros.get('formato', 'ndjson') not in ('ndjson', 'csv'):
+        raise ValidationError({'formato': ["Formato no soportado. Use 'ndjson' o 'csv'."]})
+    seleccionar_campos(parametros.get('fields'), parametros.get('exclude'))
+    filtrar(usuario, parametros.get('filtros', {}))
+
+
+@registrar('exportar', _validar_exportacion)
+def exportar(trabajo, progreso):
+    """Escribe la exportación (como la acción exportar) en un archivo."""
+    from .views import lineas_csv, lineas_ndjson
+
+    ajustes = configuracion()
+    parametros = trabajo.parametros
+    formato = parametros.get('formato', 'ndjson')
+    lectura = TareaLecturaRapida(seleccionar_campos(parametros.get('fields'), parametros.get('exclude')))
+    queryset = lectura.preparar(filtrar(trabajo.usuario, parametros.get('filtros', {})))
+    progreso(0, queryset.count())
+
+    procesadas = 0
+
+    def filas():
+        nonlocal procesadas
+        for fila in queryset.iterator(chunk_size=ajustes['LOTE']):
+            yield fila
+            procesadas += 1
+            progreso(procesadas)
+
+    destino = directorio()
+    destino.mkdir(parents=True, exist_ok=True)
+    nombre = f'{trabajo.pk}.{formato}'
+    # Se escribe en un archivo parcial y se renombra al terminar: el
+    # resultado nunca se sirve a medias.
+    parcial = destino / f'{nombre}.parcial'
+    lineas = lineas_csv if formato == 'csv' else lineas_ndjson
+    with open(parcial, 'w', encoding='utf-8', newline='') as archivo:
+        archivo.writelines(lineas(lectura, filas()))
+    os.replace(parcial, destino / nombre)
+    progreso(procesadas, forzar=True)
+    return nombre
+
+
+def _validar_actualizacion(usuario, parametros):
+    if not isinstance(parametros.get('completado'), bool):
+        raise ValidationError({'completado': ['Se esperaba true o false.']})
+    filtrar(usuario, parametros.get('filtros', {}))
+
+
+@registrar('actualizar', _validar_actualizacion)
+def actualizar(trabajo, progreso):
+    """Fija `completado` en las tareas filtradas, con un UPDATE por lote."""
+    ajustes = configuracion()
+    valor = trabajo.parametros['completado']
+    queryset = (
+        filtrar(trabajo.usuario, trabajo.parametros.get('filtros', {}))
+        .exclude(completado=valor).order_by('id')
+    )
+    progreso(0, queryset.count())
+    procesadas, ultimo_id = 0, 0
+    while True:
+        ids = list(queryset.filter(id__gt=ultimo_id).values_list('id', flat=True)[:ajustes['LOTE']])
+        if not ids:
+            break
+        with transaction.atomic():
+            Tarea.objects.filter(id__in=ids, usuario=trabajo.usuario).update(
+                completado=valor, fecha_actualizacion=timezone.now()
+            )
+            cache_tareas.invalidar_usuario(trabajo.usuario_id)
+        procesadas += len(ids)
+        ultimo_id = ids[-1]
+        progreso(procesadas)
+    progreso(procesadas, forzar=True)
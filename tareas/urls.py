@@ -1,8 +1,18 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 from .views import TareaViewSet
+from .views_async import TareaDetalleAsyncView, TareaListaAsyncView, TareaToggleAsyncView
 
 router = DefaultRouter()
 router.register(r'tareas', TareaViewSet, basename='tarea')
 
-urlpatterns = router.urls 
\ No newline at end of file
+# Camino asíncrono para ASGI (ver views_async.py).
+urlpatterns = router.urls + [
+    path('async/tareas/', TareaListaAsyncView.as_view(), name='tarea-async-list'),
+    path('async/tareas/<int:pk>/', TareaDetalleAsyncView.as_view(), name='tarea-async-detail'),
+    path(
+        'async/tareas/<int:pk>/toggle_completado/',
+        TareaToggleAsyncView.as_view(),
+        name='tarea-async-toggle-completado',
+    ),
+]
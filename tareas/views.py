@@ -1,17 +1,79 @@
 from django.shortcuts import render
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-from .models import Tarea
-from .serializers import TareaSerializer
+from .models import ResumenTareas, Tarea, TareaArchivada, TareaEliminada, Trabajo
+from . import importacion
+from . import sincronizacion
+from . import trabajos
+from .serializers import TareaSerializer, TareaLecturaRapida, TrabajoSerializer, seleccionar_campos
+from .pagination import TareaCursorPagination, TareaPageNumberPagination
+from .filters import BusquedaTextoFilter
+from . import cache as cache_tareas
+from .condicional import (
+    PreconditionFailed, cabeceras, etag_listado, etag_tarea, respuesta_condicional
+)
 from rest_framework import viewsets
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.exceptions import NotFound, UnsupportedMediaType
+from rest_framework import status
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.contrib.auth.models import User
+from django.db.models import Count, Max, Subquery
+from django.http import FileResponse, StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+import csv
+import json
 
 # Create your views here.
 
+# Selección de campos (?fields= / ?exclude=), común a las rutas de lectura.
+PARAMETROS_CAMPOS = [
+    openapi.Parameter(
+        'fields',
+        openapi.IN_QUERY,
+        description="Campos a incluir, separados por comas (p. ej. id,titulo,completado). "
+                    "Las columnas de los demás campos no se leen de la base de datos",
+        type=openapi.TYPE_STRING,
+        required=False
+    ),
+    openapi.Parameter(
+        'exclude',
+        openapi.IN_QUERY,
+        description="Campos a omitir, separados por comas (p. ej. descripcion)",
+        type=openapi.TYPE_STRING,
+        required=False
+    ),
+]
+
+
+def lineas_ndjson(lectura, filas):
+    """Líneas NDJSON de la exportación (también las usa el trabajo `exportar`)."""
+    for fila in filas:
+        datos = lectura.to_representation(fila)
+        yield json.dumps(datos, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+def lineas_csv(lectura, filas):
+    """Líneas CSV de la exportación, con cabecera."""
+    class Linea:
+        """Buffer mínimo: csv.writer devuelve directamente la línea escrita."""
+        def write(self, valor):
+            return valor
+
+    campos = lectura.campos
+    writer = csv.writer(Linea())
+    yield writer.writerow(campos)
+    for fila in filas:
+        datos = lectura.to_representation(fila)
+        yield writer.writerow([datos[campo] for campo in campos])
+
+
 class TareaViewSet(viewsets.ModelViewSet):
     """
     ViewSet para gestionar tareas de usuarios.
@@ -22,16 +84,112 @@ class TareaViewSet(viewsets.ModelViewSet):
     queryset = Tarea.objects.all()
     serializer_class = TareaSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, BusquedaTextoFilter]
     filterset_fields = ['completado', 'titulo']
+    pagination_class = TareaPageNumberPagination
+    cursor_pagination_class = TareaCursorPagination
+    # Número máximo de elementos aceptados por las operaciones por lotes.
+    max_lote = 500
+    # Filas leídas de la base de datos por cada bloque durante la exportación.
+    export_chunk_size = 2000
+
+    @property
+    def paginator(self):
+        """
+        Usa paginación por cursor cuando el cliente la solicita con
+        ?paginacion=cursor (o envía un cursor); en otro caso mantiene
+        la paginación por número de página configurada globalmente.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request else {}
+            if params.get('paginacion') == 'cursor' or 'cursor' in params:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def get_queryset_archivadas(self):
+        """Tareas archivadas del usuario actual (ver tareas/archivo.py)."""
+        return TareaArchivada.objects.filter(usuario=self.request.user)
+
+    def incluir_archivadas(self):
+        valor = self.request.query_params.get('incluir_archivadas', '')
+        return valor.lower() in ('true', '1')
+
+    def marcas_usuario(self):
+        """
+        Última actualización y última eliminación de las tareas del usuario.
+
+        Validador del listado por cursor, que no cuenta filas: son dos
+        búsquedas por índice (tareas_usuario_act_idx y
+        tareas_elim_usuario_idx) en una sola consulta. No dependen de los
+        filtros, que ya forman parte del ETag a través de la URL; cualquier
+        alta, modificación, eliminación o archivado las cambia.
+        """
+        ultima_actualizacion = Tarea.objects.filter(usuario=self.request.user).order_by(
+            '-fecha_actualizacion'
+        ).values('fecha_actualizacion')[:1]
+        ultima_eliminacion = TareaEliminada.objects.filter(usuario=self.request.user).order_by(
+            '-fecha_eliminacion'
+        ).values('fecha_eliminacion')[:1]
+        marcas = User.objects.filter(pk=self.request.user.pk).values(
+            actualizacion=Subquery(ultima_actualizacion),
+            eliminacion=Subquery(ultima_eliminacion),
+        ).get()
+        return marcas['actualizacion'], marcas['eliminacion']
+
+    def get_campos(self):
+        """Campos pedidos con ?fields= / ?exclude=, o None para todos."""
+        if not hasattr(self, '_campos'):
+            params = self.request.query_params if self.request else {}
+            self._campos = seleccionar_campos(params.get('fields'), params.get('exclude'))
+        return self._campos
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('campos', self.get_campos())
+        return super().get_serializer(*args, **kwargs)
 
     def perform_create(self, serializer):
         """Asigna automáticamente el usuario actual a la tarea creada."""
         serializer.save(usuario=self.request.user)
 
+    def perform_update(self, serializer):
+        """
+        Guarda la tarea respetando If-Match / If-Unmodified-Since.
+
+        Con precondiciones, la fila se reclama con un UPDATE condicionado a
+        la fecha de actualización leída: si otra petición la modificó entre
+        medias no se actualiza nada y se responde 412, sin lecturas extra.
+        """
+        tarea = serializer.instance
+        if 'HTTP_IF_MATCH' in self.request.META or 'HTTP_IF_UNMODIFIED_SINCE' in self.request.META:
+            etag = etag_tarea(tarea.pk, tarea.fecha_actualizacion)
+            if respuesta_condicional(self.request, etag, tarea.fecha_actualizacion) is not None:
+                raise PreconditionFailed()
+            with transaction.atomic():
+                reclamada = Tarea.objects.filter(
+                    pk=tarea.pk, fecha_actualizacion=tarea.fecha_actualizacion
+                ).update(fecha_actualizacion=tarea.fecha_actualizacion)
+                if not reclamada:
+                    raise PreconditionFailed()
+                serializer.save()
+        else:
+            serializer.save()
+        self.headers.update(cabeceras(
+            etag_tarea(tarea.pk, tarea.fecha_actualizacion), tarea.fecha_actualizacion
+        ))
+
     def get_queryset(self):
-        """Filtra las tareas para mostrar solo las del usuario actual."""
-        return Tarea.objects.filter(usuario=self.request.user)
+        """
+        Filtra las tareas para mostrar solo las del usuario actual.
+
+        Incluye al usuario en la misma consulta (select_related) porque
+        TareaSerializer lee usuario.username en cada fila.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            # Generación del esquema (p. ej. generar_esquema): no hay usuario.
+            return Tarea.objects.none()
+        return Tarea.objects.filter(usuario=self.request.user).select_related('usuario')
 
     @swagger_auto_schema(
         operation_description="Obtiene la lista de tareas del usuario autenticado",
@@ -51,6 +209,13 @@ class TareaViewSet(viewsets.ModelViewSet):
                 type=openapi.TYPE_STRING,
                 required=False
             ),
+            openapi.Parameter(
+                'search',
+                openapi.IN_QUERY,
+                description="Búsqueda de texto en título y descripción, ordenada por relevancia",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
             openapi.Parameter(
                 'page',
                 openapi.IN_QUERY,
@@ -58,6 +223,36 @@ class TareaViewSet(viewsets.ModelViewSet):
                 type=openapi.TYPE_INTEGER,
                 required=False
             ),
+            openapi.Parameter(
+                'paginacion',
+                openapi.IN_QUERY,
+                description="Usar 'cursor' para paginación por cursor (sin conteo total)",
+                type=openapi.TYPE_STRING,
+                enum=['cursor'],
+                required=False
+            ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description="Cursor opaco devuelto en next/previous en modo cursor",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'page_size',
+                openapi.IN_QUERY,
+                description="Tamaño de página en modo cursor (máximo 100)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'incluir_archivadas',
+                openapi.IN_QUERY,
+                description="Incluir también las tareas archivadas (solo con paginación por número de página)",
+                type=openapi.TYPE_BOOLEAN,
+                required=False
+            ),
+            *PARAMETROS_CAMPOS,
         ],
         responses={
             200: openapi.Response(
@@ -88,7 +283,62 @@ class TareaViewSet(viewsets.ModelViewSet):
         }
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        clave = cache_tareas.clave_listado(request)
+        cacheado = cache_tareas.obtener(clave)
+        if cacheado is not None:
+            condicional = respuesta_condicional(request, cacheado['etag'])
+            if condicional is not None:
+                return condicional
+            return Response(cacheado['datos'], headers={'X-Cache': 'HIT', 'ETag': cacheado['etag']})
+
+        if isinstance(self.paginator, TareaCursorPagination) and BusquedaTextoFilter().get_search_terms(request):
+            # El cursor reordenaría por fecha y perdería el orden por relevancia.
+            return Response(
+                {'detail': 'search no admite paginación por cursor.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        partes = [self.filter_queryset(self.get_queryset())]
+        if self.incluir_archivadas():
+            if isinstance(self.paginator, TareaCursorPagination):
+                return Response(
+                    {'detail': 'incluir_archivadas no admite paginación por cursor.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            partes.append(self.filter_queryset(self.get_queryset_archivadas()))
+
+        # Validador de la colección, antes de serializar.
+        if isinstance(self.paginator, TareaCursorPagination):
+            etag = etag_listado(request, *self.marcas_usuario())
+        else:
+            # Un agregado por tabla; su total sustituye al COUNT del paginador.
+            resumenes = [
+                parte.aggregate(maximo=Max('fecha_actualizacion'), total=Count('id')) for parte in partes
+            ]
+            maximo = max((r['maximo'] for r in resumenes if r['maximo'] is not None), default=None)
+            total = sum(r['total'] for r in resumenes)
+            self.paginator.total = total
+            etag = etag_listado(request, maximo, total)
+        condicional = respuesta_condicional(request, etag)
+        if condicional is not None:
+            return condicional
+
+        lectura = TareaLecturaRapida(self.get_campos())
+        if len(partes) == 1:
+            queryset = lectura.preparar(partes[0])
+        else:
+            # UNION ALL de ambas tablas con la misma ordenación que el listado.
+            activas, archivadas = (lectura.preparar(parte.order_by()) for parte in partes)
+            queryset = activas.union(archivadas, all=True).order_by('-fecha_creacion', '-id')
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(lectura.serializar(page))
+        else:
+            response = Response(lectura.serializar(queryset))
+        cache_tareas.guardar(clave, {'datos': response.data, 'etag': etag})
+        response['X-Cache'] = 'MISS'
+        response['ETag'] = etag
+        return response
 
     @swagger_auto_schema(
         operation_description="Crea una nueva tarea para el usuario autenticado",
@@ -136,6 +386,7 @@ class TareaViewSet(viewsets.ModelViewSet):
     @swagger_auto_schema(
         operation_description="Obtiene los detalles de una tarea específica",
         operation_summary="Obtener tarea",
+        manual_parameters=PARAMETROS_CAMPOS,
         responses={
             200: openapi.Response(
                 description="Detalles de la tarea obtenidos exitosamente",
@@ -155,7 +406,28 @@ class TareaViewSet(viewsets.ModelViewSet):
         }
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        lectura = TareaLecturaRapida(self.get_campos())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            # Como get_object_or_404: un id mal formado es un 404, no un 500.
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound()
+        filas = list(lectura.preparar(queryset).order_by()[:1])
+        if not filas:
+            raise NotFound()
+
+        fila = filas[0]
+        etag = etag_tarea(fila['id'], fila['fecha_actualizacion'])
+        condicional = respuesta_condicional(request, etag, fila['fecha_actualizacion'])
+        if condicional is not None:
+            return condicional
+        return Response(
+            lectura.to_representation(fila),
+            headers=cabeceras(etag, fila['fecha_actualizacion'])
+        )
 
     @swagger_auto_schema(
         operation_description="Actualiza una tarea existente",
@@ -278,9 +550,531 @@ class TareaViewSet(viewsets.ModelViewSet):
     )
     @action(detail=True, methods=['post'])
     def toggle_completado(self, request, pk=None):
-        """Acción personalizada para cambiar el estado de completado de una tarea."""
-        tarea = self.get_object()
-        tarea.completado = not tarea.completado
-        tarea.save()
+        """
+        Acción personalizada para cambiar el estado de completado de una tarea.
+
+        El cambio se hace con un único UPDATE condicional (ver
+        TareaManager.alternar_completado), sin leer la tarea antes.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        tarea = Tarea.objects.alternar_completado(self.kwargs[lookup_url_kwarg], request.user)
+        if tarea is None:
+            raise NotFound()
+        # El UPDATE no emite post_save.
+        cache_tareas.invalidar_usuario(request.user.pk)
         serializer = self.get_serializer(tarea)
-        return Response(serializer.data)
+        return Response(
+            serializer.data,
+            headers=cabeceras(etag_tarea(tarea.pk, tarea.fecha_actualizacion), tarea.fecha_actualizacion)
+        )
+
+    def _validar_lote(self, datos):
+        """Comprueba que el cuerpo de una operación por lotes sea una lista acotada."""
+        if not isinstance(datos, list) or not datos:
+            return Response(
+                {'detail': 'Se esperaba una lista no vacía.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(datos) > self.max_lote:
+            return Response(
+                {'detail': f'El lote no puede superar {self.max_lote} elementos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return None
+
+    @staticmethod
+    def _errores_por_elemento(errores):
+        """
+        Normaliza los errores de un ListSerializer (lista o diccionario
+        indexado, según la versión de DRF) a un resultado por elemento.
+        """
+        if isinstance(errores, dict):
+            errores = errores.items()
+        else:
+            errores = enumerate(errores)
+        return [
+            {'indice': indice, 'estado': status.HTTP_400_BAD_REQUEST, 'errores': error}
+            for indice, error in sorted(errores, key=lambda par: par[0]) if error
+        ]
+
+    @swagger_auto_schema(
+        method='post',
+        operation_description="Crea varias tareas del usuario autenticado en una sola transacción. "
+                              "Si algún elemento es inválido no se crea ninguna.",
+        operation_summary="Crear tareas por lotes",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                required=['titulo', 'descripcion'],
+                properties={
+                    'titulo': openapi.Schema(type=openapi.TYPE_STRING, description="Título de la tarea", max_length=200),
+                    'descripcion': openapi.Schema(type=openapi.TYPE_STRING, description="Descripción detallada de la tarea"),
+                    'completado': openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Estado de completado"),
+                }
+            )
+        ),
+        responses={
+            201: openapi.Response(description="Tareas creadas; un resultado por elemento"),
+            400: openapi.Response(description="Errores de validación por elemento"),
+            401: openapi.Response(description="No autenticado"),
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='lote')
+    def lote(self, request):
+        """Crea un lote de tareas con un único bulk_create."""
+        error = self._validar_lote(request.data)
+        if error:
+            return error
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(
+                {'resultados': self._errores_por_elemento(serializer.errors)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        with transaction.atomic():
+            serializer.save(usuario=request.user)
+            # bulk_create no emite post_save.
+            cache_tareas.invalidar_usuario(request.user.pk)
+        resultados = [
+            {'indice': indice, 'estado': status.HTTP_201_CREATED, 'tarea': tarea}
+            for indice, tarea in enumerate(serializer.data)
+        ]
+        return Response({'resultados': resultados}, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_description="Actualiza parcialmente varias tareas del usuario autenticado en una "
+                              "sola transacción. Cada elemento debe incluir su 'id'. Si algún "
+                              "elemento es inválido o no existe no se modifica ninguna.",
+        operation_summary="Actualizar tareas por lotes",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                required=['id'],
+                properties={
+                    'id': openapi.Schema(type=openapi.TYPE_INTEGER, description="ID de la tarea"),
+                    'titulo': openapi.Schema(type=openapi.TYPE_STRING, description="Título de la tarea", max_length=200),
+                    'descripcion': openapi.Schema(type=openapi.TYPE_STRING, description="Descripción detallada de la tarea"),
+                    'completado': openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Estado de completado"),
+                }
+            )
+        ),
+        responses={
+            200: openapi.Response(description="Tareas actualizadas; un resultado por elemento"),
+            400: openapi.Response(description="Errores por elemento"),
+            401: openapi.Response(description="No autenticado"),
+        }
+    )
+    @lote.mapping.patch
+    def actualizar_lote(self, request):
+        """Actualiza parcialmente un lote de tareas con un único bulk_update."""
+        error = self._validar_lote(request.data)
+        if error:
+            return error
+
+        errores = {}
+        ids = []
+        for indice, elemento in enumerate(request.data):
+            tarea_id = elemento.get('id') if isinstance(elemento, dict) else None
+            if not isinstance(tarea_id, int) or isinstance(tarea_id, bool):
+                errores[indice] = {'id': ['Se requiere un id entero.']}
+                tarea_id = None
+            ids.append(tarea_id)
+        validos = [tarea_id for tarea_id in ids if tarea_id is not None]
+        if len(set(validos)) != len(validos):
+            return Response(
+                {'detail': 'El lote contiene ids repetidos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            # La propiedad se comprueba igual que en get_queryset.
+            tareas = self.get_queryset().select_for_update().in_bulk(validos)
+            for indice, tarea_id in enumerate(ids):
+                if tarea_id is not None and tarea_id not in tareas:
+                    errores[indice] = {'id': ['Tarea no encontrada.']}
+
+            serializer = self.get_serializer(
+                [tareas.get(tarea_id) for tarea_id in ids],
+                data=request.data, many=True, partial=True
+            )
+            if not serializer.is_valid():
+                for resultado in self._errores_por_elemento(serializer.errors):
+                    errores[resultado['indice']] = {
+                        **resultado['errores'], **errores.get(resultado['indice'], {})
+                    }
+            if errores:
+                return Response(
+                    {'resultados': self._errores_por_elemento(errores)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            serializer.save()
+            # bulk_update no emite post_save.
+            cache_tareas.invalidar_usuario(request.user.pk)
+
+        resultados = [
+            {'indice': indice, 'estado': status.HTTP_200_OK, 'tarea': tarea}
+            for indice, tarea in enumerate(serializer.data)
+        ]
+        return Response({'resultados': resultados})
+
+    @swagger_auto_schema(
+        operation_description="Elimina varias tareas del usuario autenticado con una sola sentencia. "
+                              "Los ids que no existen o pertenecen a otro usuario se informan con 404.",
+        operation_summary="Eliminar tareas por lotes",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(type=openapi.TYPE_INTEGER, description="ID de la tarea")
+        ),
+        responses={
+            200: openapi.Response(description="Resultado de la eliminación por elemento"),
+            400: openapi.Response(description="Datos inválidos"),
+            401: openapi.Response(description="No autenticado"),
+        }
+    )
+    @lote.mapping.delete
+    def eliminar_lote(self, request):
+        """Elimina un lote de tareas con un único DELETE ... WHERE id IN (...)."""
+        error = self._validar_lote(request.data)
+        if error:
+            return error
+        if not all(isinstance(tarea_id, int) and not isinstance(tarea_id, bool) for tarea_id in request.data):
+            return Response(
+                {'detail': 'Se esperaba una lista de ids enteros.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            queryset = self.get_queryset().filter(id__in=request.data)
+            existentes = set(queryset.values_list('id', flat=True))
+            queryset.delete()
+
+        resultados = [
+            {
+                'id': tarea_id,
+                'estado': status.HTTP_204_NO_CONTENT if tarea_id in existentes else status.HTTP_404_NOT_FOUND,
+            }
+            for tarea_id in request.data
+        ]
+        return Response({'resultados': resultados})
+
+    @swagger_auto_schema(
+        operation_description="Importa tareas desde un cuerpo NDJSON (Content-Type: "
+                              "application/x-ndjson, un objeto por línea) o CSV (text/csv, con "
+                              "cabecera titulo,descripcion[,completado]). El cuerpo se procesa en "
+                              "streaming y por bloques con las mismas validaciones que la creación; "
+                              "las filas no válidas se omiten y se informan con su número.",
+        operation_summary="Importar tareas",
+        manual_parameters=[
+            openapi.Parameter(
+                'formato',
+                openapi.IN_QUERY,
+                description="ndjson o csv; por defecto se deduce del Content-Type",
+                type=openapi.TYPE_STRING,
+                enum=['ndjson', 'csv'],
+                required=False
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Resumen de la importación",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'creadas': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'rechazadas': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'errores': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                            description="Errores por fila ({fila, errores}), hasta un máximo"
+                        ),
+                        'interrumpida': openapi.Schema(
+                            type=openapi.TYPE_STRING,
+                            description="Motivo si la lectura se detuvo tras crear tareas; "
+                                        "las creadas quedan guardadas"
+                        ),
+                    }
+                )
+            ),
+            400: openapi.Response(description="Cuerpo vacío, cabecera CSV incompleta o lectura "
+                                              "interrumpida sin ninguna tarea creada"),
+            401: openapi.Response(description="No autenticado"),
+            411: openapi.Response(description="Falta Content-Length (envío chunked)"),
+            415: openapi.Response(description="Formato no soportado"),
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def importar(self, request):
+        """
+        Importación masiva en streaming (ver tareas/importacion.py).
+
+        No se usa request.data: el cuerpo se lee del stream línea a línea,
+        así que la memoria no depende del tamaño del archivo.
+        """
+        formato = request.query_params.get('formato') or importacion.FORMATOS.get(
+            (request.content_type or '').split(';')[0].strip().lower()
+        )
+        if formato not in ('ndjson', 'csv'):
+            raise UnsupportedMediaType(request.content_type)
+        if request.stream is None:
+            # DRF solo abre el stream con Content-Length: un envío chunked
+            # llega sin cuerpo legible y se rechaza en lugar de darlo por vacío.
+            if not request.META.get('CONTENT_LENGTH'):
+                return Response(
+                    {'detail': 'Se requiere la cabecera Content-Length.'},
+                    status=status.HTTP_411_LENGTH_REQUIRED,
+                )
+            return Response({'detail': 'El cuerpo está vacío.'}, status=status.HTTP_400_BAD_REQUEST)
+        resultado = importacion.importar(request.user, request.stream, formato)
+        # Los bloques ya insertados no se deshacen: si se creó alguna tarea,
+        # la interrupción se informa con 200 para que el cliente no reintente
+        # el archivo entero y duplique esas tareas.
+        if 'interrumpida' in resultado and not resultado['creadas']:
+            return Response(resultado, status=status.HTTP_400_BAD_REQUEST)
+        return Response(resultado)
+
+    @swagger_auto_schema(
+        operation_description="Exporta todas las tareas del usuario autenticado en streaming, "
+                              "sin paginación. Admite los mismos filtros que el listado.",
+        operation_summary="Exportar tareas",
+        manual_parameters=[
+            openapi.Parameter(
+                'formato',
+                openapi.IN_QUERY,
+                description="Formato de salida: ndjson (por defecto) o csv",
+                type=openapi.TYPE_STRING,
+                enum=['ndjson', 'csv'],
+                required=False
+            ),
+            openapi.Parameter(
+                'completado',
+                openapi.IN_QUERY,
+                description="Filtrar por estado de completado (true/false)",
+                type=openapi.TYPE_BOOLEAN,
+                required=False
+            ),
+            openapi.Parameter(
+                'titulo',
+                openapi.IN_QUERY,
+                description="Filtrar por título de la tarea",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            *PARAMETROS_CAMPOS,
+        ],
+        responses={
+            200: openapi.Response(description="Archivo con una tarea por línea"),
+            400: openapi.Response(description="Formato no soportado"),
+            401: openapi.Response(description="No autenticado"),
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exporta las tareas filtradas como NDJSON o CSV.
+
+        Las filas se leen con iterator() en bloques, se serializan con la
+        ruta de lectura rápida y se escriben a medida que se generan, por
+        lo que la memoria no crece con el número de tareas.
+        """
+        formato = request.query_params.get('formato', 'ndjson')
+        if formato not in ('ndjson', 'csv'):
+            return Response(
+                {'detail': "Formato no soportado. Use 'ndjson' o 'csv'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        lectura = TareaLecturaRapida(self.get_campos())
+        queryset = lectura.preparar(self.filter_queryset(self.get_queryset()))
+        filas = queryset.iterator(chunk_size=self.export_chunk_size)
+        if formato == 'csv':
+            contenido, content_type = lineas_csv(lectura, filas), 'text/csv; charset=utf-8'
+        else:
+            contenido, content_type = lineas_ndjson(lectura, filas), 'application/x-ndjson'
+
+        response = StreamingHttpResponse(contenido, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="tareas.{formato}"'
+        return response
+
+    @swagger_auto_schema(
+        operation_description="Retorna los contadores de tareas del usuario autenticado. "
+                              "Se leen de una tabla mantenida en cada escritura, sin contar filas.",
+        operation_summary="Resumen de tareas",
+        responses={
+            200: openapi.Response(
+                description="Contadores de tareas",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'total': openapi.Schema(type=openapi.TYPE_INTEGER, description="Total de tareas"),
+                        'completadas': openapi.Schema(type=openapi.TYPE_INTEGER, description="Tareas completadas"),
+                        'pendientes': openapi.Schema(type=openapi.TYPE_INTEGER, description="Tareas pendientes"),
+                    }
+                )
+            ),
+            401: openapi.Response(description="No autenticado"),
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def resumen(self, request):
+        """Contadores total/completadas/pendientes en una sola lectura (ver ResumenTareas)."""
+        return Response(ResumenTareas.objects.de_usuario(request.user))
+
+    @swagger_auto_schema(
+        operation_description="Retorna las tareas creadas o modificadas y los ids de las eliminadas "
+                              "desde el token `since`, junto con el token para la siguiente llamada. "
+                              "Sin `since` retorna todas las tareas. Si `completo` es false quedan "
+                              "más cambios: repetir con el nuevo token. Las tareas de los últimos "
+                              "segundos pueden repetirse entre llamadas; aplicarlas por id.",
+        operation_summary="Cambios desde la última sincronización",
+        manual_parameters=[
+            openapi.Parameter(
+                'since',
+                openapi.IN_QUERY,
+                description="Token devuelto por la llamada anterior",
+                type=openapi.TYPE_STRING,
+                required=False
+            ),
+            openapi.Parameter(
+                'limite',
+                openapi.IN_QUERY,
+                description="Máximo de tareas por respuesta",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            *PARAMETROS_CAMPOS,
+        ],
+        responses={
+            200: openapi.Response(
+                description="Cambios desde el token",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'tareas': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                            description="Tareas creadas o modificadas"
+                        ),
+                        'eliminadas': openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                            description="Ids de las tareas eliminadas"
+                        ),
+                        'token': openapi.Schema(type=openapi.TYPE_STRING, description="Token para la siguiente llamada"),
+                        'completo': openapi.Schema(type=openapi.TYPE_BOOLEAN, description="No quedan más cambios"),
+                    }
+                )
+            ),
+            400: openapi.Response(description="Token o límite no válido"),
+            401: openapi.Response(description="No autenticado"),
+            410: openapi.Response(description="Token caducado: sincronizar de nuevo sin since"),
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def cambios(self, request):
+        """Sincronización incremental con lápidas (ver tareas/sincronizacion.py)."""
+        maximo = sincronizacion.configuracion()['MAX_LIMITE']
+        limite = request.query_params.get('limite')
+        if limite is not None:
+            try:
+                limite = int(limite)
+            except ValueError:
+                limite = 0
+            if not 1 <= limite <= maximo:
+                return Response(
+                    {'detail': f'El límite debe ser un entero entre 1 y {maximo}.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        lectura = TareaLecturaRapida(self.get_campos())
+        tareas, eliminadas, token, completo = sincronizacion.cambios_desde(
+            lectura.preparar(self.get_queryset()), request.user,
+            request.query_params.get('since'), limite
+        )
+        return Response({
+            'tareas': lectura.serializar(tareas),
+            'eliminadas': eliminadas,
+            'token': token,
+            'completo': completo,
+        })
+
+    @swagger_auto_schema(
+        operation_description="Encola un trabajo en segundo plano y responde 202 sin esperar a que "
+                              "termine. Tipos: `exportar` (parámetros formato, filtros, fields, "
+                              "exclude) y `actualizar` (parámetros completado y filtros). Los filtros "
+                              "son los del listado: completado, titulo y search. El estado se "
+                              "consulta en la URL de la cabecera Location.",
+        operation_summary="Encolar trabajo",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['tipo'],
+            properties={
+                'tipo': openapi.Schema(type=openapi.TYPE_STRING, enum=['exportar', 'actualizar']),
+                'parametros': openapi.Schema(type=openapi.TYPE_OBJECT),
+            }
+        ),
+        responses={
+            202: openapi.Response(description="Trabajo encolado", schema=TrabajoSerializer),
+            400: openapi.Response(description="Tipo o parámetros no válidos"),
+            401: openapi.Response(description="No autenticado"),
+            429: openapi.Response(description="Demasiados trabajos pendientes"),
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='trabajos')
+    def encolar_trabajo(self, request):
+        """Crea el trabajo; lo ejecuta `manage.py procesar_trabajos` (ver tareas/trabajos.py)."""
+        if not isinstance(request.data, dict):
+            return Response({'detail': 'Se esperaba un objeto.'}, status=status.HTTP_400_BAD_REQUEST)
+        trabajo = trabajos.encolar(request.user, request.data.get('tipo'), request.data.get('parametros', {}))
+        url = reverse('tarea-estado-trabajo', kwargs={'trabajo_id': trabajo.pk}, request=request)
+        return Response(
+            TrabajoSerializer(trabajo, context={'request': request}).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': url},
+        )
+
+    def get_trabajo(self, trabajo_id):
+        try:
+            return Trabajo.objects.get(pk=trabajo_id, usuario=self.request.user)
+        except Trabajo.DoesNotExist:
+            raise NotFound('Trabajo no encontrado.')
+
+    @swagger_auto_schema(
+        operation_description="Estado, progreso y, al terminar, URL del resultado de un trabajo.",
+        operation_summary="Estado de un trabajo",
+        responses={
+            200: TrabajoSerializer,
+            401: openapi.Response(description="No autenticado"),
+            404: openapi.Response(description="Trabajo no encontrado"),
+        }
+    )
+    @action(detail=False, methods=['get'], url_path=r'trabajos/(?P<trabajo_id>[0-9]+)')
+    def estado_trabajo(self, request, trabajo_id):
+        return Response(TrabajoSerializer(self.get_trabajo(trabajo_id), context={'request': request}).data)
+
+    @swagger_auto_schema(
+        operation_description="Descarga el archivo generado por un trabajo completado.",
+        operation_summary="Resultado de un trabajo",
+        responses={
+            200: openapi.Response(description="Archivo generado"),
+            401: openapi.Response(description="No autenticado"),
+            404: openapi.Response(description="Trabajo no encontrado o sin resultado"),
+        }
+    )
+    @action(detail=False, methods=['get'], url_path=r'trabajos/(?P<trabajo_id>[0-9]+)/resultado')
+    def resultado_trabajo(self, request, trabajo_id):
+        trabajo = self.get_trabajo(trabajo_id)
+        if trabajo.estado != Trabajo.COMPLETADO or not trabajo.resultado:
+            raise NotFound('El trabajo no tiene resultado.')
+        ruta = trabajos.ruta_resultado(trabajo)
+        if not ruta.is_file():
+            raise NotFound('El resultado ya no está disponible.')
+        extension = ruta.suffix.lstrip('.')
+        return FileResponse(
+            open(ruta, 'rb'),
+            as_attachment=True,
+            filename=f'tareas-{trabajo.pk}.{extension}',
+            content_type='text/csv; charset=utf-8' if extension == 'csv' else 'application/x-ndjson',
+        )
+
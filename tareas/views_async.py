@@ -0,0 +1,200 @@
+"""
+Vistas asíncronas de tareas para el despliegue ASGI.
+
+DRF no ejecuta vistas async, así que estas son vistas de Django con
+manejadores async def. Reutilizan las piezas de la API que no hacen E/S
+(TareaSerializer para validar, TareaLecturaRapida para serializar, los
+filtros y los validadores HTTP) y acceden a la base de datos con el ORM
+asíncrono. El cuerpo de las respuestas es idéntico al de TareaViewSet.
+Bajo WSGI se siguen usando las vistas síncronas de /api/tareas/.
+
+El listado asíncrono admite un subconjunto del síncrono: filtros, ?search=,
+?fields=/?exclude=, ETag con 304 y paginación por número de página. No usa
+la caché de listados, y la paginación por cursor e incluir_archivadas
+responden 400 en lugar de ignorarse.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+from rest_framework import exceptions, status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import cache as cache_tareas
+from .authentication import CachedJWTAuthentication
+from .condicional import cabeceras, etag_listado, etag_tarea, respuesta_condicional
+from .filters import BusquedaTextoFilter
+from .models import Tarea
+from .serializers import TareaLecturaRapida, TareaSerializer, seleccionar_campos
+from .views import TareaViewSet
+
+
+class TareaAsyncView(View):
+    """Base de las vistas async: autenticación JWT y errores en el formato de DRF."""
+    authentication_class = CachedJWTAuthentication
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Como APIView: la autenticación es por token, sin CSRF.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        autenticacion = self.authentication_class()
+        try:
+            autenticado = await autenticacion.aauthenticate(request)
+            if autenticado is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = autenticado
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            datos = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            respuesta = self.respuesta_json(datos, status=exc.status_code)
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                respuesta['WWW-Authenticate'] = autenticacion.authenticate_header(request)
+            return respuesta
+
+    @staticmethod
+    def respuesta_json(datos, status=status.HTTP_200_OK, headers=None):
+        return HttpResponse(
+            JSONRenderer().render(datos), content_type='application/json',
+            status=status, headers=headers,
+        )
+
+    def get_queryset(self):
+        return Tarea.objects.filter(usuario=self.request.user)
+
+    def get_campos(self):
+        """Campos pedidos con ?fields= / ?exclude=, o None para todos."""
+        return seleccionar_campos(self.request.GET.get('fields'), self.request.GET.get('exclude'))
+
+    def filtrar(self, queryset):
+        """Aplica los mismos filtros que TareaViewSet (django-filter y ?search=)."""
+        filterset_class = DjangoFilterBackend().get_filterset_class(TareaViewSet, queryset)
+        filterset = filterset_class(self.request.GET, queryset=queryset, request=self.request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return BusquedaTextoFilter().filter_queryset(self.request, filterset.qs, self)
+
+
+class TareaListaAsyncView(TareaAsyncView):
+    """GET lista las tareas (paginación por número de página); POST crea una."""
+
+    async def get(self, request):
+        no_admitido = self._parametro_no_admitido(request)
+        if no_admitido:
+            return self.respuesta_json(
+                {'detail': f'{no_admitido} no está disponible en el listado asíncrono; use /api/tareas/.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        lectura = TareaLecturaRapida(self.get_campos())
+        queryset = self.filtrar(self.get_queryset())
+        # El mismo validador que el listado síncrono por páginas; su total
+        # hace de COUNT.
+        resumen = await queryset.aaggregate(maximo=Max('fecha_actualizacion'), total=Count('id'))
+        total = resumen['total']
+        etag = etag_listado(request, resumen['maximo'], total)
+        condicional = respuesta_condicional(request, etag)
+        if condicional is not None:
+            return condicional
+
+        tamano = api_settings.PAGE_SIZE
+        pagina = self._numero_pagina(request.GET.get('page'), total, tamano)
+        inicio = (pagina - 1) * tamano
+        filas = [fila async for fila in lectura.preparar(queryset)[inicio:inicio + tamano]]
+
+        url = request.build_absolute_uri()
+        if pagina == 1:
+            anterior = None
+        elif pagina == 2:
+            anterior = remove_query_param(url, 'page')
+        else:
+            anterior = replace_query_param(url, 'page', pagina - 1)
+        return self.respuesta_json({
+            'count': total,
+            'next': replace_query_param(url, 'page', pagina + 1) if inicio + tamano < total else None,
+            'previous': anterior,
+            'results': lectura.serializar(filas),
+        }, headers={'ETag': etag})
+
+    @staticmethod
+    def _parametro_no_admitido(request):
+        if request.GET.get('paginacion') == 'cursor' or 'cursor' in request.GET:
+            return 'La paginación por cursor'
+        if request.GET.get('incluir_archivadas', '').lower() in ('true', '1'):
+            return 'incluir_archivadas'
+        return None
+
+    @staticmethod
+    def _numero_pagina(valor, total, tamano):
+        """Mismas reglas que PageNumberPagination (incluido page=last)."""
+        paginas = max(1, -(-total // tamano))
+        if not valor:
+            return 1
+        if valor in PageNumberPagination.last_page_strings:
+            return paginas
+        try:
+            pagina = int(valor)
+        except ValueError:
+            pagina = 0
+        if not 1 <= pagina <= paginas:
+            raise exceptions.NotFound(PageNumberPagination.invalid_page_message)
+        return pagina
+
+    async def post(self, request):
+        serializer = TareaSerializer(data=self._leer_json(request))
+        serializer.is_valid(raise_exception=True)
+        tarea = await Tarea.objects.acreate(usuario=request.user, **serializer.validated_data)
+        return self.respuesta_json(TareaSerializer(tarea).data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def _leer_json(request):
+        if not request.body:
+            return {}
+        try:
+            return json.loads(request.body)
+        except ValueError as exc:
+            raise exceptions.ParseError(f'JSON parse error - {exc}')
+
+
+class TareaDetalleAsyncView(TareaAsyncView):
+    """GET obtiene una tarea, con ETag y Last-Modified como la vista síncrona."""
+
+    async def get(self, request, pk):
+        lectura = TareaLecturaRapida(self.get_campos())
+        queryset = self.filtrar(self.get_queryset()).filter(pk=pk)
+        filas = [fila async for fila in lectura.preparar(queryset).order_by()[:1]]
+        if not filas:
+            raise exceptions.NotFound()
+
+        fila = filas[0]
+        etag = etag_tarea(fila['id'], fila['fecha_actualizacion'])
+        condicional = respuesta_condicional(request, etag, fila['fecha_actualizacion'])
+        if condicional is not None:
+            return condicional
+        return self.respuesta_json(
+            lectura.to_representation(fila),
+            headers=cabeceras(etag, fila['fecha_actualizacion']),
+        )
+
+
+class TareaToggleAsyncView(TareaAsyncView):
+    """POST invierte el estado de completado con un único UPDATE."""
+
+    async def post(self, request, pk):
+        tarea = await Tarea.objects.aalternar_completado(pk, request.user)
+        if tarea is None:
+            raise exceptions.NotFound()
+        # El UPDATE no emite post_save.
+        await sync_to_async(cache_tareas.invalidar_usuario)(request.user.pk)
+        return self.respuesta_json(
+            TareaSerializer(tarea).data,
+            headers=cabeceras(etag_tarea(tarea.pk, tarea.fecha_actualizacion), tarea.fecha_actualizacion),
+        )
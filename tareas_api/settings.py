@@ -43,7 +43,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Perfilado por petición (Server-Timing, logs y cProfile por muestreo);
+    # descomentar para activarlo. Ver TAREAS_PERFIL más abajo.
+    # 'tareas.perfil.PerfilPeticionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Antes que los demás: comprime la respuesta ya terminada.
+    'tareas.compresion.CompresionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,7 +84,70 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Conexiones persistentes: no se abre la base de datos en cada petición.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Las transacciones toman el bloqueo de escritura al empezar y
+            # esperan busy_timeout, en lugar de fallar con "database is
+            # locked" al pasar de lectura a escritura.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Conexión de solo lectura al mismo archivo; con WAL los lectores no
+    # bloquean al escritor. tareas.routers envía aquí las lecturas.
+    'lectura': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{BASE_DIR / 'db.sqlite3'}?mode=ro",
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'uri': True},
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['tareas.routers.LecturaEscrituraRouter']
+
+# PRAGMAs aplicados a cada conexión SQLite nueva (ver tareas/signals.py).
+TAREAS_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,          # milisegundos
+    'mmap_size': 268435456,        # 256 MB
+    'cache_size': -65536,          # negativo = KiB (64 MB)
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Listados de tareas versionados por usuario (ver tareas/cache.py).
+    # LocMemCache expulsa las entradas menos usadas recientemente al
+    # superar MAX_ENTRIES; en producción puede apuntarse a Redis/Memcached.
+    'tareas': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tareas',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Contadores de versión de esos listados. Deben compartirse entre todos
+    # los procesos (servidor web y procesar_trabajos): una escritura solo
+    # invalida las páginas de los procesos que ven el contador incrementado.
+    # Con varias máquinas, apuntar este alias a Redis/Memcached.
+    'tareas_versiones': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'versiones',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
 }
 
 
@@ -119,6 +187,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Las pruebas llevan CACHES['tareas_versiones'] a un directorio temporal
+# (ver tareas/pruebas.py).
+TEST_RUNNER = 'tareas.pruebas.EjecutorPruebas'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -127,7 +199,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Configuración de Django REST Framework y SimpleJWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tareas.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -135,10 +207,28 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'tareas.renderers.JSONRapidoRenderer',
+        'tareas.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'tareas.renderers.NegociacionContenido',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
+
+# Caché de usuarios para la autenticación JWT (ver tareas/authentication.py).
+TAREAS_AUTH_CACHE = {
+    'MAX_USUARIOS': 10000,
+    'TTL': 60,
+    # Alias de CACHES compartido entre procesos, p. ej. 'default' con Redis.
+    'CACHE_COMPARTIDA': None,
+}
+
 SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'tareas_api.urls.api_info',
+    # Swagger UI descarga el esquema pregenerado en lugar de regenerarlo.
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
     'SECURITY_DEFINITIONS': {
         'Bearer': {
             'type': 'apiKey',
@@ -148,3 +238,90 @@ SWAGGER_SETTINGS = {
     }
 }
 
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+# Esquema OpenAPI pregenerado (ver tareas/esquema.py y generar_esquema).
+TAREAS_ESQUEMA_DIR = BASE_DIR / 'esquema'
+TAREAS_ESQUEMA_MAX_AGE = 86400
+
+# Sincronización incremental (acción cambios, ver tareas/sincronizacion.py).
+TAREAS_SINCRONIZACION = {
+    # Segundos de solapamiento entre sincronizaciones: cubre escrituras que
+    # se confirman tarde y el desfase de reloj entre servidores.
+    'MARGEN': 30,
+    # Días que se conservan las lápidas (manage.py purgar_eliminadas).
+    'RETENCION_DIAS': 30,
+    'LIMITE': 500,
+    'MAX_LIMITE': 1000,
+}
+
+# Archivo de tareas completadas (manage.py archivar_tareas, ver tareas/archivo.py).
+TAREAS_ARCHIVO = {
+    # Antigüedad mínima (días desde la última actualización).
+    'DIAS': 365,
+    # Tareas por lote; cada lote es una transacción corta.
+    'LOTE': 500,
+    # Segundos entre lotes para dejar paso a otras escrituras.
+    'PAUSA': 0.05,
+}
+
+# Eliminación de usuarios por lotes (tareas/eliminacion.py).
+TAREAS_ELIMINACION = {
+    # Tareas por DELETE; cada lote es una transacción corta.
+    'LOTE': 1000,
+    # Segundos entre lotes para dejar paso a otras escrituras.
+    'PAUSA': 0.0,
+}
+
+# Importación masiva en streaming (acción importar, ver tareas/importacion.py).
+TAREAS_IMPORTACION = {
+    # Filas por bloque; cada bloque se inserta en una transacción.
+    'LOTE': 1000,
+    'MAX_ERRORES': 100,
+}
+
+# Trabajos en segundo plano (manage.py procesar_trabajos, ver tareas/trabajos.py).
+TAREAS_TRABAJOS = {
+    # Ruta absoluta: el servidor web y el trabajador la comparten.
+    'DIRECTORIO': BASE_DIR / 'trabajos',
+    'PROCESOS': 2,
+    # Trabajos pendientes o en curso por usuario.
+    'MAX_PENDIENTES': 5,
+    # Días que se conservan los trabajos terminados y sus archivos.
+    'RETENCION_DIAS': 7,
+}
+
+# Compresión de respuestas (ver tareas/compresion.py). brotli es opcional.
+TAREAS_COMPRESION = {
+    'RUTAS': ('/api/tareas/', '/api/async/tareas/'),
+    'MINIMO': 1024,
+    'NIVEL_GZIP': 6,
+    'NIVEL_BROTLI': 4,
+}
+
+# Perfilado de peticiones (ver tareas/perfil.py). Solo actúa si
+# PerfilPeticionMiddleware está en MIDDLEWARE.
+TAREAS_PERFIL = {
+    # Fracción de peticiones perfiladas con cProfile (0.01 = 1 %).
+    'MUESTREO': 0.0,
+    'DIRECTORIO': BASE_DIR / 'perfiles',
+    'CABECERA': True,
+    'LOG': True,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'tareas.perfil': {
+            'handlers': ['consola'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
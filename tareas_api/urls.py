@@ -24,16 +24,19 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from tareas.esquema import esquema_view
+
 # Configuración de Swagger
+api_info = openapi.Info(
+    title="API de Tareas",
+    default_version='v1',
+    description="API RESTful para gestión de tareas con autenticación JWT",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@tareas.local"),
+    license=openapi.License(name="BSD License"),
+)
 schema_view = get_schema_view(
-    openapi.Info(
-        title="API de Tareas",
-        default_version='v1',
-        description="API RESTful para gestión de tareas con autenticación JWT",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@tareas.local"),
-        license=openapi.License(name="BSD License"),
-    ),
+    api_info,
     public=True,
     permission_classes=(permissions.AllowAny,),
 )
@@ -45,7 +48,9 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
     # Rutas de documentación Swagger
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
+    # El esquema se sirve pregenerado (manage.py generar_esquema); las
+    # interfaces lo descargan desde aquí mediante SPEC_URL.
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', esquema_view, name='schema-json'),
     re_path(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     re_path(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]